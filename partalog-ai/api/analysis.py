@@ -1,21 +1,23 @@
-import aiohttp
 import base64
 import json
 import io
-import asyncio
 from PIL import Image
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Query
 from pydantic import BaseModel
 from loguru import logger
 from config import settings
+from services.gemini_cache import load_response, response_key, store_response
+from services.gemini_client import get_gemini_session
+from services.gemini_limiter import estimate_tokens, get_gemini_limiter
 
 router = APIRouter()
 
-# 🚀 HIZ AYARI
-CONCURRENCY_LIMIT = asyncio.Semaphore(10)
-
 # ⚡ MODEL: gemini-2.0-flash-lite
-GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-lite:generateContent?key={settings.GEMINI_API_KEY}"
+GEMINI_MODEL = "gemini-2.0-flash-lite"
+GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={settings.GEMINI_API_KEY}"
+
+# Yanıt önbelleği anahtarındaki prompt sürümü: prompt metni değişince artırılır
+ANALYSIS_PROMPT_VERSION = "page-title-v1"
 
 # ✅ GÜVENLİK: Yanıt Şeması
 class PageAnalysisResponse(BaseModel):
@@ -24,85 +26,100 @@ class PageAnalysisResponse(BaseModel):
     title: str
 
 @router.post("/analyze-page-title", response_model=PageAnalysisResponse)
-async def analyze_page_title(file: UploadFile = File(...)):
-    async with CONCURRENCY_LIMIT:
+async def analyze_page_title(
+    file: UploadFile = File(...),
+    use_cache: bool = Query(default=True, description="false = Gemini yanıt önbelleğini okumadan yeniden sor")
+):
+    try:
+        image_bytes = await file.read()
+        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        
+        # Analiz için 1024px yeterli
+        image.thumbnail((1024, 1024)) 
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG", quality=85) 
+        base64_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+        # 🧠 HASSAS PROMPT
+        prompt_text = """
+        You are a spare parts catalog analyzer. Look at this page image carefully.
+
+        TASK 1: CLASSIFY (True/False)
+        - "is_technical_drawing": MUST be True ONLY if the page contains a schematic, exploded view, or diagram with numbered parts. If it is just a text list, this MUST be False.
+        - "is_parts_list": MUST be True if the page contains a data table (Ref, Code, Qty).
+
+        TASK 2: EXTRACT TITLE (Crucial)
+        - Find the specific component group name (e.g., "NEEDLE BAR COMPONENTS", "MAIN SHAFT", "FRAME ASSEMBLY").
+        - TRANSLATE it into TURKISH UPPERCASE (e.g., "İĞNE MİLİ BİLEŞENLERİ").
+        - RULE: Do NOT return generic titles like "Teknik Resim", "Figure", or "Table". Return the specific name of the mechanism shown.
+        - If no title is found on the page, return "GENEL PARÇALAR".
+
+        OUTPUT JSON:
+        {
+          "is_technical_drawing": boolean,
+          "is_parts_list": boolean,
+          "title": "TURKISH_TITLE_HERE"
+        }
+        """
+
+        payload = {
+            "contents": [{
+                "parts": [
+                    {"text": prompt_text},
+                    {"inline_data": {"mime_type": "image/jpeg", "data": base64_image}}
+                ]
+            }],
+            "generationConfig": { "response_mime_type": "application/json" }
+        }
+
+        # Aynı sayfa + aynı prompt daha önce sorulduysa yanıt diskten gelir
+        cache_key = response_key(base64_image, GEMINI_MODEL, ANALYSIS_PROMPT_VERSION, payload["generationConfig"])
+        raw_text = await load_response(cache_key) if use_cache else None
+        from_cache = raw_text is not None
+
+        if raw_text is None:
+            # Eşzamanlılık / kota: süreç geneli Gemini limiter'ı
+            session = await get_gemini_session()
+            async with get_gemini_limiter().slot(estimate_tokens(prompt_text, images=2, output=64)) as permit, \
+                    session.post(GEMINI_API_URL, json=payload) as response:
+                await permit.record_response(response)
+                if response.status != 200:
+                    logger.error(f"AI API Hatası: {await response.text()}")
+                    return PageAnalysisResponse(is_technical_drawing=False, is_parts_list=False, title="Hata")
+
+                result_json = await response.json()
+                permit.record_usage(result_json.get("usageMetadata"))
+
+                if "candidates" not in result_json or not result_json["candidates"]:
+                    return PageAnalysisResponse(is_technical_drawing=False, is_parts_list=False, title="Tanımsız")
+
+                raw_text = result_json["candidates"][0]["content"]["parts"][0]["text"]
+
+        clean_text = raw_text.replace("```json", "").replace("```", "").strip()
+            
+        # 🔥 GÜVENLİ JSON PARSE İŞLEMİ 🔥
         try:
-            image_bytes = await file.read()
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+            data = json.loads(clean_text)
+            if not from_cache:
+                await store_response(cache_key, raw_text, GEMINI_MODEL, ANALYSIS_PROMPT_VERSION)
+                
+            # Eğer AI liste döndürürse ([{...}]), ilk elemanı al
+            if isinstance(data, list):
+                if len(data) > 0:
+                    data = data[0]
+                else:
+                    data = {} # Boş liste gelirse
+        except json.JSONDecodeError:
+            logger.error(f"JSON Parse Hatası: {clean_text}")
+            data = {}
             
-            # Analiz için 1024px yeterli
-            image.thumbnail((1024, 1024)) 
-            buffered = io.BytesIO()
-            image.save(buffered, format="JPEG", quality=85) 
-            base64_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-            # 🧠 HASSAS PROMPT
-            prompt_text = """
-            You are a spare parts catalog analyzer. Look at this page image carefully.
-
-            TASK 1: CLASSIFY (True/False)
-            - "is_technical_drawing": MUST be True ONLY if the page contains a schematic, exploded view, or diagram with numbered parts. If it is just a text list, this MUST be False.
-            - "is_parts_list": MUST be True if the page contains a data table (Ref, Code, Qty).
-
-            TASK 2: EXTRACT TITLE (Crucial)
-            - Find the specific component group name (e.g., "NEEDLE BAR COMPONENTS", "MAIN SHAFT", "FRAME ASSEMBLY").
-            - TRANSLATE it into TURKISH UPPERCASE (e.g., "İĞNE MİLİ BİLEŞENLERİ").
-            - RULE: Do NOT return generic titles like "Teknik Resim", "Figure", or "Table". Return the specific name of the mechanism shown.
-            - If no title is found on the page, return "GENEL PARÇALAR".
-
-            OUTPUT JSON:
-            {
-              "is_technical_drawing": boolean,
-              "is_parts_list": boolean,
-              "title": "TURKISH_TITLE_HERE"
-            }
-            """
-
-            payload = {
-                "contents": [{
-                    "parts": [
-                        {"text": prompt_text},
-                        {"inline_data": {"mime_type": "image/jpeg", "data": base64_image}}
-                    ]
-                }],
-                "generationConfig": { "response_mime_type": "application/json" }
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(GEMINI_API_URL, json=payload) as response:
-                    if response.status != 200:
-                        logger.error(f"AI API Hatası: {await response.text()}")
-                        return PageAnalysisResponse(is_technical_drawing=False, is_parts_list=False, title="Hata")
-
-                    result_json = await response.json()
-                    
-                    if "candidates" not in result_json or not result_json["candidates"]:
-                        return PageAnalysisResponse(is_technical_drawing=False, is_parts_list=False, title="Tanımsız")
-
-                    raw_text = result_json["candidates"][0]["content"]["parts"][0]["text"]
-                    clean_text = raw_text.replace("```json", "").replace("```", "").strip()
-                    
-                    # 🔥 GÜVENLİ JSON PARSE İŞLEMİ 🔥
-                    try:
-                        data = json.loads(clean_text)
-                        
-                        # Eğer AI liste döndürürse ([{...}]), ilk elemanı al
-                        if isinstance(data, list):
-                            if len(data) > 0:
-                                data = data[0]
-                            else:
-                                data = {} # Boş liste gelirse
-                    except json.JSONDecodeError:
-                        logger.error(f"JSON Parse Hatası: {clean_text}")
-                        data = {}
-                    
-                    # Pydantic ile doğrulayıp dönüyoruz
-                    return PageAnalysisResponse(
-                        is_technical_drawing=data.get("is_technical_drawing", False),
-                        is_parts_list=data.get("is_parts_list", False),
-                        title=data.get("title", "GENEL GÖRÜNÜM")
-                    )
-
-        except Exception as e:
-            logger.error(f"Sistem Hatası: {e}")
-            return PageAnalysisResponse(is_technical_drawing=False, is_parts_list=False, title="İşlem Hatası")
\ No newline at end of file
+        # Pydantic ile doğrulayıp dönüyoruz
+        return PageAnalysisResponse(
+            is_technical_drawing=data.get("is_technical_drawing", False),
+            is_parts_list=data.get("is_parts_list", False),
+            title=data.get("title", "GENEL GÖRÜNÜM")
+        )
+
+    except Exception as e:
+        logger.error(f"Sistem Hatası: {e}")
+        return PageAnalysisResponse(is_technical_drawing=False, is_parts_list=False, title="İşlem Hatası")
\ No newline at end of file
@@ -7,7 +7,6 @@ Partalog AI - Chat API (Final v4.2 - Turkish Native Mode 🇹🇷)
 4. MULTI-PART: Birden fazla parça istenirse "parts" listesi döndürür.
 """
 
-import aiohttp
 import json
 import urllib.parse
 from fastapi import APIRouter, Form
@@ -17,6 +16,8 @@ from config import settings
 # ✅ Gerekli Servisler
 from services.embedding import get_text_embedding 
 from services.vector_db import search_vector_db 
+from services.gemini_client import get_gemini_session
+from services.gemini_limiter import estimate_tokens, get_gemini_limiter
 
 router = APIRouter()
 
@@ -75,14 +76,17 @@ async def analyze_intent_with_gemini(text: str) -> dict:
     }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(GEMINI_API_URL, json=payload) as resp:
-                if resp.status == 200:
-                    res = await resp.json()
-                    text_resp = res["candidates"][0]["content"]["parts"][0]["text"]
-                    return json.loads(text_resp)
-                else:
-                    return {"intent": "SEARCH", "brand": None, "part_name": text, "machine_group": None}
+        session = await get_gemini_session()
+        tokens = estimate_tokens(system_prompt + text, output=256)
+        async with get_gemini_limiter().slot(tokens) as permit, session.post(GEMINI_API_URL, json=payload) as resp:
+            await permit.record_response(resp)
+            if resp.status == 200:
+                res = await resp.json()
+                permit.record_usage(res.get("usageMetadata"))
+                text_resp = res["candidates"][0]["content"]["parts"][0]["text"]
+                return json.loads(text_resp)
+            else:
+                return {"intent": "SEARCH", "brand": None, "part_name": text, "machine_group": None}
     except Exception as e:
         logger.error(f"Router Hatası: {e}")
         return {"intent": "SEARCH", "brand": None, "part_name": text, "machine_group": None}
@@ -271,13 +275,17 @@ async def chat_endpoint(
         4. Link verme, zaten sistem gösterecek.
         """
 
-        async with aiohttp.ClientSession() as session:
-            payload = {"contents": [{"parts": [{"text": final_prompt}]}]}
-            async with session.post(GEMINI_API_URL, json=payload) as resp:
-                if resp.status == 200:
-                    ai_reply = (await resp.json())["candidates"][0]["content"]["parts"][0]["text"]
-                else:
-                    ai_reply = "Sonuçlar yukarıda listelendi ustam."
+        session = await get_gemini_session()
+        payload = {"contents": [{"parts": [{"text": final_prompt}]}]}
+        async with get_gemini_limiter().slot(estimate_tokens(final_prompt, output=512)) as permit, \
+                session.post(GEMINI_API_URL, json=payload) as resp:
+            await permit.record_response(resp)
+            if resp.status == 200:
+                res = await resp.json()
+                permit.record_usage(res.get("usageMetadata"))
+                ai_reply = res["candidates"][0]["content"]["parts"][0]["text"]
+            else:
+                ai_reply = "Sonuçlar yukarıda listelendi ustam."
 
         return {
             "answer": ai_reply,
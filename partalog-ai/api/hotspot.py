@@ -3,13 +3,20 @@ Hotspot API - YOLO Tespit + OCR Numara Okuma
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from loguru import logger
+import asyncio
+import hashlib
+import json
 import time
 import cv2
 import numpy as np
 
+from config import settings
+from core.executor import ExecutorBusy
+
 router = APIRouter()
 
 
@@ -46,9 +53,20 @@ class DetectionResponse(BaseModel):
     hotspot_count: int
     labeled_count: int  # OCR ile numara okunan hotspot sayısı
     processing_time_ms:  float
+    stage_timings_ms: Optional[Dict[str, float]] = None  # Cascade modunda kademe süreleri
+    cache_hit: bool = False  # Sonuç önbellekten mi geldi (YOLO + OCR atlandı)
     hotspots: List[HotspotResult]
 
 
+class BatchDetectionResponse(BaseModel):
+    """Çoklu sayfa API yanıt modeli."""
+    success: bool
+    message: str
+    page_count: int
+    processing_time_ms: float
+    pages: List[DetectionResponse]  # Gönderilen sırayla
+
+
 # ============================================
 # MODEL ACCESS
 # ============================================
@@ -67,7 +85,13 @@ def get_models():
 async def detect_hotspots(
     file: UploadFile = File(... , description="Analiz edilecek görüntü"),
     confidence: float = Query(default=0.25, ge=0.0, le=1.0, description="Minimum güven eşiği"),
-    padding: int = Query(default=5, ge=0, le=20, description="OCR için kırpma padding değeri")
+    padding: int = Query(default=5, ge=0, le=20, description="OCR için kırpma padding değeri"),
+    use_cache: bool = Query(default=True, description="false = önbelleği okumadan yeniden işle"),
+    allowed_labels: Optional[str] = Query(
+        default=None,
+        description="Sayfanın geçerli balon numaraları, virgülle ayrılmış (örn. 1,2,3,12)"
+    ),
+    catalog_id: Optional[str] = Query(default=None, description="OCR kırpıntı önbelleği kapsamı (katalog)")
 ):
     """
     Görüntüdeki hotspot'ları tespit eder ve içindeki numaraları okur.
@@ -75,6 +99,10 @@ async def detect_hotspots(
     - **file**: Analiz edilecek görüntü dosyası (PNG, JPG, etc.)
     - **confidence**:  YOLO minimum güven eşiği (0.0-1.0)
     - **padding**: Hotspot kırpılırken eklenen kenar boşluğu
+    - **use_cache**: Aynı sayfa daha önce işlendiyse kayıtlı sonucu döndür
+    - **allowed_labels**: Parça listesinden (/api/table/extract ref_number) gelen
+      numaralar; verilirse OCR yalnızca bu kümeden etiket üretir
+    - **catalog_id**: Aynı katalogdaki tekrar eden balonların OCR sonuçları paylaşılır
     
     Returns:
         Tespit edilen hotspot'lar ve OCR ile okunan numaralar
@@ -91,72 +119,494 @@ async def detect_hotspots(
             detail="YOLO modeli yüklenmemiş.  models/best.pt dosyasını kontrol edin."
         )
     
-    # Dosyayı oku
-    try: 
+    label_set = _parse_allowed_labels(allowed_labels)
+    contents = await _read_upload(file)
+    
+    # Önbellek: aynı sayfa + aynı ayarlar daha önce işlendiyse YOLO/OCR atlanır
+    cache = models.get("result_cache")
+    cache_key = None
+    if cache is not None:
+        cache_key, cached = await asyncio.to_thread(
+            _cache_lookup, models, contents, confidence, padding, use_cache, label_set
+        )
+        if cached is not None:
+            response = _cached_response(cached, start_time)
+            logger.info(f"♻️ Önbellekten: {response.hotspot_count} hotspot ({response.processing_time_ms}ms)")
+            return response
+    
+    timings = {}
+    image, detections = await _detect_page(models, contents, confidence, timings)
+    
+    labels = await _read_page_labels(models, image, detections, padding, label_set, catalog_id)
+    response = _build_detection_response(detections, image, labels, start_time, timings or None)
+    
+    if cache_key is not None:
+        await asyncio.to_thread(cache.put, cache_key, response.model_dump_json().encode("utf-8"))
+    
+    logger.info(f"✅ {response.hotspot_count} hotspot, {response.labeled_count} numara okundu ({response.processing_time_ms}ms)")
+    
+    return response
+
+
+@router.post("/detect-stream")
+async def detect_hotspots_stream(
+    file: UploadFile = File(..., description="Analiz edilecek görüntü"),
+    confidence: float = Query(default=0.25, ge=0.0, le=1.0, description="Minimum güven eşiği"),
+    padding: int = Query(default=5, ge=0, le=20, description="OCR için kırpma padding değeri"),
+    use_cache: bool = Query(default=True, description="false = önbelleği okumadan yeniden işle"),
+    allowed_labels: Optional[str] = Query(
+        default=None,
+        description="Sayfanın geçerli balon numaraları, virgülle ayrılmış (örn. 1,2,3,12)"
+    ),
+    catalog_id: Optional[str] = Query(default=None, description="OCR kırpıntı önbelleği kapsamı (katalog)"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$", description="ndjson | sse")
+):
+    """
+    /detect'in akışlı hali: YOLO biter bitmez sayfa bilgisi ve kutular,
+    ardından her hotspot'un OCR etiketi okundukça, en sonda özet gönderilir.
+    
+    Kayıtlar (her biri `type` alanı taşır; NDJSON'da satır başına bir JSON,
+    SSE'de `event: <type>` + `data: <json>`):
+    
+    - **page**: image_width, image_height, hotspot_count, stage_timings_ms,
+      cache_hit ve hotspots (/detect ile aynı alanlar, label henüz null)
+    - **label**: index (hotspots listesindeki sıra) ve label; her hotspot için
+      bir kez, okunma sırasıyla
+    - **summary**: success, message, labeled_count, processing_time_ms
+    - **error**: akış sırasında hata olursa message (ardından akış biter)
+    
+    YOLO ve dosya hataları akış başlamadan /detect ile aynı HTTP hatalarını döner.
+    Önbellekteki sayfalar aynı kayıtlarla hemen gönderilir.
+    """
+    start_time = time.time()
+    
+    models = get_models()
+    if models.get("yolo") is None:
+        raise HTTPException(
+            status_code=503,
+            detail="YOLO modeli yüklenmemiş.  models/best.pt dosyasını kontrol edin."
+        )
+    
+    label_set = _parse_allowed_labels(allowed_labels)
+    contents = await _read_upload(file)
+    encode = _sse_record if format == "sse" else _ndjson_record
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # Proxy tamponlamasın
+    
+    cache = models.get("result_cache")
+    cache_key = None
+    if cache is not None:
+        cache_key, cached = await asyncio.to_thread(
+            _cache_lookup, models, contents, confidence, padding, use_cache, label_set
+        )
+        if cached is not None:
+            response = _cached_response(cached, start_time)
+            return StreamingResponse(_stream_cached(response, encode), media_type=media_type, headers=headers)
+    
+    timings = {}
+    image, detections = await _detect_page(models, contents, confidence, timings)
+    
+    stream = _stream_page_labels(
+        models, image, detections, padding, label_set, catalog_id,
+        start_time, timings or None, cache_key, encode
+    )
+    return StreamingResponse(stream, media_type=media_type, headers=headers)
+
+
+@router.post("/detect-batch", response_model=BatchDetectionResponse)
+async def detect_hotspots_batch(
+    files: List[UploadFile] = File(..., description="Analiz edilecek sayfa görüntüleri"),
+    confidence: float = Query(default=0.25, ge=0.0, le=1.0, description="Minimum güven eşiği"),
+    padding: int = Query(default=5, ge=0, le=20, description="OCR için kırpma padding değeri"),
+    use_cache: bool = Query(default=True, description="false = önbelleği okumadan yeniden işle"),
+    catalog_id: Optional[str] = Query(default=None, description="OCR kırpıntı önbelleği kapsamı (katalog)")
+):
+    """
+    Birden fazla sayfayı tek bir YOLO çağrısıyla işler.
+    
+    Toplu katalog aktarımında sayfa başına istek, ön işleme ve model
+    çağrısı maliyetini ortadan kaldırır. Sayfalar gönderildiği sırayla döner;
+    okunamayan sayfalar `success=false` ile işaretlenir. Önbellekte
+    bulunan sayfalar YOLO batch'ine girmez.
+    
+    - **files**: Sayfa görüntüleri (PNG, JPG, etc.)
+    - **confidence**: YOLO minimum güven eşiği (0.0-1.0)
+    - **padding**: Hotspot kırpılırken eklenen kenar boşluğu
+    - **use_cache**: Daha önce işlenen sayfalar için kayıtlı sonucu döndür
+    - **catalog_id**: Aynı katalogdaki tekrar eden balonların OCR sonuçları paylaşılır
+    """
+    start_time = time.time()
+    
+    models = get_models()
+    detector = models.get("yolo")
+    
+    if detector is None:
+        raise HTTPException(
+            status_code=503,
+            detail="YOLO modeli yüklenmemiş.  models/best.pt dosyasını kontrol edin."
+        )
+    
+    if len(files) > settings.HOTSPOT_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Tek istekte en fazla {settings.HOTSPOT_BATCH_MAX_FILES} sayfa gönderilebilir."
+        )
+    
+    # Sayfaları çöz (bozuk sayfalar batch'i düşürmesin)
+    pages: List[Optional[DetectionResponse]] = [None] * len(files)
+    images = []
+    image_indices = []
+    cache = models.get("result_cache")
+    cache_keys: Dict[int, str] = {}
+    
+    for index, upload in enumerate(files):
+        try:
+            page_start = time.time()
+            contents = await upload.read()
+            if len(contents) == 0:
+                raise ValueError("Boş dosya")
+            
+            if cache is not None:
+                cache_keys[index], cached = await asyncio.to_thread(
+                    _cache_lookup, models, contents, confidence, padding, use_cache
+                )
+                if cached is not None:
+                    pages[index] = _cached_response(cached, page_start)
+                    continue
+            
+            images.append(await asyncio.to_thread(detector.decode_image, contents))
+            image_indices.append(index)
+        except Exception as e:
+            logger.warning(f"Sayfa {index} okunamadı ({upload.filename}): {e}")
+            pages[index] = _failed_page_response(f"Dosya okunamadı: {str(e)}")
+    
+    # YOLO ile tek seferde tespit
+    try:
+        yolo_start = time.time()
+        batch_detections = (
+            await _run_inference(models, "yolo", _detect_many, images, confidence) if images else []
+        )
+        yolo_share_ms = (time.time() - yolo_start) * 1000 / max(len(images), 1)
+    except ExecutorBusy:
+        raise  # 503 (main.py)
+    except Exception as e:
+        logger.error(f"YOLO batch tespit hatası: {e}")
+        raise HTTPException(status_code=500, detail=f"Tespit hatası:  {str(e)}")
+    
+    # Her sayfa için OCR (süreye YOLO payı eklenir)
+    for index, image, detections in zip(image_indices, images, batch_detections):
+        page_start = time.time() - yolo_share_ms / 1000
+        labels = await _read_page_labels(models, image, detections, padding, catalog_id=catalog_id)
+        pages[index] = _build_detection_response(detections, image, labels, page_start)
+        
+        if index in cache_keys:
+            await asyncio.to_thread(
+                cache.put, cache_keys[index], pages[index].model_dump_json().encode("utf-8")
+            )
+    
+    processing_time = round((time.time() - start_time) * 1000, 2)
+    total_hotspots = sum(page.hotspot_count for page in pages)
+    cache_hits = sum(1 for page in pages if page.cache_hit)
+    
+    logger.info(
+        f"✅ Batch: {len(files)} sayfa ({cache_hits} önbellekten), "
+        f"{total_hotspots} hotspot ({processing_time}ms)"
+    )
+    
+    return BatchDetectionResponse(
+        success=True,
+        message=f"{len(files)} sayfa işlendi, {total_hotspots} hotspot tespit edildi",
+        page_count=len(files),
+        processing_time_ms=processing_time,
+        pages=pages
+    )
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+async def _run_inference(models: dict, name: str, func, *args):
+    """
+    Model çağrısını inference executor üzerinde (event loop dışında) çalıştır.
+    func(replika, *args) biçimindedir; executor yoksa ana örnekle çağrılır.
+    """
+    executor = models.get("executor")
+    if executor is not None and executor.has(name):
+        return await executor.run(name, func, *args)
+    return await asyncio.to_thread(func, models[name], *args)
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """Yüklenen dosyayı oku; boş/okunamayan dosyada 400."""
+    try:
         contents = await file.read()
         if len(contents) == 0:
             raise ValueError("Boş dosya")
-    except Exception as e: 
+    except Exception as e:
         raise HTTPException(status_code=400, detail=f"Dosya okunamadı: {str(e)}")
-    
-    # YOLO ile tespit
-    try: 
-        detections, image = detector.detect_from_bytes(contents, confidence)
+    return contents
+
+
+async def _detect_page(models: dict, contents: bytes, confidence: float, timings: dict):
+    """
+    Sayfayı çöz ve YOLO ile tespit et (batcher varsa eşzamanlı isteklerle
+    birleştirilir; cascade sayfa başına çalıştığı için batch'lenmez, kademe
+    süreleri timings'e yazılır). Hata 500, dolu executor kuyruğu 503 olarak döner.
+    """
+    detector = models["yolo"]
+    try:
+        image = await asyncio.to_thread(detector.decode_image, contents)
+        batcher = models.get("yolo_batcher")
+        if batcher is not None and detector.mode != "cascade":
+            detections = await batcher.detect(image, confidence)
+        else:
+            detections = await _run_inference(models, "yolo", _detect, image, confidence, timings)
+    except ExecutorBusy:
+        raise  # 503 (main.py)
     except Exception as e:
         logger.error(f"YOLO tespit hatası: {e}")
         raise HTTPException(status_code=500, detail=f"Tespit hatası:  {str(e)}")
+    return image, detections
+
+
+def _ndjson_record(record_type: str, payload: dict) -> bytes:
+    return (json.dumps({"type": record_type, **payload}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _sse_record(record_type: str, payload: dict) -> bytes:
+    data = json.dumps({"type": record_type, **payload}, ensure_ascii=False)
+    return f"event: {record_type}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _page_record(response: DetectionResponse) -> dict:
+    return {
+        "image_width": response.image_width,
+        "image_height": response.image_height,
+        "hotspot_count": response.hotspot_count,
+        "stage_timings_ms": response.stage_timings_ms,
+        "cache_hit": response.cache_hit,
+        "hotspots": [hotspot.model_dump() for hotspot in response.hotspots]
+    }
+
+
+def _summary_record(response: DetectionResponse) -> dict:
+    return {
+        "success": response.success,
+        "message": response.message,
+        "hotspot_count": response.hotspot_count,
+        "labeled_count": response.labeled_count,
+        "processing_time_ms": response.processing_time_ms,
+        "cache_hit": response.cache_hit
+    }
+
+
+async def _stream_cached(response: DetectionResponse, encode) -> AsyncIterator[bytes]:
+    """Önbellekteki sayfayı akış kayıtlarıyla gönder."""
+    yield encode("page", _page_record(response))
+    for index, hotspot in enumerate(response.hotspots):
+        yield encode("label", {"index": index, "label": hotspot.label})
+    yield encode("summary", _summary_record(response))
+
+
+async def _stream_page_labels(
+    models: dict,
+    image: np.ndarray,
+    detections,
+    padding: int,
+    allowed_labels: Optional[frozenset],
+    catalog_id: Optional[str],
+    start_time: float,
+    stage_timings: Optional[Dict[str, float]],
+    cache_key: Optional[str],
+    encode
+) -> AsyncIterator[bytes]:
+    """
+    Kutuları hemen gönder; OCR'ı HOTSPOT_STREAM_OCR_CHUNK'lık gruplar halinde
+    (replika / worker varsa paralel) çalıştırıp her grubun etiketlerini biter
+    bitmez yaz. Bitince yanıt /detect ile aynı anahtarla önbelleğe girer.
+    """
+    count = len(detections)
+    labels: List[Optional[str]] = [None] * count
+    yield encode("page", _page_record(
+        _build_detection_response(detections, image, labels, start_time, stage_timings)
+    ))
     
+    async def read_chunk(offset: int):
+        chunk = detections[offset:offset + chunk_size]
+        return offset, await _read_page_labels(models, image, chunk, padding, allowed_labels, catalog_id)
+    
+    chunk_size = max(1, settings.HOTSPOT_STREAM_OCR_CHUNK)
+    tasks = [asyncio.ensure_future(read_chunk(offset)) for offset in range(0, count, chunk_size)]
+    try:
+        for next_chunk in asyncio.as_completed(tasks):
+            offset, chunk_labels = await next_chunk
+            for index, label in enumerate(chunk_labels, start=offset):
+                labels[index] = label
+                yield encode("label", {"index": index, "label": label})
+    except Exception as e:
+        logger.error(f"Akışlı OCR hatası: {e}")
+        yield encode("error", {"message": f"OCR hatası: {str(e)}"})
+        return
+    finally:
+        for task in tasks:
+            task.cancel()  # İstemci koptuysa kalan gruplar okunmasın
+    
+    response = _build_detection_response(detections, image, labels, start_time, stage_timings)
+    cache = models.get("result_cache")
+    if cache_key is not None and cache is not None:
+        await asyncio.to_thread(cache.put, cache_key, response.model_dump_json().encode("utf-8"))
+    
+    logger.info(f"✅ (akış) {response.hotspot_count} hotspot, {response.labeled_count} numara okundu ({response.processing_time_ms}ms)")
+    yield encode("summary", _summary_record(response))
+
+
+def _cache_lookup(
+    models: dict,
+    contents: bytes,
+    confidence: float,
+    padding: int,
+    use_cache: bool,
+    allowed_labels: Optional[frozenset] = None
+) -> Tuple[str, Optional[bytes]]:
+    """
+    Sayfanın önbellek anahtarını üret ve (use_cache ise) kayıtlı sonucu getir.
+    Anahtar: dosya hash'i + model parmak izi (ağırlık hash'i, imgsz, mod...)
+    + OCR parmak izi (mod, eşikler, hızlı katman modeli) + istek parametreleri.
+    """
+    cache = models["result_cache"]
+    ocr = models.get("ocr")
+    parts = [
+        hashlib.sha256(contents).hexdigest(),
+        models["yolo"].fingerprint(),
+        ocr.fingerprint() if ocr else "no-ocr",
+        confidence,
+        padding
+    ]
+    if allowed_labels:
+        parts.append(",".join(sorted(allowed_labels)))
+    key = cache.make_key(*parts)
+    return key, cache.get(key) if use_cache else None
+
+
+def _cached_response(cached: bytes, start_time: float) -> DetectionResponse:
+    """Önbellekteki yanıtı isabet olarak işaretleyip döndür."""
+    response = DetectionResponse.model_validate_json(cached)
+    response.cache_hit = True
+    response.stage_timings_ms = None
+    response.processing_time_ms = round((time.time() - start_time) * 1000, 2)
+    return response
+
+
+async def _read_page_labels(
+    models: dict,
+    image: np.ndarray,
+    detections,
+    padding: int,
+    allowed_labels: Optional[frozenset] = None,
+    catalog_id: Optional[str] = None
+) -> List[Optional[str]]:
+    """Sayfadaki tüm hotspot'ların numaralarını OCR replikasında oku."""
+    if models.get("ocr") is None:
+        return [None] * len(detections)
+    
+    return await _run_inference(
+        models, "ocr", _read_labels, image, detections, padding, allowed_labels, catalog_id
+    )
+
+
+def _parse_allowed_labels(raw: Optional[str]) -> Optional[frozenset]:
+    """'1, 2,12' -> {'1','2','12'}; rakam dışı karakter içerenler (OCR okuyamaz) atlanır."""
+    if not raw:
+        return None
+    labels = frozenset(part.strip() for part in raw.split(",") if part.strip().isdigit())
+    return labels or None
+
+
+def _detect(detector, image: np.ndarray, confidence: float, timings: Optional[dict] = None):
+    """Tek sayfa YOLO tespiti (worker thread'de çalışır)."""
+    return detector.detect(image, confidence, timings)
+
+
+def _detect_many(detector, images: List[np.ndarray], confidence: float):
+    """Çoklu sayfa YOLO tespiti (worker thread'de çalışır)."""
+    return detector.detect_many(images, confidence)
+
+
+def _read_labels(
+    ocr,
+    image: np.ndarray,
+    detections,
+    padding: int,
+    allowed_labels: Optional[frozenset] = None,
+    catalog_id: Optional[str] = None
+) -> List[Optional[str]]:
+    """Tüm tespitleri kırpıp tek toplu OCR çağrısıyla oku (worker thread'de çalışır)."""
     img_h, img_w = image.shape[:2]
     
-    # Her tespit için OCR uygula
-    results = []
-    labeled_count = 0
+    # Padding eklenmiş kırpma pencereleri tek seferde hesaplanır. Kırpıntılar
+    # sayfanın görünümleridir (kopya yok); OCR hiçbirine yazmaz, gri dönüşüm
+    # kırpıntı başına bir kez OCR ön yüzünde yapılır
+    rects = detections.crop_rects(img_w, img_h, padding).tolist()
+    crops = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in rects]
     
-    for det in detections: 
-        label = None
-        
-        # OCR ile numara oku
-        if ocr is not None:
-            try:
-                # Hotspot'u kırp
-                x1 = max(0, int(det.x1) - padding)
-                y1 = max(0, int(det.y1) - padding)
-                x2 = min(img_w, int(det.x2) + padding)
-                y2 = min(img_h, int(det.y2) + padding)
-                
-                crop = image[y1:y2, x1:x2]. copy()
-                
-                if crop.size > 0:
-                    label = ocr.read_number(crop)
-                    if label:
-                        labeled_count += 1
-                        logger.debug(f"Hotspot numara: {label} (conf: {det.confidence:.2f})")
-            except Exception as e: 
-                logger.warning(f"OCR hatası: {e}")
-        
-        # Sonuç oluştur
-        results.append(HotspotResult(
-            x1=round(det.x1, 2),
-            y1=round(det. y1, 2),
-            x2=round(det. x2, 2),
-            y2=round(det. y2, 2),
-            width=round(det.width, 2),
-            height=round(det.height, 2),
-            center_x=round(det.center[0], 2),
-            center_y=round(det. center[1], 2),
-            confidence=round(det.confidence, 4),
+    try:
+        labels = ocr.read_numbers_batch(crops, allowed_labels, catalog_id)
+    except Exception as e: 
+        logger.warning(f"OCR hatası: {e}")
+        return [None] * len(crops)
+    
+    for label, confidence in zip(labels, detections.confidences.tolist()):
+        if label:
+            logger.debug(f"Hotspot numara: {label} (conf: {confidence:.2f})")
+    
+    return labels
+
+
+def _build_detection_response(
+    detections,
+    image: np.ndarray,
+    labels: List[Optional[str]],
+    start_time: float,
+    stage_timings: Optional[Dict[str, float]] = None
+) -> DetectionResponse:
+    """Tespit ve OCR sonuçlarından sayfa yanıtını oluştur."""
+    img_h, img_w = image.shape[:2]
+    
+    labeled_count = sum(1 for label in labels if label)
+    
+    # Tüm sütunlar tek seferde hesaplanıp yuvarlanır; değerler zaten doğru
+    # tipte olduğu için hotspot başına pydantic doğrulaması atlanır
+    # (float64: eski hotspot başına Python hesabıyla aynı yuvarlama)
+    boxes = detections.boxes.astype(np.float64)
+    sizes = boxes[:, 2:] - boxes[:, :2]
+    columns = np.hstack([
+        boxes,
+        sizes,
+        (boxes[:, :2] + boxes[:, 2:]) / 2,
+        boxes[:, :2] / (img_w, img_h) * 100,
+        sizes / (img_w, img_h) * 100
+    ]).round(2).tolist()
+    confidences = detections.confidences.astype(np.float64).round(4).tolist()
+    
+    results = [
+        HotspotResult.model_construct(
+            x1=x1, y1=y1, x2=x2, y2=y2,
+            width=width, height=height,
+            center_x=center_x, center_y=center_y,
+            confidence=confidence,
             label=label,
-            left_percent=round((det.x1 / img_w) * 100, 2),
-            top_percent=round((det.y1 / img_h) * 100, 2),
-            width_percent=round((det.width / img_w) * 100, 2),
-            height_percent=round((det.height / img_h) * 100, 2)
-        ))
+            left_percent=left, top_percent=top,
+            width_percent=width_percent, height_percent=height_percent
+        )
+        for (x1, y1, x2, y2, width, height, center_x, center_y,
+             left, top, width_percent, height_percent), confidence, label
+        in zip(columns, confidences, labels)
+    ]
     
     processing_time = round((time.time() - start_time) * 1000, 2)
     
-    logger.info(f"✅ {len(detections)} hotspot, {labeled_count} numara okundu ({processing_time}ms)")
-    
-    return DetectionResponse(
+    return DetectionResponse.model_construct(
         success=True,
         message=f"{len(detections)} hotspot tespit edildi, {labeled_count} numara okundu",
         image_width=img_w,
@@ -164,10 +614,25 @@ async def detect_hotspots(
         hotspot_count=len(detections),
         labeled_count=labeled_count,
         processing_time_ms=processing_time,
+        stage_timings_ms=stage_timings,
         hotspots=results
     )
 
 
+def _failed_page_response(message: str) -> DetectionResponse:
+    """Okunamayan sayfa için boş yanıt."""
+    return DetectionResponse(
+        success=False,
+        message=message,
+        image_width=0,
+        image_height=0,
+        hotspot_count=0,
+        labeled_count=0,
+        processing_time_ms=0,
+        hotspots=[]
+    )
+
+
 @router.get("/info")
 async def get_service_info():
     """Servis ve model bilgilerini döndürür."""
@@ -181,7 +646,16 @@ async def get_service_info():
     if models. get("yolo"):
         info["models"]["yolo"] = models["yolo"].get_info()
     
+    if models.get("yolo_batcher"):
+        info["models"]["yolo_batcher"] = models["yolo_batcher"].get_info()
+    
     if models.get("ocr"):
         info["models"]["ocr"] = models["ocr"].get_info()
     
+    if models.get("result_cache"):
+        info["result_cache"] = models["result_cache"].get_info()
+    
+    if models.get("ocr_cache"):
+        info["ocr_cache"] = models["ocr_cache"].get_info()
+    
     return info
\ No newline at end of file
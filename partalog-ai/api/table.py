@@ -11,17 +11,82 @@ import io
 import asyncio
 import fitz  # ✅ PDF render
 from PIL import Image
-from fastapi import APIRouter, UploadFile, File, Query
+from fastapi import APIRouter, UploadFile, File, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from loguru import logger
 import time
 from config import settings
+from core.document_cache import DocumentCache
+from services.gemini_cache import load_response, response_key, store_response
+from services.gemini_client import get_gemini_session
+from services.gemini_limiter import GeminiOverloaded, estimate_tokens, get_gemini_limiter, is_throttled
 
 router = APIRouter()
 
 # ✅ MODEL: gemini-2.0-flash (Hız ve Maliyet Dostu)
-GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={settings.GEMINI_API_KEY}"
+GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={settings.GEMINI_API_KEY}"
+
+# Yanıt önbelleği anahtarındaki prompt sürümleri: prompt metni değişince artırılır
+TABLE_PROMPT_VERSION = "table-v1"
+METADATA_PROMPT_VERSION = "metadata-v1"
+
+# Tablo okuma + sanayi Türkçesi çeviri talimatı (/extract ve /extract-pages)
+TABLE_PROMPT = """
+    You are Sewing Machine expert,Analyze this Sewing Machine Parts Catalog page. Extract the table into JSON.
+
+    ROLE: You are an expert Turkish Industrial Sewing Machine Technician (40 years experience).
+
+    🚨 CRITICAL TRANSLATION RULES (STRICT INDUSTRIAL JARGON):
+    1. **TARGET LANGUAGE:** TURKISH (Sanayi Dili).
+    2. **NO LITERAL TRANSLATION:** Never use Google Translate style. Use the terms used in a real workshop (Atölye).
+       - ❌ WRONG: "Besleme Köpeği" (Feed Dog) -> ✅ RIGHT: "DİŞLİ"
+       - ❌ WRONG: "Boğaz Plakası" (Throat Plate) -> ✅ RIGHT: "PLAKA" or "AYNA"
+       - ❌ WRONG: "Hareketli Bıçak" (Movable Knife) -> ✅ RIGHT: "HAREKETLİ" (Bıçak zaten anlaşılırsa) or "HAREKETLİ BIÇAK"
+
+    3. **UNIVERSAL INPUT:** If text is Chinese, Japanese, or English: Translate to TURKISH JARGON.
+       - If text is already Turkish: Keep it uppercase.
+
+    4. **NEVER RETURN UNKNOWN:** part_name MUST always be filled.
+       - If the text is unclear, still infer the most likely Turkish workshop term.
+       - Do NOT output "BİLİNMEYEN PARÇA", "UNKNOWN", or empty.
+
+    5. **JARGON MAPPING (MEMORIZE THIS):**
+       - "Feed Dog" / "送料牙" -> "DİŞLİ"
+       - "Looper" / "弯针" -> "LÜPER"
+       - "Needle Clamp" -> "İĞNE BAĞI"
+       - "Presser Foot" / "压脚" -> "AYAK"
+       - "Thread Take-up" -> "HOROZ"
+       - "Tension Assembly" -> "TANSİYON"
+       - "Bobbin Case" -> "MEKİK"
+       - "Hook" -> "ÇAĞANOZ"
+       - "Screw" -> "VİDA"
+       - "Nut" -> "SOMUN"
+       - "Washer" -> "PUL"
+       - "Crank Shaft" -> "KRANK"
+
+    OUTPUT RULES:
+    1. **FORMAT:** JSON List only.
+    2. **FIELDS:**
+       - "ref_no": Reference number.
+       - "part_code": Exact part code (Remove spaces, fix OCR errors).
+       - "part_name": **THE TRANSLATED TURKISH NAME** (Uppercase).
+       - "dimensions": Extract measurements (M4x10, 3/16, 5mm) to this field.
+       - "qty": Quantity.
+
+    RETURN JSON LIST ONLY. NO MARKDOWN.
+    """
+
+# Limiter'ın TPM tahmini (sayfa görseli ~4 döşeme + uzun JSON liste); gerçek kullanım yanıttan düzeltilir
+TABLE_TOKEN_ESTIMATE = estimate_tokens(TABLE_PROMPT, images=4, output=2048)
+TABLE_ATTEMPTS = 3
+
+
+class TableExtractionError(RuntimeError):
+    """Gemini sayfayı tüm denemelerde okuyamadı ("tablo yok" durumundan ayrı tutulur)."""
+
 
 # --- Modeller ---
 class ProductResult(BaseModel):
@@ -43,6 +108,7 @@ class TableExtractionResponse(BaseModel):
     tables: List[TableResult]
     page_number: int = 0
     processing_time_ms: float = 0
+    document_hash: Optional[str] = None  # PDF'in önbellek anahtarı; sonraki sayfalarda dosya yerine gönderilir
 
 class MetadataResponse(BaseModel):
     machine_model: str
@@ -50,10 +116,18 @@ class MetadataResponse(BaseModel):
     machine_group: str = "General"
     catalog_title: str
 
+def get_models():
+    """Ana uygulamadan model / önbellek referanslarını al."""
+    from main import models
+    return models
+
 # --- Endpoints ---
 
 @router.post("/extract-metadata", response_model=MetadataResponse)
-async def extract_metadata(file: UploadFile = File(...)):
+async def extract_metadata(
+    file: UploadFile = File(...),
+    use_cache: bool = Query(default=True, description="false = Gemini yanıt önbelleğini okumadan yeniden sor")
+):
     logger.info("🔍 [METADATA] Kapak analizi (Zeka Modu) isteği geldi...")
     try:
         content = await file.read()
@@ -81,24 +155,36 @@ async def extract_metadata(file: UploadFile = File(...)):
             "generationConfig": {"response_mime_type": "application/json", "temperature": 0.3}
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(GEMINI_API_URL, json=payload) as response:
-                if response.status == 200:
-                    res = await response.json()
-                    candidates = res.get("candidates", [])
-                    if candidates:
-                        txt = candidates[0]["content"]["parts"][0]["text"]
-                        clean_txt = txt.replace("```json", "").replace("```", "").strip()
-                        data = json.loads(clean_txt)
-
-                        machine_group = data.get("machine_group") or "General"
-
-                        return MetadataResponse(
-                            machine_model=data.get("machine_model", "Unknown"),
-                            machine_brand=data.get("machine_brand"),
-                            machine_group=machine_group,
-                            catalog_title=data.get("catalog_title", "Unknown Catalog")
-                        )
+        cache_key = response_key(base64_image, GEMINI_MODEL, METADATA_PROMPT_VERSION, payload["generationConfig"])
+        txt = await load_response(cache_key) if use_cache else None
+        from_cache = txt is not None
+
+        if txt is None:
+            session = await get_gemini_session()
+            async with get_gemini_limiter().slot(estimate_tokens(prompt, images=2, output=128)) as permit:
+                async with session.post(GEMINI_API_URL, json=payload) as response:
+                    await permit.record_response(response)
+                    if response.status == 200:
+                        res = await response.json()
+                        permit.record_usage(res.get("usageMetadata"))
+                        candidates = res.get("candidates", [])
+                        if candidates:
+                            txt = candidates[0]["content"]["parts"][0]["text"]
+
+        if txt is not None:
+            clean_txt = txt.replace("```json", "").replace("```", "").strip()
+            data = json.loads(clean_txt)
+            if not from_cache:
+                await store_response(cache_key, txt, GEMINI_MODEL, METADATA_PROMPT_VERSION)
+
+            machine_group = data.get("machine_group") or "General"
+
+            return MetadataResponse(
+                machine_model=data.get("machine_model", "Unknown"),
+                machine_brand=data.get("machine_brand"),
+                machine_group=machine_group,
+                catalog_title=data.get("catalog_title", "Unknown Catalog")
+            )
 
         return MetadataResponse(machine_model="Unknown", catalog_title="Error")
     except Exception as e:
@@ -108,146 +194,362 @@ async def extract_metadata(file: UploadFile = File(...)):
 
 @router.post("/extract", response_model=TableExtractionResponse)
 async def extract_table(
-    file: UploadFile = File(...),
-    page_number: int = Query(default=1)
+    file: Optional[UploadFile] = File(default=None),
+    page_number: int = Query(default=1),
+    document_hash: Optional[str] = Query(
+        default=None,
+        description="Önceki yanıttaki document_hash; verilirse PDF tekrar gönderilmez"
+    ),
+    use_cache: bool = Query(default=True, description="false = Gemini yanıt önbelleğini okumadan yeniden sor")
 ):
+    """
+    Sayfadaki parça tablosunu okur.
+    
+    PDF'ler içerik hash'iyle önbellekte açık tutulur (yanıtta document_hash).
+    Aynı katalogun sonraki sayfaları için dosya yerine document_hash
+    gönderilebilir; önbellekten düşmüşse 404 döner ve dosya tekrar gönderilir.
+    İstenen sayfadan sonraki sayfalar arka planda hazırlanır.
+    """
     start_time = time.time()
     logger.info(f"📄 [GEMINI] Tablo Okunuyor ve Türkçeye Çevriliyor: Sayfa {page_number}")
     
+    if file is None and not document_hash:
+        raise HTTPException(status_code=400, detail="Dosya ya da document_hash gönderilmeli.")
+    
+    doc_cache = get_models().get("document_cache")
+    
     try:
-        content = await file.read()
-        image = None
-
-        # ✅ PDF mi?
-        if content[:4] == b"%PDF":
-            doc = fitz.open(stream=content, filetype="pdf")
-            if page_number < 1 or page_number > doc.page_count:
-                logger.error("❌ Sayfa numarası geçersiz")
-                return _empty_response("Geçersiz sayfa")
-
-            page = doc.load_page(page_number - 1)
-            pix = page.get_pixmap(dpi=200)
-            image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        content = await file.read() if file is not None else None
+
+        # ✅ PDF mi? (önbellek açıksa parse edilmiş doküman ve hazır sayfa kullanılır)
+        if content is None or content[:4] == b"%PDF":
+            if doc_cache is None:
+                if content is None:
+                    raise HTTPException(status_code=404, detail="Doküman önbelleği kapalı, dosyayı gönderin.")
+                image = _render_pdf_page(content, page_number)
+                if image is None:
+                    logger.error("❌ Sayfa numarası geçersiz")
+                    return _empty_response("Geçersiz sayfa")
+                jpeg = _encode_page(image)
+            else:
+                if content is not None:
+                    document_hash, _ = await asyncio.to_thread(doc_cache.add, content)
+                try:
+                    jpeg = await asyncio.to_thread(doc_cache.page_jpeg, document_hash, page_number)
+                except KeyError:
+                    raise HTTPException(status_code=404, detail="Doküman önbellekte yok, dosyayı tekrar gönderin.")
+                except ValueError:
+                    logger.error("❌ Sayfa numarası geçersiz")
+                    return _empty_response("Geçersiz sayfa")
+                doc_cache.prefetch(document_hash, page_number)
         else:
             # ✅ Görsel (jpg/png) ise direkt aç
-            image = Image.open(io.BytesIO(content)).convert("RGB")
+            jpeg = _encode_page(Image.open(io.BytesIO(content)).convert("RGB"))
 
-        image.thumbnail((1500, 1500))
-        buffered = io.BytesIO()
-        image.save(buffered, format="JPEG", quality=95)
-        base64_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        base64_image = base64.b64encode(jpeg).decode("utf-8")
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Resim hatası: {e}")
         return _empty_response()
 
-    prompt_text = """
-    You are Sewing Machine expert,Analyze this Sewing Machine Parts Catalog page. Extract the table into JSON.
-
-    ROLE: You are an expert Turkish Industrial Sewing Machine Technician (40 years experience).
+    try:
+        products = await _extract_products(await get_gemini_session(), base64_image, page_number, use_cache)
+    except GeminiOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except TableExtractionError as e:
+        logger.error(f"❌ Sayfa {page_number} okunamadı: {e}")
+        return TableExtractionResponse(
+            success=False, message=str(e), total_products=0, tables=[],
+            page_number=page_number,
+            processing_time_ms=round((time.time() - start_time) * 1000, 2),
+            document_hash=document_hash
+        )
 
-    🚨 CRITICAL TRANSLATION RULES (STRICT INDUSTRIAL JARGON):
-    1. **TARGET LANGUAGE:** TURKISH (Sanayi Dili).
-    2. **NO LITERAL TRANSLATION:** Never use Google Translate style. Use the terms used in a real workshop (Atölye).
-       - ❌ WRONG: "Besleme Köpeği" (Feed Dog) -> ✅ RIGHT: "DİŞLİ"
-       - ❌ WRONG: "Boğaz Plakası" (Throat Plate) -> ✅ RIGHT: "PLAKA" or "AYNA"
-       - ❌ WRONG: "Hareketli Bıçak" (Movable Knife) -> ✅ RIGHT: "HAREKETLİ" (Bıçak zaten anlaşılırsa) or "HAREKETLİ BIÇAK"
+    return TableExtractionResponse(
+        success=True,
+        message=f"Gemini {len(products)} parçayı Türkçeye çevirip buldu.",
+        total_products=len(products),
+        tables=[TableResult(row_count=len(products), products=products)],
+        page_number=page_number,
+        processing_time_ms=round((time.time() - start_time) * 1000, 2),
+        document_hash=document_hash
+    )
 
-    3. **UNIVERSAL INPUT:** If text is Chinese, Japanese, or English: Translate to TURKISH JARGON.
-       - If text is already Turkish: Keep it uppercase.
+@router.post("/extract-pages")
+async def extract_table_pages(
+    file: Optional[UploadFile] = File(default=None),
+    pages: Optional[str] = Query(default=None, description="Sayfa listesi / aralığı, ör. 1,3,5-9 (boş = tümü)"),
+    document_hash: Optional[str] = Query(
+        default=None,
+        description="Önceki yanıttaki document_hash; verilirse PDF tekrar gönderilmez"
+    ),
+    use_cache: bool = Query(default=True, description="false = Gemini yanıt önbelleğini okumadan yeniden sor")
+):
+    """
+    Bir PDF'in birden fazla sayfasındaki parça tablolarını tek istekte okur.
+    
+    PDF bir kez gönderilir (ya da document_hash ile önbellekten kullanılır).
+    Sayfalar render edilip en fazla TABLE_MAX_CONCURRENCY Gemini çağrısıyla
+    paralel okunur; her sayfanın TableExtractionResponse'u biter bitmez
+    NDJSON satırı olarak (sayfa sırası değil, bitiş sırasıyla) gönderilir.
+    Okunamayan sayfalar (render hatası, Gemini kota / 5xx / bozuk yanıt)
+    `success=false` ile döner; `success=true, total_products=0` sayfada tablo
+    olmadığı anlamına gelir.
+    
+    - **pages**: "1,3,5-9" biçiminde sayfa listesi; verilmezse tüm sayfalar
+    - **document_hash**: /extract ya da önceki /extract-pages yanıtındaki hash
+      (X-Document-Hash başlığında da döner)
+    """
+    start_time = time.time()
+    
+    if file is None and not document_hash:
+        raise HTTPException(status_code=400, detail="Dosya ya da document_hash gönderilmeli.")
+    
+    doc_cache = get_models().get("document_cache")
+    temporary_cache = None
+    content = await file.read() if file is not None else None
+    
+    if content is not None:
+        if content[:4] != b"%PDF":
+            raise HTTPException(status_code=400, detail="Çok sayfalı okuma yalnızca PDF dosyaları için.")
+        if doc_cache is None:
+            # Önbellek kapalıysa PDF yalnızca bu istek boyunca açık tutulur
+            doc_cache = temporary_cache = DocumentCache(max_documents=1, prefetch_pages=0)
+        try:
+            document_hash, page_count = await asyncio.to_thread(doc_cache.add, content)
+        except Exception as e:
+            if temporary_cache is not None:
+                temporary_cache.shutdown()
+            logger.error(f"❌ PDF açılamadı: {e}")
+            raise HTTPException(status_code=400, detail=f"PDF açılamadı: {str(e)}")
+    else:
+        page_count = doc_cache.page_count(document_hash) if doc_cache is not None else None
+        if page_count is None:
+            raise HTTPException(status_code=404, detail="Doküman önbellekte yok, dosyayı tekrar gönderin.")
+    
+    try:
+        page_numbers = _parse_pages(pages, page_count)
+    except ValueError as e:
+        if temporary_cache is not None:
+            temporary_cache.shutdown()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"📚 [GEMINI] {len(page_numbers)} sayfa tablo okunuyor ({document_hash[:12]}, {page_count} sayfa)")
+    
+    stream = _stream_pages(doc_cache, document_hash, page_numbers, start_time, use_cache, temporary_cache)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Document-Hash": document_hash}
+    return StreamingResponse(stream, media_type="application/x-ndjson", headers=headers)
+
+async def _stream_pages(
+    doc_cache: DocumentCache,
+    document_hash: str,
+    page_numbers: List[int],
+    start_time: float,
+    use_cache: bool = True,
+    temporary_cache: Optional[DocumentCache] = None
+) -> AsyncIterator[bytes]:
+    """
+    Her sayfa ayrı görev: slot al -> sayfayı render et (önbellekteyse hazır) ->
+    sonraki sayfaları ön yükle -> Gemini. Biten sayfa hemen yazılır.
+    """
+    slots = asyncio.Semaphore(max(1, settings.TABLE_MAX_CONCURRENCY))
+    
+    async def extract_page(session: aiohttp.ClientSession, page_number: int) -> TableExtractionResponse:
+        page_start = time.time()
+        async with slots:
+            try:
+                jpeg = await asyncio.to_thread(doc_cache.page_jpeg, document_hash, page_number)
+                doc_cache.prefetch(document_hash, page_number)
+                base64_image = base64.b64encode(jpeg).decode("utf-8")
+                products = await _extract_products(session, base64_image, page_number, use_cache)
+            except Exception as e:
+                logger.error(f"❌ Sayfa {page_number} okunamadı: {e}")
+                return TableExtractionResponse(
+                    success=False, message=f"Sayfa okunamadı: {str(e)}", total_products=0,
+                    tables=[], page_number=page_number,
+                    processing_time_ms=round((time.time() - page_start) * 1000, 2),
+                    document_hash=document_hash
+                )
+        
+        return TableExtractionResponse(
+            success=True,
+            message=f"Gemini {len(products)} parçayı Türkçeye çevirip buldu.",
+            total_products=len(products),
+            tables=[TableResult(row_count=len(products), products=products)],
+            page_number=page_number,
+            processing_time_ms=round((time.time() - page_start) * 1000, 2),
+            document_hash=document_hash
+        )
+    
+    tasks = []
+    total_products = 0
+    try:
+        session = await get_gemini_session()
+        tasks = [asyncio.ensure_future(extract_page(session, page)) for page in page_numbers]
+        for next_page in asyncio.as_completed(tasks):
+            response = await next_page
+            total_products += response.total_products
+            yield (response.model_dump_json() + "\n").encode("utf-8")
+    finally:
+        for task in tasks:
+            task.cancel()  # İstemci koptuysa kalan sayfalar Gemini'ye gitmesin
+        if temporary_cache is not None:
+            await asyncio.to_thread(temporary_cache.shutdown)
+    
+    logger.success(
+        f"✅ [GEMINI] {len(page_numbers)} sayfadan {total_products} parça okundu "
+        f"({round((time.time() - start_time) * 1000, 2)}ms)"
+    )
 
-    4. **NEVER RETURN UNKNOWN:** part_name MUST always be filled.
-       - If the text is unclear, still infer the most likely Turkish workshop term.
-       - Do NOT output "BİLİNMEYEN PARÇA", "UNKNOWN", or empty.
+def _parse_pages(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    "1,3,5-9" -> [1, 3, 5, 6, 7, 8, 9] (sıralı, tekrarsız); boş = tüm sayfalar.
 
-    5. **JARGON MAPPING (MEMORIZE THIS):**
-       - "Feed Dog" / "送料牙" -> "DİŞLİ"
-       - "Looper" / "弯针" -> "LÜPER"
-       - "Needle Clamp" -> "İĞNE BAĞI"
-       - "Presser Foot" / "压脚" -> "AYAK"
-       - "Thread Take-up" -> "HOROZ"
-       - "Tension Assembly" -> "TANSİYON"
-       - "Bobbin Case" -> "MEKİK"
-       - "Hook" -> "ÇAĞANOZ"
-       - "Screw" -> "VİDA"
-       - "Nut" -> "SOMUN"
-       - "Washer" -> "PUL"
-       - "Crank Shaft" -> "KRANK"
+    Raises:
+        ValueError: Biçim hatalı ya da sayfa aralık dışında
+    """
+    if not spec or not spec.strip():
+        return list(range(1, page_count + 1))
+
+    numbers = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if last else start
+        except ValueError:
+            raise ValueError(f"Geçersiz sayfa ifadesi: '{part}'")
+        if start < 1 or end < start or end > page_count:
+            raise ValueError(f"Geçersiz sayfa aralığı: '{part}' (PDF {page_count} sayfa)")
+        numbers.update(range(start, end + 1))
+
+    if not numbers:
+        raise ValueError("Sayfa listesi boş.")
+    return sorted(numbers)
+
+async def _extract_products(
+    session: aiohttp.ClientSession,
+    base64_image: str,
+    page_number: int,
+    use_cache: bool = True
+) -> List[ProductResult]:
+    """
+    Sayfa görüntüsünü Gemini'ye gönderip tablo satırlarını ayrıştır (TABLE_ATTEMPTS deneme).
+    Çağrılar limiter'dan geçer; 429/503'te sonraki deneme sabit beklemek yerine
+    limiter'ın Retry-After / geri çekilme süresi dolunca başlar. Ayrıştırılabilen
+    yanıt önbelleğe yazılır; aynı görsel tekrar gelirse Gemini'ye gidilmez.
 
-    OUTPUT RULES:
-    1. **FORMAT:** JSON List only.
-    2. **FIELDS:**
-       - "ref_no": Reference number.
-       - "part_code": Exact part code (Remove spaces, fix OCR errors).
-       - "part_name": **THE TRANSLATED TURKISH NAME** (Uppercase).
-       - "dimensions": Extract measurements (M4x10, 3/16, 5mm) to this field.
-       - "qty": Quantity.
+    Boş liste "sayfada tablo yok" demektir; Gemini hiç okuyamadıysa hata fırlatılır.
 
-    RETURN JSON LIST ONLY. NO MARKDOWN.
+    Raises:
+        GeminiOverloaded: Limiter kuyruğu dolu
+        TableExtractionError: Tüm denemeler başarısız (kota, 5xx, zaman aşımı, bozuk JSON)
     """
-
     payload = {
         "contents": [{
             "parts": [
-                {"text": prompt_text},
+                {"text": TABLE_PROMPT},
                 {"inline_data": {"mime_type": "image/jpeg", "data": base64_image}}
             ]
         }],
         "generationConfig": {"response_mime_type": "application/json", "temperature": 0.1}
     }
 
-    products = []
+    limiter = get_gemini_limiter()
+
+    cache_key = response_key(base64_image, GEMINI_MODEL, TABLE_PROMPT_VERSION, payload["generationConfig"])
+    cached = await load_response(cache_key) if use_cache else None
+    if cached is not None:
+        try:
+            products = _parse_products(cached)
+            logger.success(f"✅ [GEMINI] {len(products)} parça önbellekten (Sayfa {page_number})")
+            return products
+        except Exception:
+            pass  # Ayrıştırılamayan kayıt: Gemini'ye tekrar sorulur, kayıt yenilenir
     
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(3):
-            try:
+    last_error = None
+    for attempt in range(TABLE_ATTEMPTS):
+        try:
+            async with limiter.slot(TABLE_TOKEN_ESTIMATE) as permit:
                 async with session.post(GEMINI_API_URL, json=payload) as response:
+                    await permit.record_response(response)
                     if response.status == 200:
                         res = await response.json()
-                        if not res.get("candidates"): break
-                        
+                        permit.record_usage(res.get("usageMetadata"))
+                        if not res.get("candidates"):
+                            last_error = "Gemini boş yanıt döndürdü"
+                            continue
+
                         txt = res["candidates"][0]["content"]["parts"][0]["text"]
-                        clean_txt = txt.replace("```json", "").replace("```", "").strip()
-                        if clean_txt.endswith(",]"): clean_txt = clean_txt[:-2] + "]"
-                        
+
                         try:
-                            raw_data = json.loads(clean_txt)
-                            for item in raw_data:
-                                p_code = str(item.get("part_code") or "0").strip()
-                                if len(p_code) < 3: continue 
-
-                                dims = str(item.get("dimensions") or "").strip()
-                                if dims.lower() in ["null", "none"]: dims = None
-
-                                raw_name = str(item.get("part_name") or "").strip()
-                                if not raw_name:
-                                    raw_name = p_code
-
-                                products.append(ProductResult(
-                                    ref_number=str(item.get("ref_no") or "0"),
-                                    part_code=p_code,
-                                    part_name=raw_name.upper(),
-                                    description=str(item.get("remarks") or "").strip(),
-                                    quantity=1,
-                                    dimensions=dims
-                                ))
-                            logger.success(f"✅ [GEMINI] {len(products)} parça TÜRKÇELEŞTİRİLDİ (Sayfa {page_number})")
-                            break
-                        except:
+                            products = _parse_products(txt)
+                        except Exception as e:
+                            last_error = f"JSON ayrıştırılamadı ({e})"
                             continue
-                    else:
-                        await asyncio.sleep(1)
-            except Exception:
-                await asyncio.sleep(1)
+                        logger.success(f"✅ [GEMINI] {len(products)} parça TÜRKÇELEŞTİRİLDİ (Sayfa {page_number})")
+                        await store_response(cache_key, txt, GEMINI_MODEL, TABLE_PROMPT_VERSION)
+                        return products
+                    elif is_throttled(response.status):
+                        last_error = f"HTTP {response.status}"
+                        continue  # Bekleme limiter'da: sonraki slot süre dolunca açılır
+                    last_error = f"HTTP {response.status}"
+        except GeminiOverloaded:
+            raise
+        except Exception as e:
+            last_error = str(e) or type(e).__name__
+        if attempt < TABLE_ATTEMPTS - 1:
+            await asyncio.sleep(1)
+
+    raise TableExtractionError(f"Gemini {TABLE_ATTEMPTS} denemede okuyamadı (son hata: {last_error})")
+
+def _parse_products(txt: str) -> List[ProductResult]:
+    """Gemini'nin JSON liste yanıtından parça satırları (JSON bozuksa hata fırlatır)."""
+    clean_txt = txt.replace("```json", "").replace("```", "").strip()
+    if clean_txt.endswith(",]"): clean_txt = clean_txt[:-2] + "]"
 
-    return TableExtractionResponse(
-        success=True,
-        message=f"Gemini {len(products)} parçayı Türkçeye çevirip buldu.",
-        total_products=len(products),
-        tables=[TableResult(row_count=len(products), products=products)],
-        page_number=page_number,
-        processing_time_ms=round((time.time() - start_time) * 1000, 2)
-    )
+    products = []
+    raw_data = json.loads(clean_txt)
+    for item in raw_data:
+        p_code = str(item.get("part_code") or "0").strip()
+        if len(p_code) < 3: continue 
+
+        dims = str(item.get("dimensions") or "").strip()
+        if dims.lower() in ["null", "none"]: dims = None
+
+        raw_name = str(item.get("part_name") or "").strip()
+        if not raw_name:
+            raw_name = p_code
+
+        products.append(ProductResult(
+            ref_number=str(item.get("ref_no") or "0"),
+            part_code=p_code,
+            part_name=raw_name.upper(),
+            description=str(item.get("remarks") or "").strip(),
+            quantity=1,
+            dimensions=dims
+        ))
+    return products
+
+def _render_pdf_page(content: bytes, page_number: int) -> Optional[Image.Image]:
+    """Önbelleksiz yol: PDF'i açıp tek sayfayı render et (geçersiz sayfada None)."""
+    doc = fitz.open(stream=content, filetype="pdf")
+    if page_number < 1 or page_number > doc.page_count:
+        return None
+    pix = doc.load_page(page_number - 1).get_pixmap(dpi=200)
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+def _encode_page(image: Image.Image) -> bytes:
+    """Gemini'ye gönderilen sayfa görüntüsü (DocumentCache.page_jpeg ile aynı ayarlar)."""
+    image.thumbnail((1500, 1500))
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=95)
+    return buffered.getvalue()
 
 def _empty_response(msg="Boş"):
     return TableExtractionResponse(
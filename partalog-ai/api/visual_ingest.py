@@ -10,10 +10,13 @@ import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 # --- Router Değişikliği ---
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
 from pydantic import BaseModel
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from services.gemini_cache import get_gemini_cache, load_response, response_key, store_response
+from services.gemini_limiter import estimate_tokens, get_gemini_limiter
+
 # --- API KEY İÇİN ---
 from dotenv import load_dotenv
 
@@ -37,14 +40,18 @@ os.makedirs(DEBUG_DIR, exist_ok=True)
 GEMINI_MODEL_GLOBAL = "gemini-2.0-pro-exp-02-05" # Ana Beyin
 GEMINI_MODEL_LOCAL = "gemini-2.0-flash"          # Hız Canavarı
 
+# Yanıt önbelleği anahtarındaki prompt sürümleri: prompt metni değişince artırılır
+GLOBAL_TRACE_PROMPT_VERSION = "global-trace-v1"
+LOCAL_REFINE_PROMPT_VERSION = "local-refine-v1"
+GENERATION_CONFIG = {"response_mime_type": "application/json", "temperature": 0.2}
+
 HIGH_RES_TARGET = 3072 
 RED = (255, 0, 0)
 CIRCLE_RADIUS = 25
 CIRCLE_THICKNESS = 6
 FONT_SIZE = 40
 
-# AYNI ANDA KAÇ PARÇA İŞLENSİN? (Rate Limit Koruması)
-MAX_CONCURRENT_REQUESTS = 15 
+# Eşzamanlılık / kota koruması: services.gemini_limiter (GEMINI_* ayarları)
 
 # ============================================
 # IMPORT REAL INFRA (MOCK - Senin dosyaların yoksa çalışsın diye)
@@ -137,12 +144,50 @@ def robust_json_extract(text: str) -> Any:
         logger.error(f"JSON Parse Failed. Raw text sample: {text[:50]}...")
         return None
 
+def _cache_key(image: Image.Image, model: str, prompt_version: str, *extra: Any) -> Optional[str]:
+    """SDK görseli kendisi kodluyor; anahtar piksel verisinden (mod + boyut + bayt) çıkarılır."""
+    if get_gemini_cache() is None:
+        return None
+    image_bytes = f"{image.mode}:{image.size}:".encode("ascii") + image.tobytes()
+    return response_key(image_bytes, model, prompt_version, GENERATION_CONFIG, *extra)
+
+async def _generate_json(
+    image: Image.Image,
+    prompt: str,
+    model: str,
+    prompt_version: str,
+    token_estimate: int,
+    use_cache: bool,
+    *extra: Any
+) -> Any:
+    """Önbellekte ayrıştırılabilen yanıt varsa onu, yoksa Gemini çağrısının JSON'ını döndürür."""
+    cache_key = await asyncio.to_thread(_cache_key, image, model, prompt_version, *extra)
+    if use_cache:
+        cached = await load_response(cache_key)
+        data = robust_json_extract(cached) if cached is not None else None
+        if data is not None:
+            return data
+
+    # Yeni SDK Çağrısı (kota hatasında limiter geri çekilir, tenacity yeniden dener)
+    async with get_gemini_limiter().slot(token_estimate):
+        response = await asyncio.to_thread(
+            client.models.generate_content,
+            model=model,
+            contents=[prompt, image],
+            config=types.GenerateContentConfig(**GENERATION_CONFIG)
+        )
+
+    data = robust_json_extract(response.text)
+    if data is not None:
+        await store_response(cache_key, response.text, model, prompt_version)
+    return data
+
 # ============================================
 # GEMINI ENGINE (YENİ SDK - google.genai)
 # ============================================
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=10), retry=retry_if_exception_type(Exception))
-async def gemini_global_trace(image: Image.Image, labels: List[str]) -> List[Dict]:
+async def gemini_global_trace(image: Image.Image, labels: List[str], use_cache: bool = True) -> List[Dict]:
     """AŞAMA 1: Global Tarama"""
     if not client: raise ValueError("API Key Missing")
 
@@ -161,18 +206,10 @@ async def gemini_global_trace(image: Image.Image, labels: List[str]) -> List[Dic
     * Coordinates must be 0-1 normalized.
     """
     
-    # Yeni SDK Çağrısı
-    response = await asyncio.to_thread(
-        client.models.generate_content,
-        model=GEMINI_MODEL_GLOBAL,
-        contents=[prompt, image],
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            temperature=0.2
-        )
+    data = await _generate_json(
+        image, prompt, GEMINI_MODEL_GLOBAL, GLOBAL_TRACE_PROMPT_VERSION,
+        estimate_tokens(prompt, images=16, output=1024), use_cache, labels
     )
-    
-    data = robust_json_extract(response.text)
     parts = data.get("parts", []) if data else []
     
     corrected = []
@@ -184,7 +221,7 @@ async def gemini_global_trace(image: Image.Image, labels: List[str]) -> List[Dic
     return corrected
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=5), retry=retry_if_exception_type(Exception))
-async def gemini_local_refine(crop_img: Image.Image, label: str) -> Dict:
+async def gemini_local_refine(crop_img: Image.Image, label: str, use_cache: bool = True) -> Dict:
     """AŞAMA 2: Lokal İyileştirme"""
     if not client: raise ValueError("API Key Missing")
 
@@ -194,17 +231,10 @@ async def gemini_local_refine(crop_img: Image.Image, label: str) -> Dict:
     RETURN JSON: {{ "bbox": [ymin, xmin, ymax, xmax] }}
     """
     
-    response = await asyncio.to_thread(
-        client.models.generate_content,
-        model=GEMINI_MODEL_LOCAL,
-        contents=[prompt, crop_img],
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            temperature=0.2
-        )
+    data = await _generate_json(
+        crop_img, prompt, GEMINI_MODEL_LOCAL, LOCAL_REFINE_PROMPT_VERSION,
+        estimate_tokens(prompt, images=1, output=64), use_cache, label
     )
-    
-    data = robust_json_extract(response.text)
     if data and 'bbox' in data:
         y1, x1, y2, x2 = data['bbox']
         return {"label": label, "bbox": [x1, y1, x2, y2]}
@@ -214,7 +244,7 @@ async def gemini_local_refine(crop_img: Image.Image, label: str) -> Dict:
 # PIPELINE
 # ============================================
 
-async def hybrid_pipeline(page_image: Image.Image) -> List[Dict]:
+async def hybrid_pipeline(page_image: Image.Image, use_cache: bool = True) -> List[Dict]:
     logger.info("🚀 Pipeline Başlatılıyor...")
     
     # 1. VERİ TOPLA
@@ -239,41 +269,38 @@ async def hybrid_pipeline(page_image: Image.Image) -> List[Dict]:
     marked_img.save(os.path.join(DEBUG_DIR, "debug_marked.jpg"))
 
     # 4. AŞAMA 1: GLOBAL TARAMA
-    rough_results = await gemini_global_trace(marked_img, [h["label"] for h in valid_hotspots])
+    rough_results = await gemini_global_trace(marked_img, [h["label"] for h in valid_hotspots], use_cache)
     dump_json("rough_results.json", rough_results)
     
     if not rough_results:
         logger.warning("⚠️ Stage 1 parça bulamadı.")
         return []
 
-    # 5. AŞAMA 2: LOKAL İYİLEŞTİRME
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-
+    # 5. AŞAMA 2: LOKAL İYİLEŞTİRME (eşzamanlılık gemini_local_refine içinde limiter'da)
     async def refine_safe(item):
-        async with semaphore: 
-            try:
-                label = item["label"]
-                rx1, ry1, rx2, ry2 = item['rough_bbox']
+        try:
+            label = item["label"]
+            rx1, ry1, rx2, ry2 = item['rough_bbox']
                 
-                px1, py1, px2, py2 = pad_bbox(rx1, ry1, rx2, ry2, 0.2)
-                px1, py1, px2, py2 = clamp01(px1), clamp01(py1), clamp01(px2), clamp01(py2)
+            px1, py1, px2, py2 = pad_bbox(rx1, ry1, rx2, ry2, 0.2)
+            px1, py1, px2, py2 = clamp01(px1), clamp01(py1), clamp01(px2), clamp01(py2)
 
-                crop_img = crop_with_bbox(high_res, px1, py1, px2, py2)
+            crop_img = crop_with_bbox(high_res, px1, py1, px2, py2)
                 
-                local_res = await gemini_local_refine(crop_img, label)
+            local_res = await gemini_local_refine(crop_img, label, use_cache)
                 
-                if local_res:
-                    global_bbox = local_to_global(local_res['bbox'], [px1, py1, px2, py2])
+            if local_res:
+                global_bbox = local_to_global(local_res['bbox'], [px1, py1, px2, py2])
                     
-                    w, h = high_res.size
-                    gpx = [int(global_bbox[0]*w), int(global_bbox[1]*h), int(global_bbox[2]*w), int(global_bbox[3]*h)]
-                    final_crop = high_res.crop((gpx[0], gpx[1], gpx[2], gpx[3]))
-                    final_crop.save(os.path.join(DEBUG_DIR, f"final_{label}.jpg"))
+                w, h = high_res.size
+                gpx = [int(global_bbox[0]*w), int(global_bbox[1]*h), int(global_bbox[2]*w), int(global_bbox[3]*h)]
+                final_crop = high_res.crop((gpx[0], gpx[1], gpx[2], gpx[3]))
+                final_crop.save(os.path.join(DEBUG_DIR, f"final_{label}.jpg"))
                     
-                    return {"label": label, "bbox": global_bbox}
-            except Exception as e:
-                logger.error(f"Refine Error ({item.get('label')}): {e}")
-            return None
+                return {"label": label, "bbox": global_bbox}
+        except Exception as e:
+            logger.error(f"Refine Error ({item.get('label')}): {e}")
+        return None
 
     tasks = [refine_safe(item) for item in rough_results]
     results = await asyncio.gather(*tasks)
@@ -293,7 +320,10 @@ class IngestResult(BaseModel):
     parts: List[Dict]
 
 @router.post("/visual-ingest", response_model=IngestResult)
-async def visual_ingest(file: UploadFile = File(...)):
+async def visual_ingest(
+    file: UploadFile = File(...),
+    use_cache: bool = Query(default=True, description="false = Gemini yanıt önbelleğini okumadan yeniden sor")
+):
     try:
         contents = await file.read()
         npimg = np.frombuffer(contents, np.uint8)
@@ -304,7 +334,7 @@ async def visual_ingest(file: UploadFile = File(...)):
         rgb = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
         pil_img = Image.fromarray(rgb)
         
-        results = await hybrid_pipeline(pil_img)
+        results = await hybrid_pipeline(pil_img, use_cache)
         return IngestResult(parts=results)
     except Exception as e:
         logger.error(f"Critical Error: {e}")
@@ -0,0 +1,183 @@
+"""
+Partalog AI - YOLO Backend Karşılaştırması (Parity + Latency)
+Görevi: torch referans yoluna karşı onnx / openvino backend'inin aynı
+hotspot'ları ürettiğini doğrulamak ve sayfa başı süreleri ölçmek.
+
+Kullanım:
+    python benchmark_detector.py --pages ornek_sayfalar/ --backend onnx
+    python benchmark_detector.py --pages ornek_sayfalar/ --backend openvino --runs 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from config import settings
+from core.detector import Detection, HotspotDetector
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+
+
+# ==========================================
+# 🛠️ YARDIMCI FONKSİYONLAR
+# ==========================================
+
+def load_pages(pages_dir: str, limit: int = 0) -> List[Tuple[str, np.ndarray]]:
+    """Klasördeki sayfa görüntülerini (BGR) yükler."""
+    paths = sorted(p for p in Path(pages_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if limit:
+        paths = paths[:limit]
+
+    pages = []
+    for path in paths:
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            logger.warning(f"⚠️ Okunamadı, atlanıyor: {path}")
+            continue
+        pages.append((path.name, image))
+    return pages
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N,4) ve (M,4) xyxy kutular için IoU matrisi."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def match_detections(
+    reference: Sequence[Detection],
+    candidate: Sequence[Detection],
+    iou_threshold: float = 0.5
+) -> Tuple[List[Tuple[int, int, float]], int, int]:
+    """
+    Aynı sınıftaki kutuları IoU'ya göre greedy eşleştirir.
+
+    Returns:
+        (eşleşmeler [(ref_idx, cand_idx, iou)], kaçırılan sayısı, fazladan sayısı)
+    """
+    ref_boxes = np.array([d.bbox for d in reference], dtype=np.float32).reshape(-1, 4)
+    cand_boxes = np.array([d.bbox for d in candidate], dtype=np.float32).reshape(-1, 4)
+    ious = iou_matrix(ref_boxes, cand_boxes)
+
+    matches = []
+    used_ref, used_cand = set(), set()
+    for flat in np.argsort(-ious, axis=None):
+        i, j = np.unravel_index(flat, ious.shape)
+        if ious[i, j] < iou_threshold:
+            break
+        if i in used_ref or j in used_cand:
+            continue
+        if reference[i].class_id != candidate[j].class_id:
+            continue
+        used_ref.add(i)
+        used_cand.add(j)
+        matches.append((int(i), int(j), float(ious[i, j])))
+
+    return matches, len(reference) - len(matches), len(candidate) - len(matches)
+
+
+def time_detector(
+    detector: HotspotDetector,
+    pages: List[Tuple[str, np.ndarray]],
+    runs: int = 3
+) -> Tuple[Dict[str, List[Detection]], float]:
+    """
+    Her sayfayı `runs` kez çalıştırır (ilk çağrı ısınma olarak sayılmaz).
+
+    Returns:
+        (sayfa adı -> tespitler, ortalama ms/sayfa)
+    """
+    outputs = {}
+    timings = []
+
+    for name, image in pages:
+        outputs[name] = detector.detect(image)  # Isınma + referans çıktı
+        for _ in range(runs):
+            start = time.perf_counter()
+            detector.detect(image)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return outputs, float(np.mean(timings)) if timings else 0.0
+
+
+# ==========================================
+# 🚀 ANA AKIŞ
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO backend parity + latency karşılaştırması")
+    parser.add_argument("--pages", required=True, help="Örnek sayfa görüntülerinin klasörü")
+    parser.add_argument("--backend", default="onnx", choices=["onnx", "openvino"])
+    parser.add_argument("--model", default=settings.YOLO_MODEL_PATH, help="Referans .pt modeli")
+    parser.add_argument("--imgsz", type=int, default=settings.YOLO_IMG_SIZE)
+    parser.add_argument("--conf", type=float, default=settings.YOLO_CONFIDENCE)
+    parser.add_argument("--runs", type=int, default=3, help="Sayfa başına ölçüm tekrarı")
+    parser.add_argument("--limit", type=int, default=0, help="En fazla kaç sayfa (0 = hepsi)")
+    parser.add_argument("--iou", type=float, default=0.9, help="Parity için minimum IoU")
+    parser.add_argument("--conf-tolerance", type=float, default=0.02, help="İzin verilen güven farkı")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.limit)
+    if not pages:
+        logger.error(f"❌ '{args.pages}' içinde görüntü bulunamadı.")
+        sys.exit(2)
+
+    logger.info(f"📄 {len(pages)} sayfa, torch vs {args.backend} (imgsz={args.imgsz}, conf={args.conf})")
+
+    reference = HotspotDetector(args.model, args.conf, args.imgsz, "torch")
+    candidate = HotspotDetector(args.model, args.conf, args.imgsz, args.backend)
+
+    ref_out, ref_ms = time_detector(reference, pages, args.runs)
+    cand_out, cand_ms = time_detector(candidate, pages, args.runs)
+
+    # Parity
+    total_matched = total_missing = total_extra = 0
+    conf_diffs = []
+    for name, _ in pages:
+        ref_dets, cand_dets = ref_out[name], cand_out[name]
+        matches, missing, extra = match_detections(ref_dets, cand_dets, args.iou)
+        total_matched += len(matches)
+        total_missing += missing
+        total_extra += extra
+        conf_diffs.extend(abs(ref_dets[i].confidence - cand_dets[j].confidence) for i, j, _ in matches)
+
+        if missing or extra:
+            logger.warning(f"   ⚠️ {name}: {len(ref_dets)} ref / {len(cand_dets)} {args.backend}, "
+                           f"{missing} eksik, {extra} fazla")
+
+    max_conf_diff = max(conf_diffs) if conf_diffs else 0.0
+    parity_ok = total_missing == 0 and total_extra == 0 and max_conf_diff <= args.conf_tolerance
+
+    logger.info("-" * 60)
+    logger.info(f"torch      : {ref_ms:8.1f} ms/sayfa")
+    logger.info(f"{args.backend:<11}: {cand_ms:8.1f} ms/sayfa  (x{ref_ms / cand_ms if cand_ms else 0:.2f} hız)")
+    logger.info(f"Eşleşen    : {total_matched} kutu (IoU >= {args.iou})")
+    logger.info(f"Eksik/Fazla: {total_missing} / {total_extra}")
+    logger.info(f"Maks. |Δconf|: {max_conf_diff:.4f} (tolerans {args.conf_tolerance})")
+
+    if parity_ok:
+        logger.success(f"✅ PARITY OK: {args.backend} çıktıları torch ile aynı.")
+    else:
+        logger.error(f"❌ PARITY HATASI: {args.backend} çıktıları torch'tan farklı.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Partalog AI - OCR Ön İşleme Mikro-Benchmark'ı
+Görevi: balon kırpıntısı başına ön işleme maliyetini eski yöntem-yöntem
+yoluna (her varyant ayrı gri dönüşüm, yeni CLAHE, yeni maske, ayrı 3x büyütme)
+karşı ölçmek ve core/ocr_preprocess çıktılarının piksel piksel aynı olduğunu
+doğrulamak. Yollar sırayla --repeats kez ölçülür ve en iyi tur raporlanır
+(tek ölçüm paylaşımlı makinede ±%15 oynayabiliyor; gürültü yalnızca
+yavaşlatır); OpenCV tek thread'de çalışır.
+
+Kullanım:
+    python benchmark_ocr_preprocess.py                       # sentetik balonlar
+    python benchmark_ocr_preprocess.py --crops kirpintilar/ --runs 20 --repeats 9
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from core.ocr_preprocess import METHODS, binarize, preprocess_batch
+from core.warmup import synthetic_balloon
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+
+
+# ==========================================
+# 🐢 ESKİ YOL (referans)
+# ==========================================
+
+def _legacy_gray(image: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image.copy()
+
+
+def _legacy_crop_center(image: np.ndarray, ratio: float = 0.6) -> np.ndarray:
+    h, w = image.shape[:2]
+    margin_x = max(int(w * (1 - ratio) / 2), 3)
+    margin_y = max(int(h * (1 - ratio) / 2), 3)
+    cropped = image[margin_y:h - margin_y, margin_x:w - margin_x]
+    if cropped.shape[0] < 10 or cropped.shape[1] < 10:
+        return image
+    return cropped
+
+
+def _legacy_inverted(image: np.ndarray) -> np.ndarray:
+    inverted = cv2.bitwise_not(_legacy_gray(image))
+    enhanced = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(inverted)
+    denoised = cv2.medianBlur(enhanced, 3)
+    _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return cv2.resize(binary, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+
+
+def _legacy_adaptive(image: np.ndarray) -> np.ndarray:
+    binary = cv2.adaptiveThreshold(
+        _legacy_gray(image), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2
+    )
+    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, np.ones((2, 2), np.uint8))
+    return cv2.resize(binary, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+
+
+def _legacy_circle_mask(image: np.ndarray) -> np.ndarray:
+    h, w = image.shape[:2]
+    gray = _legacy_gray(image)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    cv2.circle(mask, (w // 2, h // 2), int(min(w, h) * 0.4), 255, -1)
+    masked = cv2.bitwise_and(gray, gray, mask=mask)
+    masked[mask == 0] = 255
+    _, binary = cv2.threshold(cv2.bitwise_not(masked), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return cv2.resize(binary, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+
+
+LEGACY = {
+    "center_inverted": lambda img: _legacy_inverted(_legacy_crop_center(img)),
+    "center_adaptive": lambda img: _legacy_adaptive(_legacy_crop_center(img)),
+    "full_inverted": _legacy_inverted,
+    "mask_circle": _legacy_circle_mask,
+}
+
+
+# ==========================================
+# 🛠️ YARDIMCI FONKSİYONLAR
+# ==========================================
+
+def load_crops(crops_dir: str, count: int) -> List[np.ndarray]:
+    """Klasördeki kırpıntılar ya da farklı boyutlu sentetik balonlar (BGR)."""
+    if crops_dir:
+        paths = sorted(p for p in Path(crops_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        crops = [cv2.imread(str(p), cv2.IMREAD_COLOR) for p in paths[:count or None]]
+        return [crop for crop in crops if crop is not None]
+
+    rng = np.random.default_rng(0)
+    return [
+        synthetic_balloon(str(rng.integers(1, 200)), int(rng.integers(48, 96)))
+        for _ in range(count)
+    ]
+
+
+def time_per_crop(func: Callable[[], object], crops: int, runs: int) -> float:
+    """func'ı runs kez çalıştır (ilk çağrı ısınma), kırpıntı başına µs."""
+    func()
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs / crops * 1e6
+
+
+# ==========================================
+# 🚀 ANA AKIŞ
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR ön işleme kırpıntı başı maliyet karşılaştırması")
+    parser.add_argument("--crops", default="", help="Balon kırpıntıları klasörü (boş = sentetik)")
+    parser.add_argument("--count", type=int, default=80, help="Kırpıntı sayısı (sayfa başı balon)")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=7, help="Ölçüm turu (en iyisi raporlanır)")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+
+    crops = load_crops(args.crops, args.count)
+    if not crops:
+        logger.error(f"❌ '{args.crops}' içinde kırpıntı bulunamadı.")
+        sys.exit(2)
+
+    all_methods = [METHODS] * len(crops)
+
+    # Parity: her varyant eski yolla piksel piksel aynı olmalı
+    mismatches = 0
+    for crop, variants in zip(crops, preprocess_batch(crops, all_methods)):
+        for name, processed in variants:
+            if not np.array_equal(processed, LEGACY[name](crop)):
+                mismatches += 1
+
+    paths = {
+        "legacy": lambda: [LEGACY[name](crop) for crop in crops for name in METHODS],
+        "binarize": lambda: [binarize(crop, METHODS) for crop in crops],
+        "single": lambda: [preprocess_batch([crop], [METHODS]) for crop in crops],
+        "batch": lambda: preprocess_batch(crops, all_methods),
+    }
+    # Yollar her turda sırayla ölçülür: yavaşlayan makine hepsini aynı etkiler
+    samples = {name: [] for name in paths}
+    for _ in range(max(1, args.repeats)):
+        for name, func in paths.items():
+            samples[name].append(time_per_crop(func, len(crops), args.runs))
+    legacy_us, binarize_us, single_us, batch_us = (min(samples[name]) for name in paths)
+
+    logger.info("-" * 60)
+    logger.info(f"{len(crops)} kırpıntı x {len(METHODS)} varyant, {args.runs} tekrar x {args.repeats} tur (en iyi)")
+    logger.info(f"Eski yol (yöntem başına)   : {legacy_us:8.1f} µs/kırpıntı")
+    logger.info(f"Yalnız ikili (büyütmesiz)  : {binarize_us:8.1f} µs/kırpıntı")
+    logger.info(f"Tek kırpıntılı çağrı       : {single_us:8.1f} µs/kırpıntı (x{legacy_us / single_us:.2f})")
+    logger.info(f"Sayfa başına tek tuval     : {batch_us:8.1f} µs/kırpıntı (x{legacy_us / batch_us:.2f})")
+
+    if mismatches:
+        logger.error(f"❌ PARITY HATASI: {mismatches} varyant eski yoldan farklı.")
+        sys.exit(1)
+    logger.success("✅ PARITY OK: tüm varyantlar eski yolla piksel piksel aynı.")
+
+
+if __name__ == "__main__":
+    main()
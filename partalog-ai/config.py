@@ -28,6 +28,29 @@ class Settings(BaseSettings):
     # .env dosyasında hangisi varsa onu alır.
     GEMINI_API_KEY: str = Field(default="", validation_alias="GOOGLE_API_KEY")
     GEMINI_VISUAL_MODEL: str = Field(default="gemini-3-pro-preview")
+    
+    # GEMINI HTTP BAĞLANTI HAVUZU (tüm REST çağrıları tek oturumu paylaşır)
+    GEMINI_HTTP_MAX_CONNECTIONS: int = Field(default=64)  # Toplam açık bağlantı
+    GEMINI_HTTP_MAX_PER_HOST: int = Field(default=32)     # Gemini host'una bağlantı (embedding havuzu da)
+    GEMINI_HTTP_KEEPALIVE_S: float = Field(default=60)    # Boştaki bağlantı havuzda kalma süresi
+    GEMINI_HTTP_DNS_TTL_S: int = Field(default=300)       # DNS önbelleği
+    GEMINI_HTTP_TIMEOUT_S: float = Field(default=300)     # İstek başına toplam süre
+    
+    # GEMINI HIZ SINIRLAYICI (tüm Gemini çağrıları tek süreç geneli kuyruktan geçer)
+    GEMINI_RPM: int = Field(default=1000)                 # Dakikalık istek bütçesi (0 = sınırsız)
+    GEMINI_TPM: int = Field(default=1000000)              # Dakikalık token bütçesi (0 = sınırsız)
+    GEMINI_MAX_CONCURRENCY: int = Field(default=16)       # AIMD üst sınırı
+    GEMINI_MIN_CONCURRENCY: int = Field(default=1)        # 429/503 sonrası en düşük eşzamanlılık
+    GEMINI_INITIAL_CONCURRENCY: int = Field(default=8)    # Başlangıç (0 = üst sınır)
+    GEMINI_MAX_QUEUE: int = Field(default=0)              # Bekleyen istek sınırı (0 = sınırsız)
+    GEMINI_BACKOFF_S: float = Field(default=2.0)          # Retry-After yoksa ilk bekleme (ardışık hatalarda 2 katı)
+    GEMINI_MAX_BACKOFF_S: float = Field(default=60.0)     # Bekleme üst sınırı
+    
+    # GEMINI YANIT ÖNBELLEĞİ (görsel hash'i + model + prompt sürümü + config -> ham yanıt, SQLite)
+    GEMINI_CACHE_ENABLED: bool = Field(default=True)
+    GEMINI_CACHE_PATH: str = Field(default="data/gemini_cache.sqlite3")  # Boş = kapalı
+    GEMINI_CACHE_TTL_DAYS: float = Field(default=30)      # Kayıt geçerlilik süresi (0 = süresiz)
+    GEMINI_CACHE_MAX_MB: int = Field(default=512)         # Yanıt metinleri toplam boyutu
 
     # --- VERİTABANI (YENİ EKLENDİ) ---
     # train_dictionary.py artık şifreyi buradan okuyacak.
@@ -38,9 +61,83 @@ class Settings(BaseSettings):
     YOLO_MODEL_PATH: str = Field(default="models/best.pt")
     YOLO_CONFIDENCE: float = Field(default=0.25)
     YOLO_IMG_SIZE: int = Field(default=1280)
+    YOLO_BACKEND: str = Field(default="torch")  # torch | onnx | openvino (CPU için optimize graf)
+    YOLO_PRECISION: str = Field(default="fp32")  # fp32 | int8 (int8: YOLO_BACKEND=onnx gerekir)
+    YOLO_INT8_MODEL_PATH: str = Field(default="")  # Boş = models/best.int8.onnx
+    
+    # YOLO DÖŞEMELİ ÇIKARIM (4000-6000 px çizimlerde küçük balonlar kaybolmasın)
+    YOLO_MODE: str = Field(default="full")          # full | tiled | auto | cascade (auto: büyük sayfalarda tiled)
+    YOLO_TILE_SIZE: int = Field(default=1280)       # Döşeme kenarı (px)
+    YOLO_TILE_OVERLAP: float = Field(default=0.2)   # Döşemeler arası örtüşme oranı
+    YOLO_TILE_MIN_SIDE: int = Field(default=3000)   # auto modda tiled'a geçilen uzun kenar
+    YOLO_TILE_BATCH: int = Field(default=4)         # Modele aynı anda verilen döşeme (bellek sınırı)
+    YOLO_TILE_NMS_IOU: float = Field(default=0.5)   # Döşemeler arası NMS eşiği
+    
+    # YOLO KADEMELİ ÇIKARIM (YOLO_MODE=cascade: düşük çözünürlükte tara, balon bölgelerini incele)
+    YOLO_CASCADE_TIERS: str = Field(default="640,1280")        # imgsz kademeleri (kaba -> ince)
+    YOLO_CASCADE_AMBIGUOUS_CONF: float = Field(default=0.1)    # Bu eşik üstü belirsiz kutular da incelenir
+    YOLO_CASCADE_ROI_PADDING: float = Field(default=1.0)       # ROI genişletme (kutu kenarının katı)
+    YOLO_CASCADE_MAX_ROI_FRACTION: float = Field(default=0.6)  # Aşılırsa ince kademe tam sayfada çalışır
+    
+    # YOLO MİKRO-BATCH (eşzamanlı /detect isteklerini birleştirir)
+    YOLO_BATCHING_ENABLED: bool = Field(default=True)
+    YOLO_BATCH_MAX_SIZE: int = Field(default=8)
+    YOLO_BATCH_MAX_WAIT_MS: float = Field(default=10.0)
+    
+    # HOTSPOT API
+    HOTSPOT_BATCH_MAX_FILES: int = Field(default=32)  # /detect-batch tek istekteki maksimum sayfa
+    HOTSPOT_STREAM_OCR_CHUNK: int = Field(default=16)  # /detect-stream'de tek OCR çağrısındaki balon (etiketler bu gruplarla akar)
+    
+    # HOTSPOT SONUÇ ÖNBELLEĞİ (aynı sayfa tekrar gelirse YOLO + OCR atlanır)
+    HOTSPOT_CACHE_ENABLED: bool = Field(default=True)
+    HOTSPOT_CACHE_MAX_ITEMS: int = Field(default=512)     # Bellek katmanı (sayfa sonucu)
+    HOTSPOT_CACHE_DIR: str = Field(default="")            # Boş = disk katmanı kapalı
+    HOTSPOT_CACHE_DISK_MAX_MB: int = Field(default=1024)  # Disk katmanı boyut sınırı
+    
+    # TABLO: PDF DOKÜMAN ÖNBELLEĞİ (sayfa başına /extract'ta PDF yeniden açılmaz, sonraki sayfalar önceden render edilir)
+    DOCUMENT_CACHE_ENABLED: bool = Field(default=True)
+    DOCUMENT_CACHE_MAX_DOCUMENTS: int = Field(default=8)  # Açık tutulan PDF sayısı
+    DOCUMENT_CACHE_MAX_MB: int = Field(default=512)       # PDF'ler + render edilmiş sayfalar toplamı
+    DOCUMENT_PREFETCH_PAGES: int = Field(default=2)       # İstenen sayfadan sonra arka planda hazırlanan sayfa
+    TABLE_MAX_CONCURRENCY: int = Field(default=4)         # /extract-pages'te aynı anda Gemini'ye giden sayfa
     
     # OCR (EasyOCR - Hotspot için)
     OCR_USE_GPU: bool = Field(default=False)
+    OCR_BATCH_SIZE: int = Field(default=64)  # Tek OCR batch'indeki kırpıntı varyantı (tespit + tanıma)
+    OCR_RECOGNITION_ONLY: bool = Field(default=False)  # CRAFT tespitini atla, kırpıntıyı tek satır olarak tanı
+    OCR_ADAPTIVE: bool = Field(default=False)              # Profil bazlı yöntem sırası + erken çıkış
+    OCR_EARLY_EXIT_CONFIDENCE: float = Field(default=0.85)  # Adaptif modda tek yöntemin yeterli güveni
+    OCR_ALLOWED_LABEL_CONFIDENCE: float = Field(default=0.5)  # allowed_labels'tan okuma bu güvenle OCR'ı durdurur
+    
+    # OCR HIZLI RAKAM KATMANI (kNN; EasyOCR yalnızca emin olunamayan balonlarda çalışır)
+    OCR_FAST_TIER_ENABLED: bool = Field(default=False)
+    OCR_FAST_TIER_MODEL: str = Field(default="models/digit_classifier.npz")  # train_digit_classifier.py çıktısı
+    OCR_FAST_TIER_CONFIDENCE: float = Field(default=0.9)
+    OCR_SAMPLE_DIR: str = Field(default="")                # Boş = örnek biriktirme kapalı
+    OCR_SAMPLE_CONFIDENCE: float = Field(default=0.9)      # EasyOCR bu güvenle okuduysa örnek kaydedilir
+    OCR_SAMPLE_MAX_PER_LABEL: int = Field(default=200)
+    
+    # OCR KIRPINTI ÖNBELLEĞİ (pHash; aynı katalogdaki neredeyse aynı balonlar OCR'sız)
+    OCR_CACHE_ENABLED: bool = Field(default=True)
+    OCR_CACHE_MAX_ITEMS: int = Field(default=4096)         # Katalog başına kayıt
+    OCR_CACHE_MAX_DISTANCE: int = Field(default=3)         # İsabet için rakam başına maks. Hamming mesafesi (64 bit)
+    OCR_CACHE_MIN_CONFIDENCE: float = Field(default=0.9)   # Yalnızca bu güvenin üstündeki okumalar saklanır
+    OCR_CACHE_DIR: str = Field(default="")                 # Boş = kalıcılık kapalı (katalog başına .npz)
+    
+    # OCR SÜREÇ HAVUZU (her worker kendi EasyOCR Reader'ı; sayfanın kırpıntıları worker'lara bölünür)
+    OCR_WORKERS: int = Field(default=0)               # 0 = kapalı (OCR ana süreçte, INFERENCE_OCR_REPLICAS ile)
+    OCR_WORKER_TORCH_THREADS: int = Field(default=1)  # Worker başına torch/OpenCV thread (workers x threads <= çekirdek)
+    OCR_WORKER_MIN_CHUNK: int = Field(default=4)      # Bir worker'a gönderilen en az kırpıntı
+    
+    # INFERENCE EXECUTOR (YOLO/OCR event loop dışında çalışır)
+    INFERENCE_YOLO_REPLICAS: int = Field(default=1)   # Paralel YOLO örneği (her biri ayrı bellek)
+    INFERENCE_OCR_REPLICAS: int = Field(default=1)    # Paralel EasyOCR örneği
+    INFERENCE_MAX_PENDING: int = Field(default=64)    # Model başına çalışan + bekleyen istek sınırı (fazlası 503)
+    INFERENCE_TORCH_THREADS: int = Field(default=0)   # 0 = torch varsayılanı
+    
+    # WARM-UP (açılışta sentetik sayfalarla ısıtma; durum /ready'den izlenir)
+    WARMUP_ENABLED: bool = Field(default=True)
+    WARMUP_ITERATIONS: int = Field(default=2)  # Replika başına sentetik çağrı sayısı
     
     # PADDLEOCR (Yedek)
     PADDLE_USE_GPU: bool = Field(default=False)
@@ -80,6 +177,13 @@ class Settings(BaseSettings):
         if self.GEMINI_VISUAL_MODEL:
             self.GEMINI_VISUAL_MODEL = _clean_env(self.GEMINI_VISUAL_MODEL)
 
+        if self.YOLO_BACKEND:
+            self.YOLO_BACKEND = _clean_env(self.YOLO_BACKEND).lower()
+        if self.YOLO_PRECISION:
+            self.YOLO_PRECISION = _clean_env(self.YOLO_PRECISION).lower()
+        if self.YOLO_MODE:
+            self.YOLO_MODE = _clean_env(self.YOLO_MODE).lower()
+
         # DB
         if self.DB_CONNECTION_STRING:
             self.DB_CONNECTION_STRING = _clean_env(self.DB_CONNECTION_STRING)
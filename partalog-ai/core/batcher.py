@@ -0,0 +1,213 @@
+"""
+Detection Batcher - Eşzamanlı hotspot isteklerini tek YOLO batch'inde birleştirir.
+Kısa bir pencere (max_wait_ms) boyunca gelen istekleri toplar, tek
+detect_many() çağrısıyla işler ve sonuçları bekleyen isteklere dağıtır.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+from core.detector import DetectionSet, HotspotDetector
+from core.executor import InferenceExecutor
+
+
+@dataclass
+class _PendingRequest:
+    """Batch'e girmeyi bekleyen tek istek."""
+    image: np.ndarray
+    confidence: Optional[float]
+    future: asyncio.Future
+
+
+class DetectionBatcher:
+    """
+    HotspotDetector önünde dinamik mikro-batch zamanlayıcı.
+    API değişmeden yük altında çekirdek başına daha yüksek verim sağlar.
+    """
+
+    def __init__(
+        self,
+        detector: HotspotDetector,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        executor: Optional[InferenceExecutor] = None
+    ):
+        """
+        Args:
+            detector: Paylaşılan HotspotDetector örneği
+            max_batch_size: Tek YOLO çağrısındaki maksimum görüntü sayısı
+            max_wait_ms: İlk istekten sonra batch'in dolması için beklenen süre
+            executor: Varsa batch'ler YOLO replikalarında paralel çalışır
+        """
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.executor = executor
+
+        # Aynı anda çalışan batch sayısı = YOLO replika sayısı
+        if executor is not None and executor.has("yolo"):
+            self.max_concurrent_batches = len(executor.replicas("yolo"))
+        else:
+            self.max_concurrent_batches = 1
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._inflight: set = set()
+
+        self._stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+
+    async def start(self):
+        """Arka plan batch döngüsünü başlat (event loop içinde çağrılmalı)."""
+        if self._worker is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"YOLO batcher başladı (max_batch={self.max_batch_size}, "
+            f"max_wait={self.max_wait * 1000:.1f}ms)"
+        )
+
+    async def stop(self):
+        """Döngüyü durdur, bekleyen istekleri hata ile sonlandır."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        for task in list(self._inflight):
+            task.cancel()
+
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("YOLO batcher durduruldu"))
+
+    async def detect(
+        self,
+        image: np.ndarray,
+        confidence: Optional[float] = None
+    ) -> DetectionSet:
+        """
+        Görüntüyü sıradaki batch'e ekle ve sonucunu bekle.
+
+        Args:
+            image: OpenCV formatında görüntü (BGR)
+            confidence: Opsiyonel güven eşiği
+
+        Returns:
+            DetectionSet (HotspotDetector.detect ile aynı)
+        """
+        if self._worker is None:
+            raise RuntimeError("YOLO batcher başlatılmamış")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(image, confidence, future))
+
+        return await future
+
+    async def _run(self):
+        """İstekleri topla ve batch halinde işle."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # Tüm replikalar meşgulken istekler kuyrukta birikir (daha büyük batch)
+            await self._batch_slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Kuyrukta hazır bekleyenleri hemen al
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, task: asyncio.Task):
+        """Batch tamamlandı: slotu serbest bırak."""
+        self._inflight.discard(task)
+        self._batch_slots.release()
+
+    async def _dispatch(self, batch: List[_PendingRequest]):
+        """Batch'i çalıştır; kapanışta iptal edilirse bekleyenleri hata ile bitir."""
+        try:
+            await self._process(batch)
+        except asyncio.CancelledError:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError("YOLO batcher durduruldu"))
+            raise
+
+    async def _process(self, batch: List[_PendingRequest]):
+        """Batch'i çalıştır ve sonuçları isteklere dağıt."""
+        # predict() tek bir conf alır; farklı eşikler ayrı çağrılara bölünür
+        groups: Dict[Optional[float], List[_PendingRequest]] = {}
+        for request in batch:
+            if request.future.cancelled():
+                continue
+            groups.setdefault(request.confidence, []).append(request)
+
+        loop = asyncio.get_running_loop()
+
+        for confidence, requests in groups.items():
+            images = [r.image for r in requests]
+
+            try:
+                if self.executor is not None and self.executor.has("yolo"):
+                    results = await self.executor.run(
+                        "yolo", HotspotDetector.detect_many, images, confidence
+                    )
+                else:
+                    results = await loop.run_in_executor(
+                        None, self.detector.detect_many, images, confidence
+                    )
+            except Exception as e:
+                logger.error(f"YOLO batch hatası ({len(requests)} istek): {e}")
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            for request, detections in zip(requests, results):
+                if not request.future.done():
+                    request.future.set_result(detections)
+
+            self._stats["requests"] += len(requests)
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(requests))
+
+    def get_info(self) -> dict:
+        """Batcher ayarlarını ve istatistiklerini döndür."""
+        batches = self._stats["batches"]
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "requests": self._stats["requests"],
+            "batches": batches,
+            "largest_batch": self._stats["largest_batch"],
+            "avg_batch_size": round(self._stats["requests"] / batches, 2) if batches else 0.0
+        }
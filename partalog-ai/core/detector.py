@@ -7,14 +7,31 @@ Teknik resimlerdeki parça numarası işaretlerini tespit eder.
 
 from ultralytics import YOLO
 from pathlib import Path
-from typing import List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import shutil
+import time
 import numpy as np
 import cv2
 from loguru import logger
 
 
-@dataclass
+# Desteklenen çıkarım backend'leri -> ultralytics export formatı
+BACKEND_FORMATS = {
+    "torch": None,
+    "onnx": "onnx",
+    "openvino": "openvino",
+}
+
+# Çıkarım modları: full = tüm sayfa tek seferde, tiled = örtüşen döşemeler,
+# auto = uzun kenarı TilingConfig.min_side üstündeki sayfalarda tiled,
+# cascade = düşük çözünürlükte tarama + yalnızca bulunan bölgelerde yüksek çözünürlük
+DETECTION_MODES = ("full", "tiled", "auto", "cascade")
+
+
+@dataclass(slots=True)
 class Detection:
     """Tek bir tespit sonucu."""
     x1: float          # Sol üst köşe X
@@ -72,6 +89,323 @@ class Detection:
             "class_name": self.class_name
         }
 
+class DetectionSet:
+    """
+    Sütunlu (columnar) tespit kümesi.
+    
+    Kutular, güven skorları ve sınıflar YOLO çıktısındaki NumPy dizileri
+    olarak tutulur; sıralama, filtreleme, normalizasyon ve kırpma
+    pencereleri kutu başına Python döngüsü olmadan hesaplanır. Uyumluluk
+    için liste gibi davranır: len(), indeksleme ve iterasyon Detection
+    nesneleri döndürür.
+    """
+    
+    __slots__ = ("boxes", "confidences", "class_ids", "class_names")
+    
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        confidences: np.ndarray,
+        class_ids: np.ndarray,
+        class_names: Optional[Dict[int, str]] = None
+    ):
+        """
+        Args:
+            boxes: (N, 4) xyxy piksel koordinatları
+            confidences: (N,) güven skorları
+            class_ids: (N,) sınıf ID'leri
+            class_names: Sınıf ID -> isim
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+        self.class_ids = np.asarray(class_ids, dtype=np.int64).reshape(-1)
+        self.class_names = class_names or {}
+    
+    @classmethod
+    def empty(cls, class_names: Optional[Dict[int, str]] = None) -> "DetectionSet":
+        """Boş küme."""
+        return cls(np.zeros((0, 4)), np.zeros(0), np.zeros(0), class_names)
+    
+    @classmethod
+    def from_result(cls, result, class_names: Optional[Dict[int, str]] = None) -> "DetectionSet":
+        """ultralytics sonucundan tek bir cihaz -> NumPy kopyasıyla küme oluştur."""
+        if result.boxes is None or len(result.boxes) == 0:
+            return cls.empty(class_names)
+        
+        # data: (N, 6) = x1, y1, x2, y2, conf, cls
+        data = result.boxes.data.cpu().numpy()
+        return cls(data[:, :4], data[:, 4], data[:, 5], class_names)
+    
+    @classmethod
+    def from_detections(
+        cls,
+        detections: Iterable[Detection],
+        class_names: Optional[Dict[int, str]] = None
+    ) -> "DetectionSet":
+        """Detection listesinden küme oluştur."""
+        detections = list(detections)
+        names = dict(class_names or {})
+        names.update({d.class_id: d.class_name for d in detections})
+        return cls(
+            [d.bbox for d in detections],
+            [d.confidence for d in detections],
+            [d.class_id for d in detections],
+            names
+        )
+    
+    @classmethod
+    def concat(
+        cls,
+        sets: Sequence["DetectionSet"],
+        class_names: Optional[Dict[int, str]] = None
+    ) -> "DetectionSet":
+        """Kümeleri uç uca ekle."""
+        if not sets:
+            return cls.empty(class_names)
+        return cls(
+            np.concatenate([s.boxes for s in sets]),
+            np.concatenate([s.confidences for s in sets]),
+            np.concatenate([s.class_ids for s in sets]),
+            class_names or sets[0].class_names
+        )
+    
+    # ---------- Liste uyumluluğu ----------
+    
+    def __len__(self) -> int:
+        return len(self.confidences)
+    
+    def __iter__(self) -> Iterator[Detection]:
+        names = self.class_names
+        for (x1, y1, x2, y2), conf, cls in zip(
+            self.boxes.tolist(), self.confidences.tolist(), self.class_ids.tolist()
+        ):
+            yield Detection(x1, y1, x2, y2, conf, cls, names.get(cls, "unknown"))
+    
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[Detection, "DetectionSet"]:
+        if isinstance(index, (int, np.integer)):
+            x1, y1, x2, y2 = self.boxes[index].tolist()
+            cls = int(self.class_ids[index])
+            return Detection(
+                x1, y1, x2, y2, float(self.confidences[index]), cls,
+                self.class_names.get(cls, "unknown")
+            )
+        return DetectionSet(
+            self.boxes[index], self.confidences[index], self.class_ids[index], self.class_names
+        )
+    
+    def __repr__(self) -> str:
+        return f"DetectionSet({len(self)} tespit)"
+    
+    # ---------- Vektörel işlemler ----------
+    
+    @property
+    def widths(self) -> np.ndarray:
+        return self.boxes[:, 2] - self.boxes[:, 0]
+    
+    @property
+    def heights(self) -> np.ndarray:
+        return self.boxes[:, 3] - self.boxes[:, 1]
+    
+    @property
+    def centers(self) -> np.ndarray:
+        """(N, 2) merkez noktaları."""
+        return (self.boxes[:, :2] + self.boxes[:, 2:]) / 2
+    
+    @property
+    def areas(self) -> np.ndarray:
+        return self.widths * self.heights
+    
+    def sorted(self, descending: bool = True) -> "DetectionSet":
+        """Güven skoruna göre sıralı kopya (eşit skorlarda sıra korunur)."""
+        scores = -self.confidences if descending else self.confidences
+        return self[np.argsort(scores, kind="stable")]
+    
+    def filter(
+        self,
+        min_confidence: Optional[float] = None,
+        class_ids: Optional[Iterable[int]] = None
+    ) -> "DetectionSet":
+        """Güven eşiği ve/veya sınıfa göre süz."""
+        mask = np.ones(len(self), dtype=bool)
+        if min_confidence is not None:
+            mask &= self.confidences >= min_confidence
+        if class_ids is not None:
+            mask &= np.isin(self.class_ids, list(class_ids))
+        return self[mask]
+    
+    def offset(self, dx: float, dy: float) -> "DetectionSet":
+        """Kutuları (dx, dy) kadar kaydır (döşeme -> sayfa koordinatı)."""
+        return DetectionSet(
+            self.boxes + np.array([dx, dy, dx, dy], dtype=np.float32),
+            self.confidences, self.class_ids, self.class_names
+        )
+    
+    def normalized(self, img_width: int, img_height: int) -> np.ndarray:
+        """(N, 4) yüzde koordinatları: left, top, width, height."""
+        scale = np.array([img_width, img_height], dtype=np.float32)
+        return np.hstack([
+            self.boxes[:, :2] / scale,
+            np.stack([self.widths / img_width, self.heights / img_height], axis=1)
+        ]) * 100
+    
+    def crop_rects(self, img_width: int, img_height: int, padding: int = 0) -> np.ndarray:
+        """
+        (N, 4) tamsayı kırpma pencereleri: padding eklenmiş ve görüntü
+        sınırına kırpılmış x1, y1, x2, y2.
+        """
+        rects = self.boxes.astype(np.int64)
+        rects[:, :2] -= padding
+        rects[:, 2:] += padding
+        np.clip(rects[:, 0::2], 0, img_width, out=rects[:, 0::2])
+        np.clip(rects[:, 1::2], 0, img_height, out=rects[:, 1::2])
+        return rects
+    
+    def to_dicts(self) -> List[dict]:
+        """Detection.to_dict() listesi."""
+        return [det.to_dict() for det in self]
+
+
+@dataclass
+class TilingConfig:
+    """Döşemeli (tiled) çıkarım ayarları."""
+    tile_size: int = 1280      # Döşeme kenarı (px, küçültülmeden modele verilir)
+    overlap: float = 0.2       # Komşu döşemeler arası örtüşme oranı
+    min_side: int = 3000       # auto modda tiled'a geçilen uzun kenar (px)
+    batch_size: int = 4        # Modele aynı anda verilen döşeme sayısı
+    nms_iou: float = 0.5       # Döşemeler arası NMS IoU eşiği
+
+
+@dataclass
+class CascadeConfig:
+    """Kaba -> ince kademeli (cascade) çıkarım ayarları."""
+    tiers: Tuple[int, ...] = (640, 1280)  # imgsz kademeleri (ilki tam sayfa, sonrakiler ROI)
+    ambiguous_confidence: float = 0.1     # Bu eşiğin üstündeki belirsiz kutular da ROI olur
+    roi_padding: float = 1.0              # ROI genişletme (kutu kenarının katı)
+    max_roi_fraction: float = 0.6         # ROI'ler sayfanın bu oranını aşarsa tam sayfa çalışılır
+
+
+def tile_windows(
+    width: int,
+    height: int,
+    tile_size: int,
+    overlap: float
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Sayfayı örtüşen döşemelere böl.
+    Son satır/sütun sayfa kenarına hizalanır, böylece döşemeler taşmaz.
+    
+    Returns:
+        (x1, y1, x2, y2) döşeme pencereleri
+    """
+    step = max(1, int(tile_size * (1 - overlap)))
+    
+    def starts(length: int) -> List[int]:
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size + 1, step))
+        if positions[-1] + tile_size < length:
+            positions.append(length - tile_size)
+        return positions
+    
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def merge_tile_detections(
+    detections: DetectionSet,
+    truncated: np.ndarray,
+    iou_threshold: float = 0.5,
+    containment: float = 0.85
+) -> DetectionSet:
+    """
+    Döşemelerden gelen tespitleri sınıf bazlı NMS ile birleştir.
+    
+    Örtüşme bölgesindeki aynı balon iki döşemede de bulunur; döşeme
+    kenarında kesilen kopyası tam kutunun içinde kaldığı için IoU'su düşük
+    olabilir, bu yüzden küçük kutunun alanına göre kapsama oranı da bakılır.
+    Kesik kutular, tam kopyalarından sonra değerlendirilir.
+    
+    Args:
+        detections: Sayfa koordinatlarındaki tespitler
+        truncated: Her tespit için döşeme kenarına değiyor mu
+        iou_threshold: Bu IoU üstündeki kutular bastırılır
+        containment: Kesişim / küçük kutu alanı bu değerin üstündeyse bastırılır
+    """
+    if not len(detections):
+        return detections
+    
+    boxes = detections.boxes
+    classes = detections.class_ids
+    areas = detections.areas
+    
+    order = np.lexsort((-detections.confidences, np.asarray(truncated, dtype=bool)))
+    suppressed = np.zeros(len(detections), dtype=bool)
+    keep = []
+    
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        
+        w = np.clip(np.minimum(boxes[i, 2], boxes[:, 2]) - np.maximum(boxes[i, 0], boxes[:, 0]), 0, None)
+        h = np.clip(np.minimum(boxes[i, 3], boxes[:, 3]) - np.maximum(boxes[i, 1], boxes[:, 1]), 0, None)
+        inter = w * h
+        iou = inter / np.maximum(areas[i] + areas - inter, 1e-9)
+        ios = inter / np.maximum(np.minimum(areas[i], areas), 1e-9)
+        
+        suppressed |= (classes == classes[i]) & ((iou > iou_threshold) | (ios > containment))
+    
+    return detections[np.array(keep, dtype=np.int64)]
+
+
+def cluster_rois(
+    detections: DetectionSet,
+    width: int,
+    height: int,
+    padding: float = 1.0,
+    min_padding: int = 32
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Tespitleri genişletip çakışan bölgeleri birleştirerek ROI'lere ayır.
+    Balonlar genelde tek bir montaj çiziminin çevresinde toplandığı için
+    sayfa başına birkaç ROI çıkar; boş kenar ve tablolar atlanır.
+    
+    Returns:
+        (x1, y1, x2, y2) ROI pencereleri (sayfa koordinatlarında)
+    """
+    pad = np.maximum(min_padding, np.maximum(detections.widths, detections.heights) * padding)
+    boxes = detections.boxes
+    rects = np.stack([
+        np.maximum(0.0, boxes[:, 0] - pad),
+        np.maximum(0.0, boxes[:, 1] - pad),
+        np.minimum(float(width), boxes[:, 2] + pad),
+        np.minimum(float(height), boxes[:, 3] + pad)
+    ], axis=1).tolist()
+    
+    # Birleşen bölge yeni çakışmalar doğurabilir; sabitlenene kadar tekrarla
+    merged = True
+    while merged:
+        merged = False
+        clusters = []
+        for rect in rects:
+            for cluster in clusters:
+                if (rect[0] < cluster[2] and cluster[0] < rect[2]
+                        and rect[1] < cluster[3] and cluster[1] < rect[3]):
+                    cluster[0] = min(cluster[0], rect[0])
+                    cluster[1] = min(cluster[1], rect[1])
+                    cluster[2] = max(cluster[2], rect[2])
+                    cluster[3] = max(cluster[3], rect[3])
+                    merged = True
+                    break
+            else:
+                clusters.append(list(rect))
+        rects = clusters
+    
+    return [(int(x1), int(y1), int(np.ceil(x2)), int(np.ceil(y2))) for x1, y1, x2, y2 in rects]
+
 
 class HotspotDetector:
     """
@@ -83,17 +417,62 @@ class HotspotDetector:
         self,
         model_path: str,
         confidence:  float = 0.25,
-        img_size: int = 1280
+        img_size: int = 1280,
+        backend: str = "torch",
+        precision: str = "fp32",
+        int8_model_path: Optional[str] = None,
+        mode: str = "full",
+        tiling: Optional[TilingConfig] = None,
+        cascade: Optional[CascadeConfig] = None
     ):
         """
         Args:
             model_path: YOLO model dosyası yolu (best.pt)
             confidence: Minimum güven eşiği (0-1)
             img_size: Tahmin için görüntü boyutu
+            backend: Çıkarım backend'i (torch | onnx | openvino)
+            precision: fp32 | int8 (int8 yalnızca onnx backend'i ile)
+            int8_model_path: INT8 model yolu (varsayılan: best.int8.onnx)
+            mode: Çıkarım modu (full | tiled | auto)
+            tiling: Döşemeli çıkarım ayarları (varsayılan: TilingConfig())
+            cascade: Kademeli çıkarım ayarları (varsayılan: CascadeConfig())
         """
         self.model_path = Path(model_path)
         self.confidence = confidence
         self.img_size = img_size
+        self.backend = backend.strip().lower()
+        self.precision = precision.strip().lower()
+        self.mode = mode.strip().lower()
+        self.tiling = tiling or TilingConfig()
+        self.cascade = cascade or CascadeConfig()
+        
+        # Kademe başına kümülatif süre: imgsz -> [çağrı, toplam ms]
+        self._tier_stats: Dict[int, List[float]] = {}
+        self._cascade_fallbacks = 0
+        self._fingerprint: Optional[str] = None
+        self.int8_model_path = (
+            Path(int8_model_path) if int8_model_path else self.int8_path(self.model_path)
+        )
+        
+        if self.backend not in BACKEND_FORMATS:
+            raise ValueError(
+                f"Desteklenmeyen YOLO backend: {backend} "
+                f"(seçenekler: {', '.join(BACKEND_FORMATS)})"
+            )
+        
+        if self.precision not in ("fp32", "int8"):
+            raise ValueError(f"Desteklenmeyen YOLO precision: {precision} (fp32 | int8)")
+        
+        if self.precision == "int8" and self.backend != "onnx":
+            raise ValueError("INT8 detector yalnızca YOLO_BACKEND=onnx ile kullanılabilir")
+        
+        if self.mode not in DETECTION_MODES:
+            raise ValueError(
+                f"Desteklenmeyen YOLO modu: {mode} (seçenekler: {', '.join(DETECTION_MODES)})"
+            )
+        
+        if not self.cascade.tiers:
+            raise ValueError("Cascade için en az bir imgsz kademesi gerekli")
         
         # Model dosyası var mı kontrol et
         if not self.model_path. exists():
@@ -101,9 +480,12 @@ class HotspotDetector:
                 f"YOLO model dosyası bulunamadı:  {self.model_path}"
             )
         
-        # Modeli yükle
-        logger.info(f"YOLO modeli yükleniyor: {self. model_path}")
-        self.model = YOLO(str(self.model_path))
+        # Backend'e uygun ağırlıkları bul (yoksa .pt'den export et)
+        self.weights_path = self._resolve_weights()
+        
+        # Modeli yükle (postprocess/NMS tüm backend'lerde ultralytics'te aynı)
+        logger.info(f"YOLO modeli yükleniyor: {self.weights_path} (backend={self.backend})")
+        self.model = YOLO(str(self.weights_path), task="detect")
         
         # Sınıf isimlerini al
         self.class_names = self.model. names
@@ -112,18 +494,26 @@ class HotspotDetector:
     def detect(
         self,
         image: np.ndarray,
-        confidence: Optional[float] = None
-    ) -> List[Detection]:
+        confidence: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> DetectionSet:
         """
         Görüntüde hotspot tespiti yap.
         
         Args:
             image: OpenCV formatında görüntü (BGR)
             confidence: Opsiyonel güven eşiği (varsayılan:  init'teki değer)
+            timings: Verilirse cascade kademe süreleri (ms) buraya yazılır
         
         Returns: 
-            Detection listesi
+            DetectionSet (güvene göre sıralı, Detection listesi gibi gezilebilir)
         """
+        if self.mode == "cascade":
+            return self.detect_cascade(image, confidence, timings)
+        
+        if self.uses_tiling(image):
+            return self.detect_tiled(image, confidence)
+        
         conf = confidence or self.confidence
         
         # YOLO tahmini
@@ -134,48 +524,249 @@ class HotspotDetector:
             verbose=False
         )
         
-        detections = []
+        detections = DetectionSet.concat(
+            [self._parse_result(result) for result in results], self.class_names
+        )
+        
+        # Güven skoruna göre sırala (yüksekten düşüğe)
+        detections = detections.sorted()
+        
+        logger.debug(f"Tespit edilen hotspot sayısı:  {len(detections)}")
+        
+        return detections
+    
+    def detect_many(
+        self,
+        images: List[np.ndarray],
+        confidence: Optional[float] = None
+    ) -> List[DetectionSet]:
+        """
+        Birden fazla görüntüde tek bir YOLO çağrısıyla hotspot tespiti yap.
+        
+        Sayfalar tek batch halinde modele verilir; ön işleme, dispatch ve
+        model çağrısı maliyeti sayfa başına değil batch başına ödenir.
+        
+        Args:
+            images: OpenCV formatında görüntü listesi (BGR)
+            confidence: Opsiyonel güven eşiği (varsayılan: init'teki değer)
+        
+        Returns:
+            Her görüntü için (aynı sırada) DetectionSet
+        """
+        if not images:
+            return []
+        
+        conf = confidence or self.confidence
+        batch_detections: List[Optional[DetectionSet]] = [None] * len(images)
+        
+        # Büyük sayfalar döşemeli / kademeli yoldan, kalanlar tek batch'te
+        full_indices = [
+            i for i, image in enumerate(images)
+            if self.mode != "cascade" and not self.uses_tiling(image)
+        ]
+        
+        if full_indices:
+            # Liste kaynağı ultralytics tarafında tek batch olarak işlenir
+            results = self.model.predict(
+                source=[images[i] for i in full_indices],
+                conf=conf,
+                imgsz=self.img_size,
+                verbose=False
+            )
+            
+            for i, result in zip(full_indices, results):
+                batch_detections[i] = self._parse_result(result).sorted()
+        
+        for i, image in enumerate(images):
+            if batch_detections[i] is None:
+                batch_detections[i] = self.detect(image, conf)
+        
+        logger.debug(
+            f"Batch tespit: {len(images)} sayfa, "
+            f"{sum(len(d) for d in batch_detections)} hotspot"
+        )
+        
+        return batch_detections
+    
+    def uses_tiling(self, image: np.ndarray) -> bool:
+        """Bu sayfa döşemeli çıkarımla mı işlenecek?"""
+        if self.mode == "tiled":
+            return True
+        if self.mode == "auto":
+            return max(image.shape[:2]) >= self.tiling.min_side
+        return False
+    
+    def detect_tiled(
+        self,
+        image: np.ndarray,
+        confidence: Optional[float] = None
+    ) -> DetectionSet:
+        """
+        Görüntüyü örtüşen döşemelerde tespit et, sonuçları sayfa
+        koordinatlarında döşemeler arası NMS ile birleştir.
+        
+        Döşemeler küçültülmeden tile_size çözünürlüğünde çalışır. Modele
+        aynı anda en fazla tiling.batch_size döşeme verildiği için tepe
+        bellek kullanımı sayfa boyutundan bağımsızdır.
+        
+        Args:
+            image: OpenCV formatında görüntü (BGR)
+            confidence: Opsiyonel güven eşiği
+        
+        Returns:
+            DetectionSet (güvene göre sıralı)
+        """
+        conf = confidence or self.confidence
+        tiling = self.tiling
+        height, width = image.shape[:2]
+        windows = tile_windows(width, height, tiling.tile_size, tiling.overlap)
+        
+        parts, truncated = [], []
+        
+        for start in range(0, len(windows), tiling.batch_size):
+            chunk = windows[start:start + tiling.batch_size]
+            
+            # Döşemeler kopyalanmadan sayfanın görünümü (view) olarak verilir
+            tiles = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in chunk]
+            results = self.model.predict(
+                source=tiles,
+                conf=conf,
+                imgsz=tiling.tile_size,
+                verbose=False
+            )
+            
+            for window, result in zip(chunk, results):
+                tile_detections = self._parse_result(result).offset(*window[:2])
+                parts.append(tile_detections)
+                truncated.append(self._truncated_mask(tile_detections, window, width, height))
+        
+        detections = DetectionSet.concat(parts, self.class_names)
+        merged = merge_tile_detections(
+            detections, np.concatenate(truncated) if truncated else np.zeros(0, bool), tiling.nms_iou
+        ).sorted()
+        
+        logger.debug(
+            f"Döşemeli tespit: {width}x{height}px, {len(windows)} döşeme, "
+            f"{len(detections)} ham -> {len(merged)} hotspot"
+        )
+        
+        return merged
+    
+    def detect_cascade(
+        self,
+        image: np.ndarray,
+        confidence: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> DetectionSet:
+        """
+        Kaba -> ince kademeli tespit.
+        
+        İlk kademe tüm sayfayı düşük imgsz ile tarar. Sonraki her kademe
+        yalnızca bir önceki kademede bulunan veya belirsiz (ambiguous_confidence
+        ile confidence arası) kutuların çevresindeki ROI'leri, tam sayfa o
+        imgsz'de çalışsaydı elde edilecek çözünürlükte yeniden işler.
+        
+        Args:
+            image: OpenCV formatında görüntü (BGR)
+            confidence: Opsiyonel güven eşiği
+            timings: Verilirse "tier_<imgsz>" -> ms süreleri yazılır
+        
+        Returns:
+            DetectionSet (güvene göre sıralı)
+        """
+        conf = confidence or self.confidence
+        cascade = self.cascade
+        probe_conf = min(conf, cascade.ambiguous_confidence)
+        height, width = image.shape[:2]
+        
+        # 1. kademe: tüm sayfa, düşük çözünürlük
+        tier_start = time.perf_counter()
+        detections = self._predict(image, probe_conf, cascade.tiers[0])
+        self._record_tier(cascade.tiers[0], tier_start, timings)
         
-        for result in results:
-            boxes = result.boxes
-            if boxes is None:
-                continue
+        # Sonraki kademeler: yalnızca ROI'ler
+        for imgsz in cascade.tiers[1:]:
+            if not len(detections):
+                break
             
-            for box in boxes: 
-                # Koordinatlar
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                
-                # Güven skoru
-                conf_score = float(box.conf[0])
-                
-                # Sınıf
-                class_id = int(box.cls[0])
-                class_name = self.class_names. get(class_id, "unknown")
-                
-                detection = Detection(
-                    x1=x1,
-                    y1=y1,
-                    x2=x2,
-                    y2=y2,
-                    confidence=conf_score,
-                    class_id=class_id,
-                    class_name=class_name
+            tier_start = time.perf_counter()
+            rois = cluster_rois(detections, width, height, cascade.roi_padding)
+            roi_area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in rois)
+            
+            if roi_area > cascade.max_roi_fraction * width * height:
+                # Balonlar sayfaya yayılmış: parça parça işlemek daha pahalı
+                self._cascade_fallbacks += 1
+                detections = self._predict(image, probe_conf, imgsz)
+            else:
+                scale = imgsz / max(width, height)
+                parts, truncated = [], []
+                for roi in rois:
+                    x1, y1, x2, y2 = roi
+                    roi_imgsz = self._stride_align(max(x2 - x1, y2 - y1) * scale)
+                    found = self._predict(image[y1:y2, x1:x2], probe_conf, roi_imgsz).offset(x1, y1)
+                    parts.append(found)
+                    truncated.append(self._truncated_mask(found, roi, width, height))
+                detections = merge_tile_detections(
+                    DetectionSet.concat(parts, self.class_names),
+                    np.concatenate(truncated),
+                    self.tiling.nms_iou
                 )
-                
-                detections.append(detection)
+            
+            self._record_tier(imgsz, tier_start, timings)
         
-        # Güven skoruna göre sırala (yüksekten düşüğe)
-        detections.sort(key=lambda d: d. confidence, reverse=True)
+        # Belirsiz kutular yalnızca ROI seçimi içindi
+        detections = detections.filter(min_confidence=conf).sorted()
         
-        logger.debug(f"Tespit edilen hotspot sayısı:  {len(detections)}")
+        logger.debug(f"Kademeli tespit: {len(detections)} hotspot ({timings or ''})")
         
         return detections
     
+    def _predict(self, source: np.ndarray, conf: float, imgsz: int) -> DetectionSet:
+        """Tek görüntüde verilen imgsz ile tahmin yap."""
+        results = self.model.predict(source=source, conf=conf, imgsz=imgsz, verbose=False)
+        return DetectionSet.concat([self._parse_result(r) for r in results], self.class_names)
+    
+    @staticmethod
+    def _stride_align(side: float, stride: int = 32) -> int:
+        """imgsz'yi stride katına yuvarla (en az 2 stride)."""
+        return max(2 * stride, int(np.ceil(side / stride)) * stride)
+    
+    def _record_tier(self, imgsz: int, start: float, timings: Optional[Dict[str, float]]):
+        """Kademe süresini istek ve kümülatif istatistiklere yaz."""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stats = self._tier_stats.setdefault(imgsz, [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        if timings is not None:
+            timings[f"tier_{imgsz}"] = round(elapsed_ms, 2)
+    
+    @staticmethod
+    def _truncated_mask(
+        detections: DetectionSet,
+        window: Tuple[int, int, int, int],
+        width: int,
+        height: int,
+        margin: float = 2.0
+    ) -> np.ndarray:
+        """Kutu, sayfa kenarı olmayan bir döşeme kenarına değiyor mu (kesik olabilir)?"""
+        x1, y1, x2, y2 = window
+        boxes = detections.boxes
+        return (
+            ((x1 > 0) & (boxes[:, 0] - x1 <= margin))
+            | ((y1 > 0) & (boxes[:, 1] - y1 <= margin))
+            | ((x2 < width) & (x2 - boxes[:, 2] <= margin))
+            | ((y2 < height) & (y2 - boxes[:, 3] <= margin))
+        )
+    
+    def _parse_result(self, result) -> DetectionSet:
+        """Tek bir YOLO sonucunu DetectionSet'e çevir (kutu başına döngü yok)."""
+        return DetectionSet.from_result(result, self.class_names)
+    
     def detect_from_bytes(
         self,
         image_bytes: bytes,
         confidence: Optional[float] = None
-    ) -> Tuple[List[Detection], np.ndarray]: 
+    ) -> Tuple[DetectionSet, np.ndarray]: 
         """
         Byte array'den görüntü okuyup tespit yap.
         
@@ -184,23 +775,29 @@ class HotspotDetector:
             confidence: Opsiyonel güven eşiği
         
         Returns: 
-            (Detection listesi, OpenCV görüntüsü)
+            (DetectionSet, OpenCV görüntüsü)
         """
-        # Byte'lardan görüntü oluştur
+        image = self.decode_image(image_bytes)
+        
+        detections = self.detect(image, confidence)
+        
+        return detections, image
+    
+    @staticmethod
+    def decode_image(image_bytes: bytes) -> np.ndarray:
+        """Byte array'den OpenCV (BGR) görüntüsü oluştur."""
         nparr = np.frombuffer(image_bytes, np.uint8)
         image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
         if image is None:
             raise ValueError("Görüntü okunamadı")
         
-        detections = self.detect(image, confidence)
-        
-        return detections, image
+        return image
     
     def crop_detections(
         self,
         image: np.ndarray,
-        detections: List[Detection],
+        detections: DetectionSet,
         padding: int = 5
     ) -> List[Tuple[Detection, np.ndarray]]: 
         """
@@ -212,30 +809,154 @@ class HotspotDetector:
             padding:  Kırpma için ek kenar boşluğu
         
         Returns: 
-            (Detection, kırpılmış görüntü) tuple listesi
+            (Detection, kırpılmış görüntü) tuple listesi; kırpıntılar
+            image'ın görünümleridir (değiştirilecekse çağıran kopyalar)
         """
         img_h, img_w = image.shape[:2]
         crops = []
         
-        for det in detections: 
-            # Padding ekle ve sınırları kontrol et
-            x1 = max(0, int(det.x1) - padding)
-            y1 = max(0, int(det.y1) - padding)
-            x2 = min(img_w, int(det.x2) + padding)
-            y2 = min(img_h, int(det.y2) + padding)
-            
+        # Padding eklenmiş ve sınıra kırpılmış pencereler tek seferde
+        rects = detections.crop_rects(img_w, img_h, padding).tolist()
+        
+        for det, (x1, y1, x2, y2) in zip(detections, rects): 
             # Kırp
-            crop = image[y1:y2, x1:x2]. copy()
+            crop = image[y1:y2, x1:x2]
             
             if crop.size > 0:
                 crops.append((det, crop))
         
         return crops
     
+    def fingerprint(self) -> str:
+        """
+        Sonucu etkileyen her şeyin özeti: ağırlık dosyalarının içeriği ve
+        çıkarım ayarları. Sonuç önbelleği anahtarında kullanılır; model
+        dosyası değişince eski sonuçlar kendiliğinden geçersiz olur.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            
+            weights = self.weights_path
+            files = sorted(p for p in weights.rglob("*") if p.is_file()) if weights.is_dir() else [weights]
+            for path in files:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+            
+            digest.update(json.dumps({
+                "backend": self.backend,
+                "precision": self.precision,
+                "confidence": self.confidence,
+                "img_size": self.img_size,
+                "mode": self.mode,
+                "tiling": asdict(self.tiling),
+                "cascade": asdict(self.cascade),
+            }, sort_keys=True).encode("utf-8"))
+            
+            self._fingerprint = digest.hexdigest()
+        
+        return self._fingerprint
+    
+    def _resolve_weights(self) -> Path:
+        """
+        Seçilen backend için ağırlık yolunu döndür.
+        
+        torch: model_path olduğu gibi kullanılır.
+        onnx / openvino: model_path zaten export edilmiş bir graf ise doğrudan
+        yüklenir; .pt ise yanındaki export aranır, yoksa bir kez üretilir
+        (best.onnx, best_openvino_model/). Export'un yanında kaynak .pt'nin
+        hash'i tutulur; best.pt değiştiyse export yenilenir.
+        """
+        # INT8 model kalibrasyon komutuyla üretilir, burada export edilmez
+        if self.precision == "int8":
+            if not self.int8_model_path.exists():
+                raise FileNotFoundError(
+                    f"INT8 model bulunamadı: {self.int8_model_path} "
+                    f"(önce: python quantize_detector.py calibrate --pages <klasör>)"
+                )
+            return self.int8_model_path
+        
+        export_format = BACKEND_FORMATS[self.backend]
+        
+        if export_format is None or self.model_path.suffix != ".pt":
+            return self.model_path
+        
+        exported = self.export_path(self.model_path, self.backend)
+        source_meta = self.export_meta_path(exported)
+        source_hash = self._file_sha256(self.model_path)
+        
+        if exported.exists():
+            try:
+                recorded = json.loads(source_meta.read_text(encoding="utf-8")).get("source_sha256")
+            except (OSError, ValueError):
+                recorded = None
+            if recorded == source_hash:
+                return exported
+            # best.pt değişti (ya da export'un kaynağı bilinmiyor): eski graf sessizce kullanılmasın
+            logger.warning(f"⚠️ {exported.name} güncel {self.model_path.name}'den üretilmemiş, yeniden export ediliyor")
+            if exported.is_dir():
+                shutil.rmtree(exported)
+            else:
+                exported.unlink()
+        
+        logger.info(f"YOLO {self.backend} export ediliyor: {self.model_path} -> {exported}")
+        # dynamic=True: detect_many() batch'leri ve farklı imgsz değerleri için
+        result = YOLO(str(self.model_path)).export(
+            format=export_format,
+            imgsz=self.img_size,
+            dynamic=True,
+            half=False
+        )
+        self.export_meta_path(Path(result)).write_text(
+            json.dumps({"source": self.model_path.name, "source_sha256": source_hash}),
+            encoding="utf-8"
+        )
+        return Path(result)
+    
+    @staticmethod
+    def _file_sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def export_meta_path(exported: Path) -> Path:
+        """Export'un hangi .pt'den üretildiğini tutan dosya (best.onnx -> best.onnx.source.json)."""
+        return exported.with_name(f"{exported.name}.source.json")
+    
+    @staticmethod
+    def export_path(model_path: Path, backend: str) -> Path:
+        """Ultralytics'in export ederken kullandığı varsayılan yol."""
+        if backend == "onnx":
+            return model_path.with_suffix(".onnx")
+        if backend == "openvino":
+            return model_path.parent / f"{model_path.stem}_openvino_model"
+        return model_path
+    
+    @staticmethod
+    def int8_path(model_path: Path) -> Path:
+        """Quantize edilmiş modelin varsayılan yolu (best.pt -> best.int8.onnx)."""
+        return model_path.with_name(f"{model_path.stem}.int8.onnx")
+    
     def get_info(self) -> dict:
         """Model bilgilerini döndür."""
         return {
             "model_path": str(self.model_path),
+            "backend": self.backend,
+            "precision": self.precision,
+            "weights_path": str(self.weights_path),
+            "mode": self.mode,
+            "tiling": asdict(self.tiling),
+            "cascade": {
+                **asdict(self.cascade),
+                "full_page_fallbacks": self._cascade_fallbacks,
+                "avg_tier_ms": {
+                    f"tier_{imgsz}": round(total / calls, 2)
+                    for imgsz, (calls, total) in self._tier_stats.items()
+                }
+            },
             "confidence_threshold": self.confidence,
             "img_size": self. img_size,
             "class_names": self.class_names,
@@ -0,0 +1,296 @@
+"""
+Digit Classifier - EasyOCR önünde çalışan hızlı rakam tanıma katmanı.
+Balon numaraları 1-3 hanelidir ve bir katalogda birkaç fontla basılır; bu
+yüzden bağlantılı bileşenlerle ayrılan her rakam normalize edilip küçük bir
+kNN modeliyle sınıflandırılır. Model, EasyOCR'ın yüksek güvenle okuduğu
+kırpıntılardan (DigitSampleStore) train_digit_classifier.py ile kurulur.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+GLYPH_SIZE = 16      # Normalize rakam görüntüsü kenarı (px)
+MAX_DIGITS = 3       # Bundan fazla bileşen çıkarsa kırpıntı hızlı katmana uygun değil
+
+
+# ==========================================
+# ✂️ RAKAM AYIRMA
+# ==========================================
+
+def digit_glyphs(image: np.ndarray) -> Tuple[np.ndarray, List[Tuple[int, int, int, int]]]:
+    """
+    Balon içindeki rakam pikselleri ve rakam kutuları.
+
+    - Polarite normalize edilir: koyu balonda (beyaz rakam) ön plan merkezde
+      çoğunlukta olduğundan ters çevrilir
+    - Yalnızca iç daire (%80 çap) kullanılır; dairenin sınırına değen
+      bileşenler (balon halkası, leader line parçaları) atılır
+    - Yüksekliği balona göre rakam boyutunda olmayan bileşenler elenir
+    - Rakam yüksekliğindeki bir bileşen rakam olarak alınamıyorsa (sınırda
+      kesilmiş, halkaya yapışmış, bitişik ya da çok ince) kutu döndürülmez:
+      kalan rakamlar numaranın yalnızca bir kısmıdır ("21" -> "1")
+
+    Returns:
+        (ikili görüntü (rakam = 255), soldan sağa (x, y, w, h) kutuları)
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape[:2]
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    center = binary[h // 4:h - h // 4, w // 4:w - w // 4]
+    if np.count_nonzero(center) > center.size / 2:
+        binary = cv2.bitwise_not(binary)
+
+    mask = np.zeros_like(binary)
+    cv2.circle(mask, (w // 2, h // 2), int(min(h, w) * 0.4), 255, -1)
+    binary &= mask
+
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    boundary = labels[mask ^ cv2.erode(mask, None) > 0]
+    contacts = np.bincount(boundary, minlength=count)
+
+    side = min(h, w)
+    core = np.zeros_like(mask)
+    cv2.circle(core, (w // 2, h // 2), int(side * 0.3), 255, -1)
+    in_core = np.bincount(labels[core > 0], minlength=count)
+
+    boxes = []
+    for label, (x, y, bw, bh, area) in enumerate(stats[1:count], start=1):
+        if bh < 0.2 * side:
+            continue  # Gürültü / yatay çizgi
+        if bh > 0.8 * side or contacts[label] >= 0.15 * len(boundary):
+            if in_core[label]:
+                return binary, []  # Halkaya yapışmış rakam
+            continue  # Daireye uzun bir yaydan değen: balon halkası
+        if contacts[label] == 0 and bw <= bh * 1.2 and area >= 12:
+            boxes.append((x, y, bw, bh))
+        else:
+            # Rakam yüksekliğinde ama rakam değil: sınırda kesilmiş ("13"ün "1"i),
+            # bitişik ya da çok ince bir rakam. Kalan kutular eksik numara olur.
+            return binary, []
+    boxes.sort(key=lambda box: box[0])
+    return binary, boxes
+
+
+def segment_glyphs(image: np.ndarray) -> List[np.ndarray]:
+    """Balon kırpıntısındaki rakamları soldan sağa ikili (0/255) görüntüler olarak ayır."""
+    if min(image.shape[:2]) < 12:
+        return []
+
+    binary, boxes = digit_glyphs(image)
+    return [binary[y:y + bh, x:x + bw] for x, y, bw, bh in boxes]
+
+
+def glyph_features(glyphs: List[np.ndarray]) -> np.ndarray:
+    """Rakamları en-boy oranını koruyarak GLYPH_SIZE karesine oturt (N x GLYPH_SIZE², L2 normalize)."""
+    features = np.zeros((len(glyphs), GLYPH_SIZE * GLYPH_SIZE), dtype=np.float32)
+
+    for i, glyph in enumerate(glyphs):
+        gh, gw = glyph.shape[:2]
+        scale = (GLYPH_SIZE - 2) / max(gh, gw)
+        rh, rw = max(1, round(gh * scale)), max(1, round(gw * scale))
+        resized = cv2.resize(glyph, (rw, rh), interpolation=cv2.INTER_AREA)
+
+        canvas = np.zeros((GLYPH_SIZE, GLYPH_SIZE), dtype=np.float32)
+        top, left = (GLYPH_SIZE - rh) // 2, (GLYPH_SIZE - rw) // 2
+        canvas[top:top + rh, left:left + rw] = resized
+        features[i] = canvas.ravel()
+
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.maximum(norms, 1e-6)
+
+
+# ==========================================
+# 🔢 SINIFLANDIRICI
+# ==========================================
+
+class DigitClassifier:
+    """
+    Normalize rakam görüntüleri üzerinde kosinüs benzerlikli kNN.
+    Tahmin tek matris çarpımıdır; CPU'da balon başına mikro saniyeler sürer.
+    """
+
+    def __init__(self, features: np.ndarray, labels: np.ndarray, k: int = 3):
+        """
+        Args:
+            features: (N, GLYPH_SIZE²) normalize rakam özellikleri
+            labels: (N,) rakam etiketleri (0-9)
+            k: Oylamaya katılan komşu sayısı
+        """
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.k = max(1, min(k, len(self.labels)))
+        self._features_t = np.ascontiguousarray(self.features.T)
+
+    @classmethod
+    def load(cls, path: str) -> "DigitClassifier":
+        data = np.load(path)
+        return cls(data["features"], data["labels"], int(data["k"]))
+
+    def fingerprint(self) -> str:
+        """Model içeriğinin hash'i (yeniden eğitilince değişir; sonuç önbelleği anahtarında)."""
+        digest = hashlib.sha256()
+        digest.update(self.features.tobytes())
+        digest.update(self.labels.tobytes())
+        digest.update(str(self.k).encode("ascii"))
+        return digest.hexdigest()
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, features=self.features, labels=self.labels, k=self.k)
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (rakamlar, güvenler): güven = komşu oylarının payı × en yakın komşu benzerliği
+        """
+        similarity = features @ self._features_t
+        nearest = np.argpartition(-similarity, self.k - 1, axis=1)[:, :self.k]
+        nearest_labels = self.labels[nearest]
+        nearest_sims = np.take_along_axis(similarity, nearest, axis=1)
+
+        votes = (nearest_labels[:, :, None] == np.arange(10)).sum(axis=1)
+        digits = votes.argmax(axis=1)
+        share = votes.max(axis=1) / self.k
+        best_sim = np.where(nearest_labels == digits[:, None], nearest_sims, 0).max(axis=1)
+        return digits, share * np.clip(best_sim, 0.0, 1.0)
+
+    def read(self, image: np.ndarray) -> Tuple[Optional[str], float]:
+        """
+        Balon kırpıntısını oku.
+
+        Returns:
+            (numara, güven) - rakam ayrılamazsa (None, 0.0); güven en zayıf rakamınkidir
+        """
+        glyphs = segment_glyphs(image)
+        if not glyphs or len(glyphs) > MAX_DIGITS:
+            return None, 0.0
+
+        digits, confidences = self.predict(glyph_features(glyphs))
+        return "".join(str(d) for d in digits), float(confidences.min())
+
+    def get_info(self) -> dict:
+        return {
+            "samples": int(len(self.labels)),
+            "k": self.k,
+            "digits": np.bincount(self.labels, minlength=10).tolist(),
+        }
+
+
+def condense(features: np.ndarray, labels: np.ndarray, max_per_digit: int = 96) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rakam başına en fazla max_per_digit örnek bırak (en uzak nokta örneklemesi).
+
+    Birbirine en az benzeyen örnekler seçildiği için fontlar temsil edilmeye
+    devam eder; model küçük kalır ve tahmin önbellekte kalan matrisle yapılır.
+    """
+    keep = []
+    for digit in np.unique(labels):
+        indices = np.flatnonzero(labels == digit)
+        if len(indices) <= max_per_digit:
+            keep.extend(indices)
+            continue
+
+        group = features[indices]
+        chosen = [0]
+        closest = group @ group[0]
+        for _ in range(max_per_digit - 1):
+            nxt = int(closest.argmin())
+            chosen.append(nxt)
+            closest = np.maximum(closest, group @ group[nxt])
+        keep.extend(indices[chosen])
+
+    keep = np.sort(np.asarray(keep, dtype=np.int64))
+    return features[keep], labels[keep]
+
+
+# ==========================================
+# 🗃️ ÖRNEK DEPOSU
+# ==========================================
+
+class DigitSampleStore:
+    """
+    EasyOCR'ın yüksek güvenle okuduğu kırpıntıları etiket klasörlerine PNG olarak
+    biriktirir (<dir>/<etiket>/<hash>.png); etiket başına örnek sayısı sınırlıdır.
+    """
+
+    def __init__(self, sample_dir: str, max_per_label: int = 200):
+        self.sample_dir = Path(sample_dir)
+        self.max_per_label = max_per_label
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.sample_dir.mkdir(parents=True, exist_ok=True)
+        for label_dir in self.sample_dir.iterdir():
+            if label_dir.is_dir():
+                self._counts[label_dir.name] = sum(1 for _ in label_dir.glob("*.png"))
+
+    def add(self, image: np.ndarray, label: str) -> bool:
+        """Kırpıntıyı kaydet; rakam sayısı etiketle uyuşmuyorsa (eğitilemez) atla."""
+        if not label.isdigit() or len(label) > MAX_DIGITS:
+            return False
+
+        with self._lock:
+            if self._counts.get(label, 0) >= self.max_per_label:
+                return False
+            if len(segment_glyphs(image)) != len(label):
+                return False
+
+            digest = hashlib.sha1(np.ascontiguousarray(image).tobytes()).hexdigest()[:16]
+            path = self.sample_dir / label / f"{digest}.png"
+            if path.exists():
+                return False
+
+            path.parent.mkdir(exist_ok=True)
+            if not cv2.imwrite(str(path), image):
+                return False
+            self._counts[label] = self._counts.get(label, 0) + 1
+            return True
+
+    def get_info(self) -> dict:
+        with self._lock:
+            return {
+                "dir": str(self.sample_dir),
+                "labels": len(self._counts),
+                "samples": sum(self._counts.values()),
+                "max_per_label": self.max_per_label,
+            }
+
+
+def sample_paths(sample_dir: str) -> List[Path]:
+    """Örnek klasöründeki tüm kırpıntılar (<dir>/<etiket>/*.png)."""
+    return sorted(Path(sample_dir).glob("*/*.png"))
+
+
+def load_samples(paths: Iterable[Path]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Kırpıntıları rakamlara ayırıp eğitim verisine çevir (etiket = klasör adı).
+
+    Returns:
+        (özellikler, rakam etiketleri, atlanan kırpıntı sayısı)
+    """
+    glyphs, labels, skipped = [], [], 0
+
+    for path in paths:
+        label = path.parent.name
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        crop_glyphs = segment_glyphs(image) if image is not None else []
+
+        if not label.isdigit() or len(crop_glyphs) != len(label):
+            skipped += 1
+            continue
+
+        glyphs.extend(crop_glyphs)
+        labels.extend(int(ch) for ch in label)
+
+    if not glyphs:
+        return np.zeros((0, GLYPH_SIZE * GLYPH_SIZE), dtype=np.float32), np.zeros(0, dtype=np.int64), skipped
+
+    return glyph_features(glyphs), np.asarray(labels, dtype=np.int64), skipped
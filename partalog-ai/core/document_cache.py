@@ -0,0 +1,263 @@
+"""
+Document Cache - Sayfa sayfa tablo çıkarımı için açılmış PDF önbelleği.
+C# tarafı /api/table/extract'ı her sayfa için çağırır; PDF içerik hash'iyle
+bir kez açılır (fitz.Document bellekte tutulur), sonraki çağrılar dosyayı
+yeniden göndermeden document_hash ile gelebilir. İstenen sayfanın ardından
+gelen sayfalar arka planda render edilip JPEG olarak hazır tutulur.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import fitz
+from loguru import logger
+from PIL import Image
+
+
+# (sayfa numarası, dpi, maksimum kenar, JPEG kalitesi)
+PageKey = Tuple[int, int, int, int]
+
+
+@dataclass
+class _CachedDocument:
+    document: "fitz.Document"
+    size: int                    # PDF bayt boyutu
+    page_count: int
+    pages: "OrderedDict[PageKey, bytes]" = field(default_factory=OrderedDict)
+    pages_bytes: int = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self.size + self.pages_bytes
+
+
+class DocumentCache:
+    """
+    Hash -> açık fitz.Document + render edilmiş sayfa JPEG'leri (LRU).
+    Sınırlar doküman sayısı ve toplam bayt (PDF + sayfalar) üzerindendir.
+
+    PyMuPDF thread-safe olmadığı için tüm fitz çağrıları (açma, render,
+    kapatma) tek kilit altında sırayla yapılır; kilit sırası her zaman
+    render kilidi -> yapı kilididir.
+    """
+
+    def __init__(
+        self,
+        max_documents: int = 8,
+        max_bytes: int = 512 * 1024 * 1024,
+        prefetch_pages: int = 2
+    ):
+        """
+        Args:
+            max_documents: Açık tutulacak maksimum PDF
+            max_bytes: PDF'ler + render edilmiş sayfalar için toplam bellek sınırı
+            prefetch_pages: İstenen sayfadan sonra arka planda hazırlanan sayfa sayısı
+        """
+        self.max_documents = max(1, max_documents)
+        self.max_bytes = max_bytes
+        self.prefetch_pages = max(0, prefetch_pages)
+
+        self._documents: "OrderedDict[str, _CachedDocument]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, PageKey], Future] = {}
+        self._to_close: List["fitz.Document"] = []
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-prefetch")
+        self._stats = {
+            "opens": 0, "reuses": 0, "page_hits": 0, "shared_renders": 0,
+            "renders": 0, "prefetched": 0, "evictions": 0
+        }
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def add(self, content: bytes) -> Tuple[str, int]:
+        """
+        PDF'i önbelleğe al (zaten varsa açılmaz).
+
+        Returns:
+            (document_hash, sayfa sayısı)
+        """
+        doc_hash = self.content_hash(content)
+        page_count = self.page_count(doc_hash)
+        if page_count is not None:
+            with self._lock:
+                self._stats["reuses"] += 1
+            return doc_hash, page_count
+
+        with self._render_lock:
+            self._close_evicted()
+            document = fitz.open(stream=content, filetype="pdf")
+            entry = _CachedDocument(document, len(content), document.page_count)
+            with self._lock:
+                existing = self._documents.get(doc_hash)
+                if existing is not None:  # Aynı PDF paralel istekle açılmış
+                    self._to_close.append(document)
+                    return doc_hash, existing.page_count
+                self._documents[doc_hash] = entry
+                self._stats["opens"] += 1
+                self._evict(doc_hash)
+
+        logger.debug(f"PDF önbelleğe alındı: {doc_hash[:12]} ({entry.page_count} sayfa, {len(content)} bayt)")
+        return doc_hash, entry.page_count
+
+    def page_count(self, doc_hash: str) -> Optional[int]:
+        """Doküman önbellekteyse sayfa sayısı, değilse None."""
+        with self._lock:
+            entry = self._documents.get(doc_hash)
+            if entry is None:
+                return None
+            self._documents.move_to_end(doc_hash)
+            return entry.page_count
+
+    def page_jpeg(
+        self,
+        doc_hash: str,
+        page_number: int,
+        dpi: int = 200,
+        max_side: int = 1500,
+        quality: int = 95
+    ) -> bytes:
+        """
+        Sayfayı render edip küçültülmüş JPEG olarak döndür. Önbellekte yoksa
+        ve aynı sayfa zaten render ediliyorsa (ön yükleme ya da eşzamanlı
+        istek) onun sonucu beklenir. Blokludur; API'den asyncio.to_thread ile çağrılır.
+
+        Raises:
+            KeyError: Doküman önbellekte yok
+            ValueError: Sayfa numarası geçersiz
+        """
+        key: PageKey = (page_number, dpi, max_side, quality)
+        with self._lock:
+            entry = self._documents.get(doc_hash)
+            if entry is None:
+                raise KeyError(doc_hash)
+            if page_number < 1 or page_number > entry.page_count:
+                raise ValueError(f"Geçersiz sayfa: {page_number} / {entry.page_count}")
+            self._documents.move_to_end(doc_hash)
+
+            cached = entry.pages.get(key)
+            if cached is not None:
+                entry.pages.move_to_end(key)
+                self._stats["page_hits"] += 1
+                return cached
+            pending = self._inflight.get((doc_hash, key))
+            if pending is None:
+                owned = self._inflight[(doc_hash, key)] = Future()
+
+        if pending is not None:
+            data = pending.result()
+            if data is not None:
+                with self._lock:
+                    self._stats["shared_renders"] += 1
+                return data
+            return self._render(doc_hash, key)
+
+        data = None
+        try:
+            data = self._render(doc_hash, key)
+            return data
+        finally:
+            owned.set_result(data)  # Bekleyenler hata durumunda kendileri render eder
+            with self._lock:
+                self._inflight.pop((doc_hash, key), None)
+
+    def prefetch(self, doc_hash: str, page_number: int, dpi: int = 200, max_side: int = 1500, quality: int = 95):
+        """page_number'dan sonraki prefetch_pages sayfayı arka planda hazırla."""
+        with self._lock:
+            entry = self._documents.get(doc_hash)
+            if entry is None:
+                return
+            last = min(entry.page_count, page_number + self.prefetch_pages)
+            for next_page in range(page_number + 1, last + 1):
+                key: PageKey = (next_page, dpi, max_side, quality)
+                if key in entry.pages or (doc_hash, key) in self._inflight:
+                    continue
+                self._inflight[(doc_hash, key)] = self._prefetcher.submit(self._prefetch_one, doc_hash, key)
+
+    def _prefetch_one(self, doc_hash: str, key: PageKey) -> Optional[bytes]:
+        try:
+            data = self._render(doc_hash, key)
+            with self._lock:
+                self._stats["prefetched"] += 1
+            return data
+        except Exception as e:
+            logger.debug(f"PDF ön yükleme başarısız ({doc_hash[:12]} s.{key[0]}): {e}")
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop((doc_hash, key), None)
+
+    def _render(self, doc_hash: str, key: PageKey) -> bytes:
+        page_number, dpi, max_side, quality = key
+        with self._render_lock:
+            self._close_evicted()
+            with self._lock:
+                entry = self._documents.get(doc_hash)
+            if entry is None:
+                raise KeyError(doc_hash)
+
+            pix = entry.document.load_page(page_number - 1).get_pixmap(dpi=dpi)
+            image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            del pix  # MuPDF nesnesi kilit içinde serbest kalsın
+
+        image.thumbnail((max_side, max_side))
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG", quality=quality)
+        data = buffered.getvalue()
+
+        with self._lock:
+            self._stats["renders"] += 1
+            if self._documents.get(doc_hash) is entry and key not in entry.pages:
+                entry.pages[key] = data
+                entry.pages_bytes += len(data)
+                self._evict(doc_hash)
+        return data
+
+    def _evict(self, keep: str):
+        """Sınırlar aşılmışsa en eski dokümanları, tek doküman kaldıysa en eski sayfalarını at (_lock altında)."""
+        def total() -> int:
+            return sum(entry.total_bytes for entry in self._documents.values())
+
+        while len(self._documents) > self.max_documents or (total() > self.max_bytes and len(self._documents) > 1):
+            oldest = next(name for name in self._documents if name != keep)
+            self._to_close.append(self._documents.pop(oldest).document)
+            self._stats["evictions"] += 1
+
+        entry = self._documents.get(keep)
+        while entry is not None and entry.pages and total() > self.max_bytes:
+            _, data = entry.pages.popitem(last=False)
+            entry.pages_bytes -= len(data)
+
+    def _close_evicted(self):
+        """Atılan dokümanları kapat (_render_lock altında)."""
+        with self._lock:
+            documents, self._to_close = self._to_close, []
+        for document in documents:
+            document.close()
+
+    def shutdown(self):
+        self._prefetcher.shutdown(wait=False, cancel_futures=True)
+        with self._render_lock:
+            with self._lock:
+                self._to_close.extend(entry.document for entry in self._documents.values())
+                self._documents.clear()
+            self._close_evicted()
+
+    def get_info(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "documents": len(self._documents),
+                "cached_pages": sum(len(entry.pages) for entry in self._documents.values()),
+                "bytes": sum(entry.total_bytes for entry in self._documents.values()),
+                "max_documents": self.max_documents,
+                "max_bytes": self.max_bytes,
+                "prefetch_pages": self.prefetch_pages
+            }
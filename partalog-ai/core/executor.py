@@ -0,0 +1,143 @@
+"""
+Inference Executor - CPU yoğun model çağrılarını event loop dışında çalıştırır.
+Her model için ayrı bir thread havuzu ve replika kuyruğu tutar; istekler
+sınırlı bir bekleme kuyruğunda sıraya girer, kuyruk doluysa hemen
+ExecutorBusy ile reddedilir (API'de 503). Loop asla bloklanmaz.
+"""
+
+import asyncio
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+
+class ExecutorBusy(RuntimeError):
+    """Modelin çalışan + bekleyen istek sınırı dolu (istemci sonra tekrar denemeli)."""
+
+
+class InferenceExecutor:
+    """
+    Model replikaları için sınırlı çıkarım yürütücüsü.
+    YOLO / EasyOCR çağrıları torch ve OpenCV içinde GIL'i bıraktığı için
+    thread tabanlıdır; her replika aynı anda tek bir thread'e verilir.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        """
+        Args:
+            max_pending: Çalışan + bekleyen maksimum çıkarım isteği (model başına);
+                         fazlası beklemeden ExecutorBusy ile reddedilir
+        """
+        self.max_pending = max(1, max_pending)
+
+        self._replicas: Dict[str, List[Any]] = {}
+        self._available: Dict[str, queue.Queue] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._waiting: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+
+    def register(self, name: str, replicas: List[Any]):
+        """
+        Model replikalarını kaydet.
+
+        Args:
+            name: Model adı ("yolo", "ocr" ...)
+            replicas: Aynı modelin bağımsız örnekleri (en az 1)
+        """
+        if not replicas:
+            raise ValueError(f"'{name}' için en az bir replika gerekli")
+
+        available = queue.Queue()
+        for replica in replicas:
+            available.put(replica)
+
+        self._replicas[name] = list(replicas)
+        self._available[name] = available
+        self._executors[name] = ThreadPoolExecutor(
+            max_workers=len(replicas),
+            thread_name_prefix=f"inference-{name}"
+        )
+        self._waiting[name] = 0
+        self._rejected[name] = 0
+
+        logger.info(f"Inference executor: '{name}' için {len(replicas)} replika")
+
+    def has(self, name: str) -> bool:
+        """Model kayıtlı mı?"""
+        return name in self._replicas
+
+    def replicas(self, name: str) -> List[Any]:
+        """Kayıtlı replikaları döndür."""
+        return list(self._replicas.get(name, []))
+
+    async def run(self, name: str, func: Callable, *args) -> Any:
+        """
+        func(replika, *args) çağrısını boştaki bir replika ile thread'de çalıştır.
+
+        Args:
+            name: Model adı
+            func: İlk argümanı replika olan senkron fonksiyon
+                  (örn. HotspotDetector.detect)
+
+        Raises:
+            ExecutorBusy: Çalışan + bekleyen istek sayısı max_pending'e ulaştıysa
+        """
+        if name not in self._replicas:
+            raise RuntimeError(f"'{name}' modeli executor'a kayıtlı değil")
+
+        # Sayaç yalnızca event loop thread'inde değişir; kontrol ve artış atomiktir
+        if self._waiting[name] >= self.max_pending:
+            self._rejected[name] += 1
+            raise ExecutorBusy(f"'{name}' modeli meşgul ({self.max_pending} istek sırada), sonra tekrar deneyin")
+
+        self._waiting[name] += 1
+        try:
+            # Replika sayısından fazlası thread havuzunun kuyruğunda bekler
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executors[name], self._call, name, func, args
+            )
+        finally:
+            self._waiting[name] -= 1
+
+    def _call(self, name: str, func: Callable, args: tuple) -> Any:
+        """Worker thread: replika al, çalıştır, geri bırak."""
+        available = self._available[name]
+        replica = available.get()
+        try:
+            return func(replica, *args)
+        finally:
+            available.put(replica)
+
+    def shutdown(self):
+        """Thread havuzlarını kapat."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
+    def get_info(self) -> dict:
+        """Replika ve kuyruk durumunu döndür."""
+        return {
+            name: {
+                "replicas": len(replicas),
+                "idle_replicas": self._available[name].qsize(),
+                "in_flight": self._waiting[name],
+                "max_pending": self.max_pending,
+                "rejected": self._rejected[name]
+            }
+            for name, replicas in self._replicas.items()
+        }
+
+
+def configure_torch_threads(num_threads: Optional[int]):
+    """torch intra-op thread sayısını ayarla (0/None = torch varsayılanı)."""
+    if not num_threads:
+        return
+
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        logger.info(f"torch thread sayısı: {num_threads}")
+    except Exception as e:
+        logger.warning(f"torch thread ayarı yapılamadı: {e}")
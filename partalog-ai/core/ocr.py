@@ -4,22 +4,214 @@ EasyOCR + OpenCV ön işleme + Akıllı Filtreleme v2
 """
 
 import easyocr
+from easyocr.easyocr import imgH as EASYOCR_IMG_H
+from easyocr.recognition import get_text
+from easyocr.utils import get_image_list, reformat_input_batched
 import numpy as np
 import cv2
-from typing import Optional, List, Tuple
+from typing import AbstractSet, Dict, NamedTuple, Optional, List, Tuple
 from loguru import logger
+import hashlib
+import json
 import re
+import threading
+from abc import ABC, abstractmethod
 from collections import Counter
 
+from core.ocr_cache import crop_phash
+from core.ocr_preprocess import METHODS, preprocess_batch, to_gray
 
-class HotspotOCR:
+
+class OCRRead(NamedTuple):
+    """Tek kırpıntının okuma sonucu (süreçler arası taşınabilir)."""
+    label: Optional[str]
+    confidence: float
+    source: str  # cache | fast_tier | easyocr
+
+
+class CachedNumberReader(ABC):
+    """
+    Okuyucuların ortak ön yüzü: kırpıntı önbelleği ve örnek deposu.
+    
+    Önbellekte (crop_cache, catalog_id kapsamında) neredeyse aynı bir
+    kırpıntının emin okuması varsa o kullanılır; kalanlar alt sınıfın
+    read_numbers_scored'una gider. EasyOCR'ın emin okumaları önbelleğe ve
+    örnek deposuna yazılır. HotspotOCR bunu kendi sürecinde, OCRWorkerPool
+    ana süreçte yapar (worker'lar yalnızca okur).
+    """
+    
+    crop_cache = None
+    sample_store = None
+    sample_confidence = 0.9
+    _fingerprint: Optional[str] = None
+    
+    def fingerprint(self) -> str:
+        """
+        Okunan etiketleri etkileyen her şeyin özeti: mod bayrakları, eşikler,
+        hızlı katman modelinin içeriği, kırpıntı önbelleği ayarları ve EasyOCR
+        sürümü. Sonuç önbelleği anahtarında YOLO parmak izinin yanında durur;
+        ayar ya da model değişince diskteki eski sonuçlar kullanılmaz.
+        """
+        if self._fingerprint is None:
+            crop_cache = None
+            if self.crop_cache is not None:
+                crop_cache = {
+                    "max_distance": self.crop_cache.max_distance,
+                    "min_confidence": self.crop_cache.min_confidence
+                }
+            self._fingerprint = hashlib.sha256(json.dumps({
+                **self._fingerprint_options(),
+                "crop_cache": crop_cache,
+                "easyocr": easyocr.__version__
+            }, sort_keys=True).encode("utf-8")).hexdigest()
+        return self._fingerprint
+    
+    @abstractmethod
+    def _fingerprint_options(self) -> dict:
+        """Alt sınıfın etiketleri etkileyen ayarları (fast_tier = model hash'i ya da None)."""
+    
+    def read_number(
+        self,
+        image: np.ndarray,
+        allowed_labels: Optional[AbstractSet[str]] = None,
+        catalog_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Hotspot görüntüsünden numara oku. 
+        Merkez bölgeye odaklanarak kenar gürültüsünü azaltır.
+        """
+        return self.read_numbers_batch([image], allowed_labels, catalog_id)[0]
+    
+    def read_numbers_batch(
+        self,
+        images: List[np.ndarray],
+        allowed_labels: Optional[AbstractSet[str]] = None,
+        catalog_id: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """
+        Birden fazla hotspot görüntüsünden toplu numara oku.
+        
+        Returns:
+            Her görüntü için (aynı sırada) numara veya None
+        """
+        # Kırpıntı burada bir kez griye çevrilir; pHash, hızlı katman, profil
+        # ve her ön işleme turu aynı gri görüntüyü kullanır
+        images = [
+            to_gray(image) if image is not None and image.size > 0 else image
+            for image in images
+        ]
+        reads: List[Optional[OCRRead]] = [None] * len(images)
+        hashes: Dict[int, Tuple[int, ...]] = {}  # görüntü indeksi -> rakam pHash'leri (önbelleğe yazmak için)
+        pending: List[int] = []
+        
+        for index, image in enumerate(images):
+            if image is None or image.size == 0:
+                continue
+            
+            phash = crop_phash(image) if self.crop_cache is not None else None
+            if phash is not None:  # Rakamları eksiksiz ayrılamayan kırpıntı önbelleğe girmez
+                hashes[index] = phash
+                cached = self.crop_cache.lookup(phash, catalog_id)
+                if cached is not None and (not allowed_labels or cached[0] in allowed_labels):
+                    reads[index] = OCRRead(cached[0], cached[1], "cache")
+                    continue
+            
+            pending.append(index)
+        
+        if pending:
+            scored = self.read_numbers_scored([images[i] for i in pending], allowed_labels)
+            for index, read in zip(pending, scored):
+                reads[index] = read
+                if not read.label or read.source != "easyocr":
+                    continue
+                
+                if self.sample_store is not None and read.confidence >= self.sample_confidence:
+                    self.sample_store.add(images[index], read.label)
+                if index in hashes:
+                    self.crop_cache.put(hashes[index], read.label, read.confidence, catalog_id)
+        
+        cache_hits = sum(1 for read in reads if read is not None and read.source == "cache")
+        with self._stats_lock:
+            self._calls["crops"] += cache_hits
+            self._calls["cache_hits"] += cache_hits
+        
+        return [read.label if read is not None else None for read in reads]
+    
+    @abstractmethod
+    def read_numbers_scored(
+        self,
+        images: List[np.ndarray],
+        allowed_labels: Optional[AbstractSet[str]] = None
+    ) -> List[OCRRead]:
+        """Önbellek dışı okuma (alt sınıflar uygular)."""
+
+
+class HotspotOCR(CachedNumberReader):
     """
     Hotspot/balloon içindeki rakamları okur. 
     Siyah daire içindeki beyaz numaralar için optimize edilmiş. 
     """
     
-    def __init__(self, use_gpu: bool = False):
+    # Ön işleme varyantları (oylama bu sırayla toplanan adaylar üzerinden yapılır)
+    METHODS = METHODS
+    
+    # Adaptif modda kırpıntı profiline göre yöntem sırası (en umut verici önce).
+    # get_info()'daki yöntem kazanma oranlarına bakılarak ayarlanır.
+    ADAPTIVE_ORDERS = {
+        "dark": ("center_inverted", "full_inverted", "mask_circle", "center_adaptive"),
+        "light": ("center_adaptive", "center_inverted", "mask_circle", "full_inverted"),
+        "light_ring": ("mask_circle", "center_adaptive", "center_inverted", "full_inverted"),
+        "cluttered": ("mask_circle", "center_inverted", "center_adaptive", "full_inverted"),
+    }
+    
+    def __init__(
+        self,
+        use_gpu: bool = False,
+        batch_size: int = 64,
+        recognition_only: bool = False,
+        adaptive: bool = False,
+        early_exit_confidence: float = 0.85,
+        allowed_label_confidence: float = 0.5,
+        fast_tier=None,
+        fast_tier_confidence: float = 0.9,
+        sample_store=None,
+        sample_confidence: float = 0.9,
+        crop_cache=None
+    ):
+        """
+        Args:
+            use_gpu: EasyOCR GPU kullanımı
+            batch_size: Tek batch'teki maksimum görüntü / recognizer batch boyutu
+            recognition_only: CRAFT metin tespitini atla; kırpıntı zaten YOLO ile
+                bulunduğu için görüntünün tamamı tek satır olarak tanınır
+            adaptive: Yöntemleri kırpıntı profiline göre sırala ve erken çık
+            early_exit_confidence: Adaptif modda tek başına yeterli güven
+            allowed_label_confidence: İzinli etiket kümesindeki bir okumanın
+                OCR'ı durdurması için gereken güven
+            fast_tier: EasyOCR'dan önce denenen DigitClassifier (None = kapalı)
+            fast_tier_confidence: Hızlı katman sonucunun kabul edildiği güven
+            sample_store: EasyOCR'ın emin okuduğu kırpıntıların biriktirildiği
+                DigitSampleStore (hızlı katmanın eğitim verisi, None = kapalı)
+            sample_confidence: Kırpıntının örnek olarak kaydedildiği güven
+            crop_cache: Replikalar arası paylaşılan OCRCropCache (pHash -> emin
+                okuma; None = kapalı)
+        """
         self.use_gpu = use_gpu
+        self.batch_size = max(1, batch_size)
+        self.recognition_only = recognition_only
+        self.adaptive = adaptive
+        self.early_exit_confidence = early_exit_confidence
+        self.allowed_label_confidence = allowed_label_confidence
+        self.fast_tier = fast_tier
+        self.fast_tier_confidence = fast_tier_confidence
+        self.sample_store = sample_store
+        self.sample_confidence = sample_confidence
+        self.crop_cache = crop_cache
+        
+        # profil -> yöntem -> {runs, reads, wins}; ayrıca toplam çağrı sayacı
+        self._stats_lock = threading.Lock()
+        self._method_stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._calls = {"crops": 0, "ocr_calls": 0, "early_exits": 0, "fast_tier_hits": 0, "cache_hits": 0}
         
         logger.info("OCR Reader başlatılıyor (gpu={})".format(self.use_gpu))
         
@@ -29,101 +221,412 @@ class HotspotOCR:
             verbose=False
         )
         
-        logger.info("OCR Reader hazır")
+        # allowlist='0123456789' ile aynı: rakam dışındaki karakterler yok sayılır
+        self._ignore_char = ''.join(set(self.reader.character) - set('0123456789'))
+        
+        logger.info("OCR Reader hazır (mod={})".format(
+            "recognition_only" if self.recognition_only else "detect_recognize"
+        ))
     
-    def read_number(self, image: np.ndarray) -> Optional[str]:
-        """
-        Hotspot görüntüsünden numara oku. 
-        Merkez bölgeye odaklanarak kenar gürültüsünü azaltır.
+    def read_numbers_scored(
+        self,
+        images: List[np.ndarray],
+        allowed_labels: Optional[AbstractSet[str]] = None
+    ) -> List[OCRRead]:
         """
-        if image is None or image.size == 0:
-            return None
+        Kırpıntıları hızlı katman + EasyOCR ile oku (önbelleğe bakmadan).
         
-        # Birden fazla yöntemle oku
-        candidates = []
+        Tüm kırpıntıların tüm ön işleme varyantları tek listede toplanır ve
+        EasyOCR'a birkaç büyük batch halinde verilir (80 balonlu bir sayfa 320
+        ardışık readtext yerine birkaç tespit + tanıma geçişi). Oylama her
+        kırpıntı için read_number ile aynıdır.
         
-        methods = [
-            ("center_inverted", lambda img: self._preprocess_inverted(self._crop_center(img, 0.6))),
-            ("center_adaptive", lambda img: self._preprocess_adaptive(self._crop_center(img, 0.6))),
-            ("full_inverted", self._preprocess_inverted),
-            ("mask_circle", self._preprocess_with_circle_mask),
-        ]
+        allowed_labels verilirse (sayfanın parça listesindeki referans
+        numaraları) yalnızca bu kümedeki okumalar aday olur, düzeltme
+        tahminleri yapılmaz ve kümeden yeterince emin bir okuma gelen
+        kırpıntı için kalan yöntemler çalıştırılmaz.
         
-        for method_name, method in methods:
-            try:
-                processed = method(image)
-                result, confidence = self._ocr_read_with_confidence(processed)
-                if result: 
-                    candidates. append((result, confidence, method_name))
-            except Exception as e:
-                logger. debug("OCR method '{}' failed: {}".format(method_name, str(e)))
+        Hızlı rakam katmanı (fast_tier) emin olduğu kırpıntıları EasyOCR'a
+        hiç göndermez. Worker süreçlerinde çağrılan kısım budur.
+        
+        Returns:
+            Her görüntü için (aynı sırada) OCRRead; okunamazsa label None
+        """
+        reads = [OCRRead(None, 0.0, "easyocr") for _ in images]
+        fast_hits = 0
+        
+        # görüntü indeksi -> (profil, kalan yöntemler)
+        plans: Dict[int, Tuple[str, List[str]]] = {}
+        for index, image in enumerate(images):
+            if image is None or image.size == 0:
                 continue
+            
+            if self.fast_tier is not None:
+                text, confidence = self._fast_read(image, allowed_labels)
+                if text:
+                    reads[index] = OCRRead(text, confidence, "fast_tier")
+                    fast_hits += 1
+                    continue
+            
+            profile = self._crop_profile(image) if self.adaptive else "fixed"
+            order = self.ADAPTIVE_ORDERS[profile] if self.adaptive else self.METHODS
+            plans[index] = (profile, list(order))
+        
+        candidates: List[List[Tuple[str, float, str]]] = [[] for _ in images]
+        ocr_calls = early_exits = 0
+        
+        # Sabit modda tek tur (tüm yöntemler); adaptif modda ya da izinli
+        # etiket kümesi varken her turda kırpıntı başına bir yöntem çalışır,
+        # karar verilen kırpıntılar sonraki tura girmez
+        stepwise = self.adaptive or bool(allowed_labels)
+        while plans:
+            indices, steps = list(plans), []
+            for index in indices:
+                remaining = plans[index][1]
+                steps.append(remaining[:1] if stepwise else list(remaining))
+                del remaining[:len(steps[-1])]
+            
+            # Turdaki tüm kırpıntıların varyantları tek tuvalde üretilir
+            # (görüntü indeksi, yöntem adı, işlenmiş görüntü)
+            entries = [
+                (index, method_name, processed)
+                for index, variants in zip(indices, preprocess_batch([images[i] for i in indices], steps))
+                for method_name, processed in variants
+            ]
+            
+            results = self._readtext_many([processed for _, _, processed in entries])
+            ocr_calls += len(entries)
+            
+            for (index, method_name, _), ocr_results in zip(entries, results):
+                self._record_method(plans[index][0], method_name, "runs")
+                if ocr_results is None:
+                    continue
+                result, confidence = self._parse_ocr_results(ocr_results, allowed_labels)
+                if result:
+                    candidates[index].append((result, confidence, method_name))
+                    self._record_method(plans[index][0], method_name, "reads")
+            
+            finished = [
+                index for index, (_, remaining) in plans.items()
+                if not remaining or self._can_stop(candidates[index], allowed_labels)
+            ]
+            for index in finished:
+                profile, remaining = plans.pop(index)
+                early_exits += bool(remaining)
+                
+                # En iyi sonucu seç
+                image_candidates = candidates[index]
+                best_result = self._select_best_result(image_candidates) if image_candidates else None
+                
+                if best_result:
+                    for result, _, method_name in image_candidates:
+                        if result == best_result:
+                            self._record_method(profile, method_name, "wins")
+                    
+                    best_confidence = max(c for r, c, _ in image_candidates if r == best_result)
+                    reads[index] = OCRRead(best_result, best_confidence, "easyocr")
+                    
+                    logger.debug("OCR final:  '{}' (candidates: {})".format(
+                        best_result,
+                        [(c[0], round(c[1], 2)) for c in image_candidates]
+                    ))
+        
+        with self._stats_lock:
+            self._calls["crops"] += sum(1 for image in images if image is not None and image.size > 0)
+            self._calls["ocr_calls"] += ocr_calls
+            self._calls["early_exits"] += early_exits
+            self._calls["fast_tier_hits"] += fast_hits
+        
+        return reads
+    
+    def _fingerprint_options(self) -> dict:
+        return {
+            "recognition_only": self.recognition_only,
+            "adaptive": self.adaptive,
+            "early_exit_confidence": self.early_exit_confidence,
+            "allowed_label_confidence": self.allowed_label_confidence,
+            "fast_tier": self.fast_tier.fingerprint() if self.fast_tier is not None else None,
+            "fast_tier_confidence": self.fast_tier_confidence
+        }
+    
+    def _fast_read(
+        self,
+        image: np.ndarray,
+        allowed_labels: Optional[AbstractSet[str]] = None
+    ) -> Tuple[Optional[str], float]:
+        """Hızlı rakam katmanı; yalnızca emin (ve izinli kümedeyse) sonucu döndürür."""
+        try:
+            text, confidence = self.fast_tier.read(image)
+        except Exception as e:
+            logger.debug("Hızlı rakam katmanı hatası: {}".format(e))
+            return None, 0.0
         
-        if not candidates: 
-            return None
+        if not text or confidence < self.fast_tier_confidence:
+            return None, 0.0
+        if allowed_labels and text not in allowed_labels:
+            return None, 0.0
+        
+        logger.debug("OCR fast tier: '{}' (conf: {:.2f})".format(text, confidence))
+        return text, confidence
+    
+    def _can_stop(
+        self,
+        candidates: List[Tuple[str, float, str]],
+        allowed_labels: Optional[AbstractSet[str]] = None
+    ) -> bool:
+        """
+        Erken çıkış: izinli kümeden makul güvenle okuma geldi ya da (adaptif
+        modda) iki yöntem aynı sonucu verdi / biri yeterince emin.
+        """
+        if not candidates:
+            return False
         
-        # En iyi sonucu seç
-        best_result = self._select_best_result(candidates)
+        if allowed_labels and any(conf >= self.allowed_label_confidence for _, conf, _ in candidates):
+            return True
         
-        if best_result:
-            logger.debug("OCR final:  '{}' (candidates: {})".format(
-                best_result,
-                [(c[0], round(c[1], 2)) for c in candidates]
-            ))
+        if not self.adaptive:
+            return False
         
-        return best_result
+        if any(conf >= self.early_exit_confidence for _, conf, _ in candidates):
+            return True
+        
+        counts = Counter(result for result, _, _ in candidates)
+        return counts.most_common(1)[0][1] >= 2
     
-    def _crop_center(self, image: np.ndarray, ratio: float = 0.7) -> np.ndarray:
-        """Görüntünün merkez bölgesini kırp."""
-        h, w = image. shape[:2]
+    def _crop_profile(self, image: np.ndarray) -> str:
+        """
+        Kırpıntıyı ucuz ölçütlerle sınıflandır: dark | light | light_ring | cluttered.
         
-        margin_x = int(w * (1 - ratio) / 2)
-        margin_y = int(h * (1 - ratio) / 2)
+        - Polarite: merkezdeki piksellerin çoğu Otsu eşiğinin altındaysa koyu balon
+        - Dağınıklık: iç daire dışındaki (köşeler) koyu piksel oranı
+        - Halka: yarıçap bandında açıların çoğunda koyu piksel var mı
+        """
+        gray = to_gray(image)
+        h, w = gray.shape[:2]
+        if h < 8 or w < 8:
+            return "light"
         
-        margin_x = max(margin_x, 3)
-        margin_y = max(margin_y, 3)
+        threshold, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        dark = gray < threshold
         
-        cropped = image[margin_y:h-margin_y, margin_x:w-margin_x]
+        center = dark[h // 4:h - h // 4, w // 4:w - w // 4]
+        if center.mean() > 0.5:
+            return "dark"
         
-        if cropped.shape[0] < 10 or cropped. shape[1] < 10:
-            return image
+        yy, xx = np.ogrid[:h, :w]
+        radius = min(h, w) / 2
+        distance = np.sqrt((yy - h / 2) ** 2 + (xx - w / 2) ** 2) / radius
+        
+        if dark[distance > 1.0].mean() > 0.15:
+            return "cluttered"
+        
+        # Halka: 48 açıda 0.7-1.0 yarıçap bandında koyu piksel
+        angles = np.linspace(0, 2 * np.pi, 48, endpoint=False)
+        radii = np.array([0.72, 0.82, 0.92]) * (radius - 1)
+        ys = np.clip((h / 2 + np.outer(radii, np.sin(angles))).astype(int), 0, h - 1)
+        xs = np.clip((w / 2 + np.outer(radii, np.cos(angles))).astype(int), 0, w - 1)
+        ring_coverage = dark[ys, xs].any(axis=0).mean()
+        
+        return "light_ring" if ring_coverage >= 0.6 else "light"
+    
+    def _record_method(self, profile: str, method_name: str, field: str):
+        """Yöntem istatistiği (runs / reads / wins) güncelle."""
+        with self._stats_lock:
+            methods = self._method_stats.setdefault(profile, {})
+            stats = methods.setdefault(method_name, {"runs": 0, "reads": 0, "wins": 0})
+            stats[field] += 1
+    
+    def get_method_stats(self) -> dict:
+        """Profil bazında yöntem kazanma oranları ve kırpıntı başına OCR çağrısı."""
+        with self._stats_lock:
+            profiles = {
+                profile: {
+                    method_name: {
+                        **stats,
+                        "win_rate": round(stats["wins"] / stats["runs"], 4) if stats["runs"] else 0.0
+                    }
+                    for method_name, stats in methods.items()
+                }
+                for profile, methods in self._method_stats.items()
+            }
+            crops = self._calls["crops"]
+            return {
+                **self._calls,
+                "calls_per_crop": round(self._calls["ocr_calls"] / crops, 3) if crops else 0.0,
+                "profiles": profiles
+            }
+    
+    def _readtext_many(self, images: List[np.ndarray]) -> List[Optional[list]]:
+        """
+        Görüntüleri batch'ler halinde EasyOCR'dan geçir (readtext ile aynı çıktı biçimi).
+        
+        Metin tespiti (CRAFT) benzer boyuttaki görüntülerden oluşan gruplar
+        halinde tek tensörle, tanıma ise gruptaki tüm kutular için tek
+        recognizer geçişiyle yapılır. Başarısız bir grup tek tek okunur;
+        yine okunamayan görüntü için None döner.
+        """
+        if self.recognition_only:
+            return self._recognize_lines(images)
+        
+        outputs: List[Optional[list]] = [None] * len(images)
+        
+        for chunk in self._size_buckets(images):
+            try:
+                canvas_h = max(images[i].shape[0] for i in chunk)
+                canvas_w = max(images[i].shape[1] for i in chunk)
+                padded = [self._pad_to(images[i], canvas_h, canvas_w) for i in chunk]
+                
+                batch, greys = reformat_input_batched(padded)
+                horizontal_lists, free_lists = self.reader.detect(batch, reformat=False)
+                results = self._recognize_many(list(greys), horizontal_lists, free_lists)
+                
+                for i, result in zip(chunk, results):
+                    outputs[i] = result
+            except Exception as e:
+                logger.debug("OCR batch ({} görüntü) başarısız, tek tek okunuyor: {}".format(len(chunk), e))
+                for i in chunk:
+                    try:
+                        outputs[i] = self._readtext(images[i])
+                    except Exception as e:
+                        logger.debug("OCR okuma hatası: {}".format(e))
+        
+        return outputs
+    
+    def _recognize_many(
+        self,
+        greys: List[np.ndarray],
+        horizontal_lists: List[list],
+        free_lists: List[list]
+    ) -> List[list]:
+        """
+        Birden fazla görüntünün metin kutularını tek recognizer geçişinde oku.
+        
+        EasyOCR'ın recognize() fonksiyonu CPU'da her kutuyu ayrı çağırır;
+        burada tüm kutular tek listede toplanıp get_text'e batch_size ile
+        verilir, sonuçlar kutu sayılarına göre görüntülere geri dağıtılır.
+        
+        Returns:
+            Her görüntü için [(kutu, metin, güven), ...]
+        """
+        image_list, counts, max_width = [], [], 0
+        
+        for grey, horizontal_list, free_list in zip(greys, horizontal_lists, free_lists):
+            items, width = get_image_list(horizontal_list, free_list, grey, model_height=EASYOCR_IMG_H)
+            image_list.extend(items)
+            counts.append(len(items))
+            max_width = max(max_width, width)
+        
+        if not image_list:
+            return [[] for _ in greys]
+        
+        results = get_text(
+            self.reader.character, EASYOCR_IMG_H, int(max_width),
+            self.reader.recognizer, self.reader.converter, image_list,
+            self._ignore_char, 'greedy', 5, self.batch_size,
+            0.1, 0.5, 0.003, 0, self.reader.device
+        )
+        
+        grouped, start = [], 0
+        for count in counts:
+            grouped.append(results[start:start + count])
+            start += count
         
-        return cropped
+        return grouped
     
-    def _preprocess_with_circle_mask(self, image: np.ndarray) -> np.ndarray:
-        """Daire maskesi uygula - sadece balloon içini al."""
-        h, w = image. shape[:2]
+    def _recognize_lines(self, images: List[np.ndarray]) -> List[Optional[list]]:
+        """
+        Tespit olmadan tanıma: her görüntünün tamamı tek metin kutusu sayılır.
+        
+        Ön işleme varyantları zaten gri; boyutları farklı olabildiği için
+        doldurma gerekmez (get_image_list her kutuyu model yüksekliğine
+        ölçekler). Başarısız batch'in görüntüleri için None döner.
+        """
+        outputs: List[Optional[list]] = [None] * len(images)
+        
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start:start + self.batch_size]
+            try:
+                greys = [
+                    cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+                    for img in chunk
+                ]
+                boxes = [[[0, grey.shape[1], 0, grey.shape[0]]] for grey in greys]
+                results = self._recognize_many(greys, boxes, [[] for _ in greys])
+                outputs[start:start + len(chunk)] = results
+            except Exception as e:
+                logger.debug("OCR tanıma batch'i ({} görüntü) başarısız: {}".format(len(chunk), e))
         
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else: 
-            gray = image. copy()
+        return outputs
+    
+    def _size_buckets(self, images: List[np.ndarray], max_waste: float = 1.25) -> List[List[int]]:
+        """
+        Görüntü indekslerini batch'lere ayır: boyuta göre sıralanır ve ortak
+        tuvale doldurma israfı max_waste oranını aşınca yeni batch açılır.
+        """
+        order = sorted(range(len(images)), key=lambda i: images[i].shape[:2])
+        buckets, current = [], []
+        canvas_h = canvas_w = area = 0
         
-        # Daire maskesi oluştur (daha küçük - %80)
-        mask = np.zeros((h, w), dtype=np.uint8)
-        center = (w // 2, h // 2)
-        radius = int(min(w, h) * 0.4)  # %40 radius = %80 çap
-        cv2.circle(mask, center, radius, 255, -1)
+        for i in order:
+            h, w = images[i].shape[:2]
+            new_h, new_w = max(canvas_h, h), max(canvas_w, w)
+            
+            if current and (
+                len(current) >= self.batch_size
+                or new_h * new_w * (len(current) + 1) > max_waste * (area + h * w)
+            ):
+                buckets.append(current)
+                current, area = [], 0
+                new_h, new_w = h, w
+            
+            current.append(i)
+            canvas_h, canvas_w = new_h, new_w
+            area += h * w
         
-        masked = cv2.bitwise_and(gray, gray, mask=mask)
-        masked[mask == 0] = 255
+        if current:
+            buckets.append(current)
         
-        inverted = cv2.bitwise_not(masked)
-        _, binary = cv2.threshold(inverted, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return buckets
+    
+    @staticmethod
+    def _pad_to(image: np.ndarray, height: int, width: int) -> np.ndarray:
+        """Görüntüyü ortalayıp kenar piksellerinin medyan rengiyle (zemin) doldur."""
+        h, w = image.shape[:2]
+        if h == height and w == width:
+            return image
         
-        enlarged = cv2.resize(binary, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+        border = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]])
+        background = int(np.median(border))
         
-        return enlarged
+        top = (height - h) // 2
+        left = (width - w) // 2
+        return cv2.copyMakeBorder(
+            image, top, height - h - top, left, width - w - left,
+            cv2.BORDER_CONSTANT, value=background
+        )
     
     def _ocr_read_with_confidence(self, image: np.ndarray) -> Tuple[Optional[str], float]: 
         """OCR uygula ve confidence ile birlikte döndür."""
-        results = self.reader. readtext(
+        return self._parse_ocr_results(self._readtext(image))
+    
+    def _readtext(self, image: np.ndarray) -> list:
+        """Tek görüntü için EasyOCR readtext."""
+        if self.recognition_only:
+            return self._recognize_lines([image])[0] or []
+        
+        return self.reader. readtext(
             image,
             allowlist='0123456789',
             detail=1,
             paragraph=False
         )
-        
+    
+    def _parse_ocr_results(
+        self,
+        results: list,
+        allowed_labels: Optional[AbstractSet[str]] = None
+    ) -> Tuple[Optional[str], float]:
+        """EasyOCR sonucundan en güvenilir rakam dizisini seç ve düzelt."""
         if not results: 
             return None, 0.0
         
@@ -138,6 +641,9 @@ class HotspotOCR:
         if not text:
             return None, 0.0
         
+        if allowed_labels:
+            return self._match_allowed(text, confidence, allowed_labels)
+        
         # === DÜZELTME KURALLARI ===
         
         # 1-2 haneli:  direkt kabul
@@ -156,6 +662,30 @@ class HotspotOCR:
         
         return None, 0.0
     
+    def _match_allowed(
+        self,
+        text: str,
+        confidence: float,
+        allowed_labels: AbstractSet[str]
+    ) -> Tuple[Optional[str], float]:
+        """
+        Okumayı izinli etiket kümesiyle eşleştir (düzeltme tahmini yapılmaz).
+        
+        Birebir eşleşme olduğu gibi kabul edilir. Aksi halde okumanın içindeki
+        en uzun izinli parça (balon kenarı / leader line'dan gelen fazladan
+        hane atılmış hali) okunan oranla düşürülmüş güvenle alınır.
+        """
+        if text in allowed_labels:
+            return text, confidence
+        
+        for length in range(len(text) - 1, 0, -1):
+            for start in range(len(text) - length + 1):
+                part = text[start:start + length]
+                if part in allowed_labels:
+                    return part, confidence * length / len(text)
+        
+        return None, 0.0
+    
     def _correct_3digit(self, text: str, confidence: float) -> Tuple[Optional[str], float]: 
         """
         3 haneli sonuçları düzelt.
@@ -260,56 +790,20 @@ class HotspotOCR:
         
         return best_result
     
-    def _preprocess_inverted(self, image: np.ndarray) -> np.ndarray:
-        """Siyah zemin beyaz yazı için ters çevir."""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        inverted = cv2.bitwise_not(gray)
-        
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(inverted)
-        
-        denoised = cv2.medianBlur(enhanced, 3)
-        
-        _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        enlarged = cv2.resize(binary, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
-        
-        return enlarged
-    
-    def _preprocess_adaptive(self, image: np.ndarray) -> np.ndarray:
-        """Adaptive threshold ile ön işleme."""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        binary = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY_INV, 11, 2
-        )
-        
-        kernel = np.ones((2, 2), np.uint8)
-        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-        
-        enlarged = cv2.resize(binary, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
-        
-        return enlarged
-    
-    def read_numbers_batch(self, images: List[np. ndarray]) -> List[Optional[str]]: 
-        """Birden fazla görüntüden numara oku."""
-        return [self.read_number(img) for img in images]
-    
     def get_info(self) -> dict:
         """OCR bilgilerini döndür."""
         return {
             "engine": "EasyOCR",
             "gpu_enabled": self.use_gpu,
             "allowed_chars": "0123456789",
-            "features": ["center_crop", "circle_mask", "voting", "3digit_correction", "4digit_correction"]
+            "batch_size": self.batch_size,
+            "mode": "recognition_only" if self.recognition_only else "detect_recognize",
+            "adaptive": self.adaptive,
+            "early_exit_confidence": self.early_exit_confidence if self.adaptive else None,
+            "method_stats": self.get_method_stats(),
+            "fast_tier": self.fast_tier.get_info() if self.fast_tier is not None else None,
+            "sample_store": self.sample_store.get_info() if self.sample_store is not None else None,
+            "features": ["center_crop", "circle_mask", "voting", "3digit_correction", "4digit_correction", "batched_recognition"]
         }
 
 
@@ -0,0 +1,270 @@
+"""
+OCR Crop Cache - Balon kırpıntısı OCR sonuçlarının algısal hash önbelleği.
+Bir katalogda aynı balon ("1", "2", "12"...) binlerce kez neredeyse aynı
+piksellerle tekrar eder. Kırpıntının normalize edilmiş rakam görüntüsünden
+rakam başına 64 bit pHash üretilir; rakam sayısı aynı ve her rakamı eşiğin
+altında kalan önceki emin okuma OCR'ı atlatır. Kayıtlar katalog bazında
+tutulur (LRU) ve istenirse diske yazılır.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from core.digit_classifier import MAX_DIGITS, digit_glyphs
+
+
+DEFAULT_NAMESPACE = "default"
+
+# Bayt başına 1 bit sayısı (Hamming mesafesi; numpy<2'de bitwise_count yok)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def crop_phash(image: np.ndarray) -> Optional[Tuple[int, ...]]:
+    """
+    Kırpıntıdaki her rakamın 64 bit algısal hash'i (DCT tabanlı pHash), soldan sağa.
+
+    Normalizasyon: rakam pikselleri polariteden bağımsız ayrılır, halka ve
+    leader line'lar atılır, her rakam kendi kutusundan kare tuvale ortalanıp
+    32x32'ye küçültülür. Böylece kaymalar, balon boyutu ve gürültü hash'i
+    değiştirmez; küçük balonlarda bile "45" / "48" farkı tek rakamın
+    hash'inde kalır. Tuple uzunluğu rakam sayısıdır.
+
+    Returns:
+        Rakam hash'leri; kırpıntı 12 px'ten küçükse ya da rakamlar eksiksiz
+        ayrılamadıysa None (önbelleğe bakılmaz / yazılmaz)
+    """
+    if min(image.shape[:2]) < 12:
+        return None
+
+    binary, boxes = digit_glyphs(image)
+    if not boxes or len(boxes) > MAX_DIGITS:
+        return None
+    return tuple(_glyph_phash(binary[y:y + h, x:x + w]) for x, y, w, h in boxes)
+
+
+def _glyph_phash(glyph: np.ndarray) -> int:
+    h, w = glyph.shape[:2]
+    side = max(h, w)
+    square = np.zeros((side, side), dtype=np.uint8)
+    square[(side - h) // 2:(side - h) // 2 + h, (side - w) // 2:(side - w) // 2 + w] = glyph
+
+    small = cv2.resize(square, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class _Namespace:
+    """
+    Tek kataloğun kayıtları: rakam hash'leri, rakam sayısı, etiket, güven ve
+    LRU saati paralel dizilerde. Kayıt yalnızca aynı rakam sayısındaki
+    kırpıntılarla karşılaştırılır.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.hashes = np.zeros((capacity, MAX_DIGITS), dtype=np.uint64)
+        self.glyphs = np.zeros(capacity, dtype=np.int8)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.labels: List[Optional[str]] = [None] * capacity
+        self.confidences = np.zeros(capacity, dtype=np.float32)
+        self.size = 0
+        self.dirty = False
+
+    def _row(self, phash: Tuple[int, ...]) -> np.ndarray:
+        row = np.zeros(MAX_DIGITS, dtype=np.uint64)
+        row[:len(phash)] = phash
+        return row
+
+    def nearest(self, phash: Tuple[int, ...]) -> Tuple[int, int]:
+        """(indeks, en kötü rakamın Hamming mesafesi); aynı rakam sayısında kayıt yoksa (-1, 65)."""
+        candidates = np.flatnonzero(self.glyphs[:self.size] == len(phash))
+        if len(candidates) == 0:
+            return -1, 65
+        xor = self.hashes[candidates] ^ self._row(phash)
+        distances = _POPCOUNT[xor.view(np.uint8)].reshape(len(candidates), MAX_DIGITS, 8).sum(axis=2).max(axis=1)
+        best = int(distances.argmin())
+        return int(candidates[best]), int(distances[best])
+
+    def put(self, phash: Tuple[int, ...], label: str, confidence: float, clock: int):
+        row = self._row(phash)
+        matches = np.flatnonzero(
+            (self.glyphs[:self.size] == len(phash)) & (self.hashes[:self.size] == row).all(axis=1)
+        )
+        if len(matches):
+            index = int(matches[0])
+        elif self.size < self.capacity:
+            index = self.size
+            self.size += 1
+        else:
+            index = int(self.last_used[:self.size].argmin())  # En eski kullanılan
+
+        self.hashes[index] = row
+        self.glyphs[index] = len(phash)
+        self.labels[index] = label
+        self.confidences[index] = confidence
+        self.last_used[index] = clock
+        self.dirty = True
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path,
+            hashes=self.hashes[:self.size],
+            glyphs=self.glyphs[:self.size],
+            labels=np.array(self.labels[:self.size], dtype="U8"),
+            confidences=self.confidences[:self.size],
+            last_used=self.last_used[:self.size]
+        )
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path, capacity: int) -> "_Namespace":
+        data = np.load(path)
+        namespace = cls(capacity)
+        if "glyphs" not in data.files:
+            # Eski biçim (tüm kırpıntıya tek hash): rakam sayısı bilinmiyor, kullanılmaz
+            logger.info(f"OCR önbelleği eski biçimde, yeniden kurulacak ({path.name})")
+            return namespace
+        order = np.argsort(-data["last_used"])[:capacity]  # Kapasite küçüldüyse en yeniler
+        count = len(order)
+        namespace.hashes[:count] = data["hashes"][order]
+        namespace.glyphs[:count] = data["glyphs"][order]
+        namespace.confidences[:count] = data["confidences"][order]
+        namespace.last_used[:count] = data["last_used"][order]
+        namespace.labels[:count] = data["labels"][order].tolist()
+        namespace.size = count
+        return namespace
+
+
+class OCRCropCache:
+    """
+    Katalog (namespace) bazlı, boyut sınırlı rakam pHash'leri -> (etiket, güven) önbelleği.
+    Tüm OCR replikaları aynı örneği paylaşır; thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 4096,
+        max_distance: int = 3,
+        min_confidence: float = 0.9,
+        max_catalogs: int = 32,
+        persist_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            max_items: Katalog başına maksimum kayıt
+            max_distance: İsabet için rakam başına maksimum Hamming mesafesi (64 bit üzerinden)
+            min_confidence: Önbelleğe yazılacak okumanın minimum güveni
+            max_catalogs: Bellekte tutulan katalog sayısı (fazlası diske yazılıp atılır)
+            persist_dir: Katalog dosyalarının klasörü (None/boş = kalıcılık kapalı)
+        """
+        self.max_items = max(1, max_items)
+        self.max_distance = max_distance
+        self.min_confidence = min_confidence
+        self.max_catalogs = max(1, max_catalogs)
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+
+        self._namespaces: "OrderedDict[str, _Namespace]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+
+        if self.persist_dir is not None:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+
+    def lookup(self, phash: Optional[Tuple[int, ...]], catalog_id: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Aynı rakam sayısında yakın kayıt varsa (etiket, güven)."""
+        if not phash:
+            return None
+        with self._lock:
+            namespace = self._namespace(catalog_id)
+            index, distance = namespace.nearest(phash)
+            if distance > self.max_distance:
+                self._stats["misses"] += 1
+                return None
+
+            self._clock += 1
+            namespace.last_used[index] = self._clock
+            self._stats["hits"] += 1
+            return namespace.labels[index], float(namespace.confidences[index])
+
+    def put(self, phash: Optional[Tuple[int, ...]], label: str, confidence: float, catalog_id: Optional[str] = None):
+        """
+        Emin okumayı kaydet. Eşiğin altındakiler ve rakam sayısı etiketle
+        uyuşmayanlar (rakamlardan biri ayrılamamış) yok sayılır.
+        """
+        if not phash or not label or len(label) != len(phash) or confidence < self.min_confidence:
+            return
+        with self._lock:
+            self._clock += 1
+            self._namespace(catalog_id).put(phash, label, confidence, self._clock)
+            self._stats["stores"] += 1
+
+    def flush(self):
+        """Değişen katalogları diske yaz (kapanışta çağrılır)."""
+        if self.persist_dir is None:
+            return
+        with self._lock:
+            for name, namespace in self._namespaces.items():
+                self._save(name, namespace)
+
+    def _namespace(self, catalog_id: Optional[str]) -> _Namespace:
+        """Kataloğu bellekten / diskten getir; sınır aşılırsa en eskisini kaydedip at."""
+        name = catalog_id or DEFAULT_NAMESPACE
+        namespace = self._namespaces.get(name)
+        if namespace is not None:
+            self._namespaces.move_to_end(name)
+            return namespace
+
+        namespace = None
+        path = self._path(name)
+        if path is not None and path.exists():
+            try:
+                namespace = _Namespace.load(path, self.max_items)
+                self._clock = max(self._clock, int(namespace.last_used.max(initial=0)))
+            except Exception as e:
+                logger.warning(f"OCR önbelleği okunamadı ({path.name}): {e}")
+        if namespace is None:
+            namespace = _Namespace(self.max_items)
+
+        self._namespaces[name] = namespace
+        while len(self._namespaces) > self.max_catalogs:
+            old_name, old_namespace = self._namespaces.popitem(last=False)
+            self._save(old_name, old_namespace)
+        return namespace
+
+    def _path(self, name: str) -> Optional[Path]:
+        if self.persist_dir is None:
+            return None
+        return self.persist_dir / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)[:100]}.npz"
+
+    def _save(self, name: str, namespace: _Namespace):
+        path = self._path(name)
+        if path is None or not namespace.dirty:
+            return
+        try:
+            namespace.save(path)
+        except Exception as e:
+            logger.warning(f"OCR önbelleği yazılamadı ({path.name}): {e}")
+
+    def get_info(self) -> dict:
+        """Katalog başına kayıt sayısı ve isabet oranı."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            catalogs: Dict[str, int] = {name: ns.size for name, ns in self._namespaces.items()}
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "max_items": self.max_items,
+                "max_distance": self.max_distance,
+                "min_confidence": self.min_confidence,
+                "persistent": self.persist_dir is not None,
+                "catalogs": catalogs
+            }
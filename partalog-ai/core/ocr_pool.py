@@ -0,0 +1,263 @@
+"""
+OCR Worker Pool - Balon OCR'ını birden fazla süreçte çalıştırır.
+Her worker (spawn) kendi easyocr.Reader'ını tutar; böylece EasyOCR ne YOLO
+ile GIL'i ne de torch thread'lerini paylaşır. Bir sayfanın kırpıntıları
+tek bir SharedMemory bloğuna yazılır, worker'lara parçalar halinde
+dağıtılır (pickle ile piksel kopyalanmaz). Kırpıntı önbelleği ve örnek
+deposu ana süreçte kalır.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import AbstractSet, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from core.ocr import CachedNumberReader, OCRRead
+
+
+# ==========================================
+# 👷 WORKER SÜRECİ
+# ==========================================
+
+READY_TIMEOUT = 600  # Worker başına model yükleme süresi sınırı (sn)
+
+_worker_ocr = None
+
+
+def _init_worker(ocr_options: dict, fast_tier_model: Optional[str], torch_threads: int, ready):
+    """Worker başlangıcı: thread sınırları, süreç başına tek HotspotOCR, hazır bildirimi."""
+    global _worker_ocr
+
+    import cv2
+    from core.executor import configure_torch_threads
+    from core.ocr import HotspotOCR
+
+    configure_torch_threads(torch_threads)
+    cv2.setNumThreads(max(1, torch_threads))
+
+    fast_tier = None
+    if fast_tier_model:
+        from core.digit_classifier import DigitClassifier
+        fast_tier = DigitClassifier.load(fast_tier_model)
+
+    _worker_ocr = HotspotOCR(**ocr_options, fast_tier=fast_tier)
+    ready.put(os.getpid())
+
+
+def _noop():
+    pass
+
+
+def _worker_read(
+    shm_name: str,
+    layout: List[Tuple[int, Tuple[int, ...]]],
+    allowed_labels: Optional[AbstractSet[str]]
+) -> List[OCRRead]:
+    """Paylaşılan bloktaki kırpıntıları (kopyalamadan) oku."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    images = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset) for offset, shape in layout]
+    try:
+        return _worker_ocr.read_numbers_scored(images, allowed_labels)
+    finally:
+        del images
+        try:
+            shm.close()
+        except BufferError:
+            pass  # Hata izinde görünüm kaldıysa blok süreç kapanınca bırakılır
+
+
+# ==========================================
+# 🏊 HAVUZ
+# ==========================================
+
+class OCRWorkerPool(CachedNumberReader):
+    """
+    HotspotOCR ile aynı arayüz (read_number / read_numbers_batch / get_info).
+    Thread-safe: birden fazla sayfa aynı anda havuza iş gönderebilir.
+    """
+
+    def __init__(
+        self,
+        ocr_options: dict,
+        workers: int = 2,
+        torch_threads: int = 1,
+        fast_tier_model: Optional[str] = None,
+        min_chunk: int = 4,
+        crop_cache=None,
+        sample_store=None,
+        sample_confidence: float = 0.9
+    ):
+        """
+        Args:
+            ocr_options: Worker'lardaki HotspotOCR argümanları (picklable olmalı)
+            workers: Süreç sayısı (her biri ayrı EasyOCR modeli = ayrı bellek)
+            torch_threads: Worker başına torch / OpenCV thread sayısı
+            fast_tier_model: Worker'larda yüklenecek DigitClassifier dosyası (None = kapalı)
+            min_chunk: Bir worker'a gönderilen en az kırpıntı (küçük sayfalar bölünmez)
+            crop_cache: Ana süreçteki OCRCropCache
+            sample_store: Ana süreçteki DigitSampleStore
+            sample_confidence: Kırpıntının örnek olarak kaydedildiği güven
+        """
+        self.ocr_options = dict(ocr_options)
+        self.workers = max(1, workers)
+        self.torch_threads = max(1, torch_threads)
+        self.fast_tier_model = fast_tier_model
+        self.min_chunk = max(1, min_chunk)
+        self.crop_cache = crop_cache
+        self.sample_store = sample_store
+        self.sample_confidence = sample_confidence
+
+        self._stats_lock = threading.Lock()
+        self._calls = {"crops": 0, "cache_hits": 0, "batches": 0, "tasks": 0, "batch_ms": 0.0, "restarts": 0}
+        self._pool_lock = threading.Lock()
+        self._pids: List[int] = []
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        """Worker'ları başlat ve hepsinin modeli yüklemesini bekle."""
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.ocr_options, self.fast_tier_model, self.torch_threads, ready)
+        )
+        # Boşta worker yokken her submit yeni süreç açar: workers kadar iş = workers kadar süreç.
+        # Başlatma hatası future'da BrokenProcessPool olarak görünür.
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+        self._pids = sorted(ready.get(timeout=READY_TIMEOUT) for _ in range(self.workers))
+        ready.close()
+
+        logger.info(f"OCR worker havuzu hazır: {len(self._pids)} süreç x {self.torch_threads} thread")
+        return executor
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Çöken havuzu (aynı anda tek thread) yeniden kur."""
+        with self._pool_lock:
+            if self._executor is not broken:
+                return  # Başka bir thread zaten yeniledi
+            logger.error("❌ OCR worker süreci çöktü, havuz yeniden başlatılıyor")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start()
+            with self._stats_lock:
+                self._calls["restarts"] += 1
+
+    def read_numbers_scored(
+        self,
+        images: List[np.ndarray],
+        allowed_labels: Optional[AbstractSet[str]] = None
+    ) -> List[OCRRead]:
+        """
+        Kırpıntıları tek SharedMemory bloğuna yaz, worker sayısı kadar parçaya
+        bölüp paralel oku. Worker çökerse havuz yenilenir ve istek bir kez
+        tekrarlanır.
+        """
+        crops = [
+            np.ascontiguousarray(image, dtype=np.uint8) if image is not None and image.size else None
+            for image in images
+        ]
+        valid = [i for i, crop in enumerate(crops) if crop is not None]
+        reads = [OCRRead(None, 0.0, "easyocr") for _ in images]
+        if not valid:
+            return reads
+
+        offsets, total = {}, 0
+        for i in valid:
+            offsets[i] = total
+            total += crops[i].nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=total)
+        try:
+            for i in valid:
+                target = np.ndarray(crops[i].shape, dtype=np.uint8, buffer=shm.buf, offset=offsets[i])
+                target[...] = crops[i]
+                del target
+
+            # Büyük kırpıntılar önce: parçalar piksel olarak dengeli olsun
+            valid.sort(key=lambda i: crops[i].nbytes, reverse=True)
+            parts = min(self.workers, math.ceil(len(valid) / self.min_chunk))
+            chunks = [valid[k::parts] for k in range(parts)]
+
+            for attempt in range(2):
+                executor = self._executor
+                try:
+                    start = time.perf_counter()
+                    futures = [
+                        executor.submit(
+                            _worker_read,
+                            shm.name,
+                            [(offsets[i], crops[i].shape) for i in chunk],
+                            frozenset(allowed_labels) if allowed_labels else None
+                        )
+                        for chunk in chunks
+                    ]
+                    for chunk, future in zip(chunks, futures):
+                        for i, read in zip(chunk, future.result()):
+                            reads[i] = read
+                    break
+                except BrokenProcessPool:
+                    if attempt:
+                        raise
+                    self._restart(executor)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        with self._stats_lock:
+            self._calls["crops"] += len(valid)
+            self._calls["batches"] += 1
+            self._calls["tasks"] += len(chunks)
+            self._calls["batch_ms"] += (time.perf_counter() - start) * 1000
+
+        return reads
+
+    def shutdown(self):
+        """Worker süreçlerini kapat."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fingerprint_options(self) -> dict:
+        """Worker'lardaki HotspotOCR'ınkiyle aynı alanlar (aynı ayarlarda aynı parmak izi)."""
+        fast_tier = None
+        if self.fast_tier_model:
+            from core.digit_classifier import DigitClassifier
+            fast_tier = DigitClassifier.load(self.fast_tier_model).fingerprint()
+        options = self.ocr_options
+        return {
+            "recognition_only": options.get("recognition_only", False),
+            "adaptive": options.get("adaptive", False),
+            "early_exit_confidence": options.get("early_exit_confidence", 0.85),
+            "allowed_label_confidence": options.get("allowed_label_confidence", 0.5),
+            "fast_tier": fast_tier,
+            "fast_tier_confidence": options.get("fast_tier_confidence", 0.9)
+        }
+
+    def get_info(self) -> dict:
+        """Havuz ve dağıtım istatistikleri (yöntem istatistikleri worker'larda kalır)."""
+        with self._stats_lock:
+            calls = dict(self._calls)
+        batches = calls["batches"]
+        return {
+            "engine": "EasyOCR",
+            "mode": "process_pool",
+            "workers": self.workers,
+            "worker_pids": self._pids,
+            "torch_threads_per_worker": self.torch_threads,
+            "min_chunk": self.min_chunk,
+            "options": self.ocr_options,
+            "fast_tier_model": self.fast_tier_model,
+            "sample_store": self.sample_store.get_info() if self.sample_store is not None else None,
+            "stats": {
+                **{k: v for k, v in calls.items() if k != "batch_ms"},
+                "avg_batch_ms": round(calls["batch_ms"] / batches, 2) if batches else 0.0
+            }
+        }
@@ -0,0 +1,205 @@
+"""
+OCR Preprocess - Balon kırpıntılarının OCR ön işleme varyantlarını üretir.
+Gri dönüşüm kırpıntı başına bir kez yapılır, CLAHE nesneleri (thread başına)
+ve daire maskeleri (boyut başına) önbelleğe alınır. Birden fazla kırpıntının
+ikili varyantları tek bir tuvale yerleştirilip 3x büyütme tek cv2.resize
+çağrısıyla yapılır; dönen varyantlar bu büyük tuvalin görünümleridir (kopya
+yok). Tek kırpıntıda tuval kazandırmaz, varyantlar ayrı büyütülür.
+"""
+
+import threading
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+
+METHODS = ("center_inverted", "center_adaptive", "full_inverted", "mask_circle")
+
+SCALE = 3              # OCR için büyütme katsayısı
+BORDER = 2             # Kübik interpolasyonun okuduğu komşu piksel sayısı
+CENTER_RATIO = 0.6     # Merkez varyantlarının kırpma oranı
+MAX_ROW_WIDTH = 4096   # Tuvalde bir satırın maksimum genişliği (px, büyütme öncesi)
+
+_CLOSE_KERNEL = np.ones((2, 2), np.uint8)
+_local = threading.local()
+
+
+def _clahe() -> "cv2.CLAHE":
+    """Thread'e özel CLAHE (cv2.CLAHE nesneleri thread-safe değil)."""
+    clahe = getattr(_local, "clahe", None)
+    if clahe is None:
+        clahe = _local.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    return clahe
+
+
+@lru_cache(maxsize=256)
+def circle_mask(height: int, width: int) -> np.ndarray:
+    """Balon içi maskesi (%80 çap); boyut başına bir kez üretilir, salt okunur."""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.circle(mask, (width // 2, height // 2), int(min(width, height) * 0.4), 255, -1)
+    mask.flags.writeable = False
+    return mask
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """BGR ise gri kopya, zaten griyse kendisi (görünümler kopyalanmaz)."""
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def center_slices(height: int, width: int, ratio: float = CENTER_RATIO) -> Tuple[slice, slice]:
+    """Merkez bölge dilimleri; kenardan en az 3 px, sonuç 10 px'den küçükse tüm görüntü."""
+    margin_x = max(int(width * (1 - ratio) / 2), 3)
+    margin_y = max(int(height * (1 - ratio) / 2), 3)
+
+    if height - 2 * margin_y < 10 or width - 2 * margin_x < 10:
+        return slice(0, height), slice(0, width)
+    return slice(margin_y, height - margin_y), slice(margin_x, width - margin_x)
+
+
+# ==========================================
+# ⚫ İKİLİ VARYANTLAR (orijinal çözünürlükte)
+# ==========================================
+
+def _inverted_binary(inverted: np.ndarray) -> np.ndarray:
+    """Ters çevrilmiş gri -> CLAHE -> median -> Otsu."""
+    enhanced = _clahe().apply(inverted)
+    denoised = cv2.medianBlur(enhanced, 3)
+    _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+
+def _adaptive_binary(gray: np.ndarray) -> np.ndarray:
+    """Adaptive threshold (ters) + küçük boşlukları kapatma."""
+    binary = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY_INV, 11, 2
+    )
+    return cv2.morphologyEx(binary, cv2.MORPH_CLOSE, _CLOSE_KERNEL)
+
+
+def _masked_binary(inverted: np.ndarray) -> np.ndarray:
+    """Yalnızca balon içi: ters gri maskelenir (dışı 0), sonra Otsu."""
+    masked = cv2.bitwise_and(inverted, circle_mask(*inverted.shape[:2]))
+    _, binary = cv2.threshold(masked, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+
+def binarize(image: np.ndarray, method_names: Sequence[str]) -> List[Tuple[str, np.ndarray]]:
+    """
+    Kırpıntının istenen varyantlarını büyütmeden üret.
+    Gri ve ters gri bir kez hesaplanır; merkez varyantları bunların görünümleri üzerinde çalışır.
+    """
+    gray = to_gray(image)
+    center = center_slices(*gray.shape[:2])
+    inverted: Optional[np.ndarray] = None
+
+    variants = []
+    for method_name in method_names:
+        try:
+            if method_name != "center_adaptive" and inverted is None:
+                inverted = cv2.bitwise_not(gray)
+
+            if method_name == "center_inverted":
+                binary = _inverted_binary(inverted[center])
+            elif method_name == "center_adaptive":
+                binary = _adaptive_binary(gray[center])
+            elif method_name == "full_inverted":
+                binary = _inverted_binary(inverted)
+            elif method_name == "mask_circle":
+                binary = _masked_binary(inverted)
+            else:
+                raise ValueError(f"Bilinmeyen yöntem: {method_name}")
+        except Exception as e:
+            logger.debug("OCR method '{}' failed: {}".format(method_name, e))
+            continue
+        variants.append((method_name, binary))
+
+    return variants
+
+
+# ==========================================
+# 🧩 TOPLU BÜYÜTME
+# ==========================================
+
+def _pack(shapes: Sequence[Tuple[int, int]], max_row_width: int) -> Tuple[int, int, List[Tuple[int, int]]]:
+    """
+    Panelleri satırlara diz (her panelin etrafında BORDER kadar pay).
+
+    Returns:
+        (tuval yüksekliği, tuval genişliği, panel başına (y, x) orijini)
+    """
+    origins = []
+    x = y = row_height = width = 0
+
+    for h, w in shapes:
+        cell_h, cell_w = h + 2 * BORDER, w + 2 * BORDER
+        if x and x + cell_w > max_row_width:
+            y += row_height
+            x = row_height = 0
+        origins.append((y + BORDER, x + BORDER))
+        x += cell_w
+        row_height = max(row_height, cell_h)
+        width = max(width, x)
+
+    return y + row_height, width, origins
+
+
+def preprocess_batch(
+    images: Sequence[np.ndarray],
+    method_names: Sequence[Sequence[str]],
+    scale: int = SCALE,
+    max_row_width: int = MAX_ROW_WIDTH
+) -> List[List[Tuple[str, np.ndarray]]]:
+    """
+    Birden fazla kırpıntının (örn. bir sayfanın tüm balonlarının) varyantlarını üret.
+
+    İkili varyantlar tek tuvale kenarları replicate edilerek yerleştirilir;
+    cv2.resize kenarda da replicate kullandığı için tek çağrılık büyütme,
+    her varyantı ayrı büyütmekle piksel piksel aynıdır. Tek kırpıntıda
+    tuvali doldurma/kopyalama maliyeti kazancı aştığından varyantlar ayrı
+    cv2.resize ile büyütülür.
+
+    Args:
+        images: Kırpıntılar (BGR ya da gri)
+        method_names: Her kırpıntı için üretilecek yöntemler
+
+    Returns:
+        Her kırpıntı için [(yöntem adı, büyütülmüş ikili görüntü), ...]
+    """
+    panels = []  # (kırpıntı indeksi, yöntem adı, ikili görüntü)
+    for index, (image, names) in enumerate(zip(images, method_names)):
+        if image is None or image.size == 0 or not names:
+            continue
+        panels.extend((index, name, binary) for name, binary in binarize(image, names))
+
+    outputs: List[List[Tuple[str, np.ndarray]]] = [[] for _ in images]
+    if not panels:
+        return outputs
+
+    if len({index for index, _, _ in panels}) == 1:
+        for index, name, binary in panels:
+            outputs[index].append(
+                (name, cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC))
+            )
+        return outputs
+
+    height, width, origins = _pack([binary.shape[:2] for _, _, binary in panels], max_row_width)
+    canvas = np.zeros((height, width), dtype=np.uint8)
+
+    for (_, _, binary), (y, x) in zip(panels, origins):
+        h, w = binary.shape[:2]
+        cv2.copyMakeBorder(
+            binary, BORDER, BORDER, BORDER, BORDER, cv2.BORDER_REPLICATE,
+            dst=canvas[y - BORDER:y + h + BORDER, x - BORDER:x + w + BORDER]
+        )
+
+    enlarged = cv2.resize(canvas, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+    for (index, name, binary), (y, x) in zip(panels, origins):
+        h, w = binary.shape[:2]
+        outputs[index].append((name, enlarged[y * scale:(y + h) * scale, x * scale:(x + w) * scale]))
+
+    return outputs
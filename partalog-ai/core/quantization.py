@@ -0,0 +1,146 @@
+"""
+Detector Quantization - FP32 ONNX modelinden INT8 (QDQ) model üretir.
+Kalibrasyon, yerel örnek sayfaların ultralytics ile birebir aynı ön
+işlemeden geçirilmesiyle yapılır (letterbox, RGB, CHW, /255).
+"""
+
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+from loguru import logger
+
+
+def preprocess_page(image: np.ndarray, img_size: int, stride: int = 32) -> np.ndarray:
+    """
+    Sayfayı YOLO girişine çevir (ultralytics predictor ile aynı).
+
+    Args:
+        image: OpenCV formatında görüntü (BGR)
+        img_size: Model giriş boyutu
+        stride: Model stride değeri (letterbox hizalaması)
+
+    Returns:
+        (1, 3, H, W) float32 tensör
+    """
+    from ultralytics.data.augment import LetterBox
+
+    # Dinamik ONNX graflarında predictor minimal padding (auto=True) kullanır
+    letterboxed = LetterBox(new_shape=(img_size, img_size), auto=True, stride=stride)(image=image)
+    tensor = letterboxed[..., ::-1].transpose(2, 0, 1)  # BGR->RGB, HWC->CHW
+    tensor = np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+    return tensor[None]
+
+
+class PageCalibrationReader:
+    """onnxruntime CalibrationDataReader: örnek sayfaları sırayla besler."""
+
+    def __init__(self, input_name: str, pages: Iterable[np.ndarray], img_size: int):
+        self.input_name = input_name
+        self.img_size = img_size
+        self._pages = iter(pages)
+
+    def get_next(self) -> Optional[dict]:
+        image = next(self._pages, None)
+        if image is None:
+            return None
+        return {self.input_name: preprocess_page(image, self.img_size)}
+
+    def rewind(self):
+        # Tek geçişlik kalibrasyon (MinMax / Percentile) için gerekli değil
+        pass
+
+
+def _head_nodes_to_exclude(model) -> List[str]:
+    """
+    Detect head'in kutu çözme (DFL, concat, sigmoid, aritmetik) düğümleri.
+    Bu düğümler INT8'de koordinat hassasiyetini bozduğu için FP32 bırakılır;
+    head'in konvolüsyon dalları (cv2.* / cv3.*) yine quantize edilir.
+    """
+    pattern = re.compile(r"/model\.(\d+)/")
+    blocks = [int(m.group(1)) for node in model.graph.node if (m := pattern.search(node.name))]
+    if not blocks:
+        return []
+
+    head = f"/model.{max(blocks)}/"
+    branch = re.compile(r"/cv\d+\.\d+/")
+    return [
+        node.name for node in model.graph.node
+        if head in node.name and not branch.search(node.name)
+    ]
+
+
+def quantize_detector(
+    fp32_path: str,
+    int8_path: str,
+    pages: List[np.ndarray],
+    img_size: int,
+    method: str = "minmax",
+    per_channel: bool = True
+) -> Path:
+    """
+    FP32 ONNX detector'ı statik INT8 (QDQ) olarak quantize et.
+
+    Args:
+        fp32_path: Export edilmiş FP32 .onnx dosyası
+        int8_path: Üretilecek INT8 .onnx dosyası
+        pages: Kalibrasyon sayfaları (BGR)
+        img_size: Model giriş boyutu
+        method: Kalibrasyon yöntemi (minmax | percentile | entropy)
+        per_channel: Ağırlıklar için kanal bazlı ölçekleme
+
+    Returns:
+        INT8 model yolu
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "percentile": CalibrationMethod.Percentile,
+        "entropy": CalibrationMethod.Entropy,
+    }
+    if method not in methods:
+        raise ValueError(f"Desteklenmeyen kalibrasyon yöntemi: {method}")
+    if not pages:
+        raise ValueError("Kalibrasyon için en az bir sayfa gerekli")
+
+    fp32_model = onnx.load(fp32_path)
+    input_name = fp32_model.graph.input[0].name
+
+    # Shape inference + graf optimizasyonu (onnxruntime'ın önerdiği ön adım)
+    prepared_path = str(Path(int8_path).with_suffix(".prep.onnx"))
+    quant_pre_process(fp32_path, prepared_path, skip_symbolic_shape=True)
+    excluded = _head_nodes_to_exclude(onnx.load(prepared_path))
+
+    logger.info(
+        f"INT8 kalibrasyonu: {len(pages)} sayfa, yöntem={method}, "
+        f"{len(excluded)} head düğümü FP32 bırakıldı"
+    )
+
+    quantize_static(
+        model_input=prepared_path,
+        model_output=int8_path,
+        calibration_data_reader=PageCalibrationReader(input_name, pages, img_size),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+        calibrate_method=methods[method],
+        nodes_to_exclude=excluded,
+    )
+    Path(prepared_path).unlink(missing_ok=True)
+
+    # ultralytics metadata'sı (names, stride, imgsz, task) korunmalı, yoksa
+    # AutoBackend sınıf isimlerini ve stride'ı bilemez
+    int8_model = onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+
+    logger.success(f"✅ INT8 model kaydedildi: {int8_path}")
+    return Path(int8_path)
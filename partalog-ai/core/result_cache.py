@@ -0,0 +1,170 @@
+"""
+Result Cache - Aynı sayfa tekrar gönderildiğinde YOLO + OCR'ı atlar.
+İki katmanlıdır: bellekte LRU ve (opsiyonel) diskte boyut sınırlı depo.
+Değerler JSON bytes olarak saklanır; anahtar, yüklenen dosyanın hash'i ile
+sonucu etkileyen model/istek ayarlarından üretilir.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+
+
+class ResultCache:
+    """
+    Bellek (LRU) + disk (boyut sınırlı, en eski kullanılan silinir) önbelleği.
+    Thread-safe; disk erişimi olduğu için API'den asyncio.to_thread ile çağrılır.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 512,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024
+    ):
+        """
+        Args:
+            max_items: Bellekte tutulacak maksimum sonuç
+            disk_dir: Disk katmanı klasörü (None/boş = kapalı)
+            disk_max_bytes: Disk katmanının maksimum toplam boyutu
+        """
+        self.max_items = max(1, max_items)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()  # anahtar -> boyut (LRU sırası)
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "disk_evictions": 0}
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Anahtar parçalarından (hash, ayarlar...) tek bir anahtar üret."""
+        return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Önce bellek, sonra disk katmanına bak; diskte bulunan belleğe alınır."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits_memory"] += 1
+                return value
+
+            if self.disk_dir is None or key not in self._disk_index:
+                self._stats["misses"] += 1
+                return None
+
+            path = self._disk_path(key)
+            try:
+                value = path.read_bytes()
+                os.utime(path)  # Yeniden başlatmada LRU sırası mtime'dan kurulur
+            except OSError:
+                self._forget_disk(key)
+                self._stats["misses"] += 1
+                return None
+
+            self._disk_index.move_to_end(key)
+            self._remember(key, value)
+            self._stats["hits_disk"] += 1
+            return value
+
+    def put(self, key: str, value: bytes):
+        """Sonucu iki katmana da yaz."""
+        with self._lock:
+            self._remember(key, value)
+
+            if self.disk_dir is None or len(value) > self.disk_max_bytes:
+                return
+
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(value)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Sonuç önbelleği diske yazılamadı: {e}")
+                return
+
+            self._forget_disk(key, delete=False)
+            self._disk_index[key] = len(value)
+            self._disk_bytes += len(value)
+            self._evict_disk()
+
+    def clear(self):
+        """Tüm katmanları boşalt."""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_index):
+                self._forget_disk(key)
+
+    def _remember(self, key: str, value: bytes):
+        """Bellek katmanına ekle, taşarsa en eskiyi at."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _forget_disk(self, key: str, delete: bool = True):
+        """Disk indeksinden (ve istenirse dosyadan) çıkar."""
+        size = self._disk_index.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+        if delete:
+            self._disk_path(key).unlink(missing_ok=True)
+
+    def _evict_disk(self):
+        """Disk katmanı sınırı aşıldıysa en eski kullanılanları sil."""
+        while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+            key = next(iter(self._disk_index))
+            self._forget_disk(key)
+            self._stats["disk_evictions"] += 1
+
+    def _load_disk_index(self):
+        """Mevcut disk kayıtlarını mtime sırasıyla indeksle."""
+        entries = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+        self._evict_disk()
+        logger.info(
+            f"Sonuç önbelleği (disk): {len(self._disk_index)} kayıt, "
+            f"{self._disk_bytes / 1024 / 1024:.1f} MB"
+        )
+
+    def get_info(self) -> dict:
+        """Katman boyutları ve isabet istatistikleri."""
+        with self._lock:
+            hits = self._stats["hits_memory"] + self._stats["hits_disk"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "memory_items": len(self._memory),
+                "max_items": self.max_items,
+                "disk_enabled": self.disk_dir is not None,
+                "disk_items": len(self._disk_index),
+                "disk_mb": round(self._disk_bytes / 1024 / 1024, 2),
+                "disk_max_mb": round(self.disk_max_bytes / 1024 / 1024, 2),
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,180 @@
+"""
+Model Warm-up - Servis açılışında YOLO ve EasyOCR'ı sentetik girdilerle çalıştırır.
+İlk gerçek istek lazy başlatma, bellek ayırıcı büyümesi ve graf kurulumu
+maliyetini ödemesin diye her replika birkaç kez ısıtılır; durum /ready
+endpoint'inden izlenir.
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+import cv2
+import numpy as np
+from loguru import logger
+
+
+# ==========================================
+# 🖼️ SENTETİK GİRDİLER
+# ==========================================
+
+def synthetic_balloon(number: str = "12", size: int = 64) -> np.ndarray:
+    """Beyaz zemin üzerinde numaralı balon (OCR girdisi boyutunda, BGR)."""
+    image = np.full((size, size, 3), 255, dtype=np.uint8)
+    center = (size // 2, size // 2)
+    cv2.circle(image, center, int(size * 0.42), (0, 0, 0), 2)
+
+    scale = size / 64
+    (text_w, text_h), _ = cv2.getTextSize(number, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+    origin = (center[0] - text_w // 2, center[1] + text_h // 2)
+    cv2.putText(image, number, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), 2, cv2.LINE_AA)
+    return image
+
+
+def synthetic_page(width: int = 1600, height: int = 1200, balloons: int = 12) -> np.ndarray:
+    """Çizgi çizimi + leader çizgili balonlar içeren sentetik katalog sayfası (BGR)."""
+    rng = np.random.default_rng(0)
+    page = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    # Montaj çizimi yerine birkaç dikdörtgen / daire
+    for _ in range(8):
+        x, y = int(rng.integers(width * 0.3, width * 0.6)), int(rng.integers(height * 0.3, height * 0.6))
+        w, h = int(rng.integers(60, 240)), int(rng.integers(60, 240))
+        cv2.rectangle(page, (x, y), (x + w, y + h), (0, 0, 0), 2)
+        cv2.circle(page, (x + w // 2, y + h // 2), min(w, h) // 3, (0, 0, 0), 1)
+
+    balloon = 64
+    centers = [
+        (int(width / 2 + np.cos(angle) * width * 0.38), int(height / 2 + np.sin(angle) * height * 0.38))
+        for angle in np.linspace(0, 2 * np.pi, balloons, endpoint=False)
+    ]
+    for cx, cy in centers:
+        cv2.line(page, (cx, cy), (width // 2, height // 2), (0, 0, 0), 1)
+    for i, (cx, cy) in enumerate(centers):
+        x, y = cx - balloon // 2, cy - balloon // 2
+        page[y:y + balloon, x:x + balloon] = synthetic_balloon(str(i + 1), balloon)
+
+    return page
+
+
+# ==========================================
+# 🔥 ISITMA
+# ==========================================
+
+def _timed_calls(func, sample, iterations: int) -> List[float]:
+    """func(sample) çağrılarını ölç (ms)."""
+    timings = []
+    for _ in range(max(1, iterations)):
+        start = time.perf_counter()
+        func(sample)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def warm_detector(detector, page: np.ndarray, iterations: int) -> List[float]:
+    """Tek replika: sentetik sayfada detect() (aktif mod: full / tiled / cascade)."""
+    return _timed_calls(detector.detect, page, iterations)
+
+
+def warm_ocr(ocr, balloon: np.ndarray, iterations: int) -> List[float]:
+    """
+    Tek replika: sentetik balonda read_numbers_scored() (tüm ön işleme yöntemleri).
+    Kırpıntı önbelleği ve örnek deposu atlanır: her tur EasyOCR'a gider (diskteki
+    önbellekten isabet alıp ısınmamış kalmaz) ve sentetik balon hızlı katmanın
+    eğitim örneklerine yazılmaz.
+    """
+    gray = cv2.cvtColor(balloon, cv2.COLOR_BGR2GRAY)  # read_numbers_batch de griye çevirip verir
+    return _timed_calls(lambda sample: ocr.read_numbers_scored([sample]), gray, iterations)
+
+
+class WarmupState:
+    """Model bazında hazır olma durumu (/ready için)."""
+
+    def __init__(self, loaded: Dict[str, bool]):
+        """
+        Args:
+            loaded: Model adı -> yüklendi mi (yüklenemeyenler 'unavailable')
+        """
+        self.models: Dict[str, dict] = {
+            name: {"status": "pending" if is_loaded else "unavailable"}
+            for name, is_loaded in loaded.items()
+        }
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def update(self, name: str, status: str, **details):
+        self.models[name] = {"status": status, **details}
+
+    def skip(self):
+        """Warm-up kapalı: yüklü modeller doğrudan hazır."""
+        for name, info in self.models.items():
+            if info["status"] == "pending":
+                self.update(name, "ready", warmup_ms=None)
+        self.finished_at = time.time()
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None and all(
+            info["status"] in ("ready", "unavailable") for info in self.models.values()
+        )
+
+    def get_info(self) -> dict:
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round((self.finished_at - self.started_at) * 1000, 2)
+        return {
+            "ready": self.ready,
+            "warmup_total_ms": duration,
+            "models": self.models
+        }
+
+
+async def warm_up(executor, state: WarmupState, iterations: int = 2):
+    """
+    Kayıtlı tüm YOLO / OCR replikalarını paralel ısıt.
+
+    Replika sayısı kadar eşzamanlı çağrı yapılır; executor her çağrıya boştaki
+    bir replikayı verdiği için her replika ayrı ayrı ısınmış olur.
+    """
+    state.started_at = time.time()
+    jobs = {
+        "yolo": (warm_detector, synthetic_page()),
+        "ocr": (warm_ocr, synthetic_balloon()),
+    }
+
+    async def run(name: str):
+        func, sample = jobs[name]
+        replica_count = len(executor.replicas(name))
+        state.update(name, "warming", replicas=replica_count)
+        start = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(
+                executor.run(name, func, sample, iterations) for _ in range(replica_count)
+            ))
+        except Exception as e:
+            # Isınma hatası modeli kullanılamaz yapmaz; ilk istek yavaş olabilir
+            logger.warning(f"⚠️ {name} warm-up hatası: {e}")
+            state.update(name, "ready", replicas=replica_count, warmup_ms=None, error=str(e))
+            return
+
+        state.update(
+            name,
+            "ready",
+            replicas=replica_count,
+            warmup_ms=round((time.perf_counter() - start) * 1000, 2),
+            first_call_ms=round(max(timings[0] for timings in results), 2),
+            warm_call_ms=round(max(timings[-1] for timings in results), 2)
+        )
+        logger.success(
+            f"🔥 {name} ısındı: ilk çağrı {state.models[name]['first_call_ms']}ms -> "
+            f"{state.models[name]['warm_call_ms']}ms ({replica_count} replika)"
+        )
+
+    names: Iterable[str] = [
+        name for name, info in state.models.items()
+        if info["status"] == "pending" and executor.has(name)
+    ]
+    await asyncio.gather(*(run(name) for name in names))
+
+    state.finished_at = time.time()
+    logger.success(f"✅ Servis hazır (warm-up {state.get_info()['warmup_total_ms']}ms)")
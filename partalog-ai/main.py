@@ -7,13 +7,16 @@ Görevi: C# Backend için Zeka Servislerini (YOLO, OCR, Gemini, Embedding) sunma
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from loguru import logger
 from pydantic import BaseModel
+import asyncio
 import sys
 import os
 import uvicorn
 import time
+from pathlib import Path
 
 # --- 2. Ayarlar ---
 from config import settings
@@ -29,6 +32,7 @@ from api.table import router as table_router       # Gemini Tablo Okuma
 from api.analysis import router as analysis_router # Sayfa Sınıflandırma
 from api.chat import router as chat_router         # Chatbot (Türkçe & 3072 Uyumlu)
 from api.visual_ingest import router as visual_ingest_router  # ✅ Visual Ingest
+from core.executor import ExecutorBusy             # Dolu inference kuyruğu -> 503
 
 # --- 5. Gelişmiş Loglama Ayarı ---
 logger.remove()
@@ -42,39 +46,221 @@ logger.add(
 # --- 6. Model Başlatma (Lifespan) ---
 models = {}
 
+def ocr_options() -> dict:
+    """HotspotOCR'ın ayarlardan gelen (picklable) argümanları; worker süreçleri de kullanır."""
+    return {
+        "use_gpu": settings.OCR_USE_GPU,
+        "batch_size": settings.OCR_BATCH_SIZE,
+        "recognition_only": settings.OCR_RECOGNITION_ONLY,
+        "adaptive": settings.OCR_ADAPTIVE,
+        "early_exit_confidence": settings.OCR_EARLY_EXIT_CONFIDENCE,
+        "allowed_label_confidence": settings.OCR_ALLOWED_LABEL_CONFIDENCE,
+        "fast_tier_confidence": settings.OCR_FAST_TIER_CONFIDENCE,
+    }
+
+def fast_tier_model_path():
+    """Hızlı rakam modeli açıksa ve dosya varsa yolu, yoksa None."""
+    if not settings.OCR_FAST_TIER_ENABLED:
+        return None
+    if not Path(settings.OCR_FAST_TIER_MODEL).exists():
+        logger.warning(f"⚠️ Hızlı rakam modeli yok ({settings.OCR_FAST_TIER_MODEL}), yalnızca EasyOCR kullanılacak.")
+        return None
+    return settings.OCR_FAST_TIER_MODEL
+
+def create_sample_store():
+    """OCR_SAMPLE_DIR ayarlıysa hızlı katmanın eğitim örneği deposu (tüm replikalarda tek örnek)."""
+    from core.digit_classifier import DigitSampleStore
+    if not settings.OCR_SAMPLE_DIR:
+        return None
+    return DigitSampleStore(settings.OCR_SAMPLE_DIR, settings.OCR_SAMPLE_MAX_PER_LABEL)
+
+def create_ocr():
+    """Ayarlardan HotspotOCR oluştur (ana model ve replikalar için ortak)."""
+    from core.ocr import HotspotOCR
+    from core.digit_classifier import DigitClassifier
+    
+    model_path = fast_tier_model_path()
+    return HotspotOCR(
+        **ocr_options(),
+        fast_tier=DigitClassifier.load(model_path) if model_path else None,
+        sample_store=models.get("sample_store"),
+        sample_confidence=settings.OCR_SAMPLE_CONFIDENCE,
+        crop_cache=models.get("ocr_cache")
+    )
+
+def create_ocr_pool():
+    """OCR_WORKERS süreçli havuz; önbellek ve örnek deposu ana süreçte kalır."""
+    from core.ocr_pool import OCRWorkerPool
+    return OCRWorkerPool(
+        ocr_options(),
+        settings.OCR_WORKERS,
+        settings.OCR_WORKER_TORCH_THREADS,
+        fast_tier_model=fast_tier_model_path(),
+        min_chunk=settings.OCR_WORKER_MIN_CHUNK,
+        crop_cache=models.get("ocr_cache"),
+        sample_store=models.get("sample_store"),
+        sample_confidence=settings.OCR_SAMPLE_CONFIDENCE
+    )
+
+def create_detector():
+    """Ayarlardan HotspotDetector oluştur (ana model ve replikalar için ortak)."""
+    from core.detector import CascadeConfig, HotspotDetector, TilingConfig
+    return HotspotDetector(
+        settings.YOLO_MODEL_PATH,
+        settings.YOLO_CONFIDENCE,
+        settings.YOLO_IMG_SIZE,
+        settings.YOLO_BACKEND,
+        settings.YOLO_PRECISION,
+        settings.YOLO_INT8_MODEL_PATH or None,
+        mode=settings.YOLO_MODE,
+        tiling=TilingConfig(
+            tile_size=settings.YOLO_TILE_SIZE,
+            overlap=settings.YOLO_TILE_OVERLAP,
+            min_side=settings.YOLO_TILE_MIN_SIDE,
+            batch_size=settings.YOLO_TILE_BATCH,
+            nms_iou=settings.YOLO_TILE_NMS_IOU
+        ),
+        cascade=CascadeConfig(
+            tiers=tuple(int(t) for t in settings.YOLO_CASCADE_TIERS.split(",") if t.strip()),
+            ambiguous_confidence=settings.YOLO_CASCADE_AMBIGUOUS_CONF,
+            roi_padding=settings.YOLO_CASCADE_ROI_PADDING,
+            max_roi_fraction=settings.YOLO_CASCADE_MAX_ROI_FRACTION
+        )
+    )
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("=" * 60)
     logger.info(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} (Service Mode) BAŞLATILIYOR...")
     logger.info("=" * 60)
     
+    # torch thread sayısı (replikalar arası oversubscription'ı önler)
+    from core.executor import InferenceExecutor, configure_torch_threads
+    configure_torch_threads(settings.INFERENCE_TORCH_THREADS)
+    
     # A. YOLO Hotspot Detector Yükle (Varsa)
     if os.path.exists(settings.YOLO_MODEL_PATH):
         try:
-            from core.detector import HotspotDetector
-            models["yolo"] = HotspotDetector(
-                settings.YOLO_MODEL_PATH, 
-                settings.YOLO_CONFIDENCE, 
-                settings.YOLO_IMG_SIZE
+            models["yolo"] = create_detector()
+            logger.success(
+                f"✅ YOLO Modeli Yüklendi: {settings.YOLO_MODEL_PATH} "
+                f"({settings.YOLO_BACKEND}/{settings.YOLO_PRECISION}, mod: {settings.YOLO_MODE})"
             )
-            logger.success(f"✅ YOLO Modeli Yüklendi: {settings.YOLO_MODEL_PATH}")
         except Exception as e:
             logger.error(f"❌ YOLO Başlatılamadı: {e}")
     else:
         logger.warning(f"⚠️ Model dosyası yok: {settings.YOLO_MODEL_PATH}")
     
-    # B. EasyOCR Yükle
+    # B. EasyOCR Yükle (kırpıntı önbelleği ve örnek deposu tüm OCR replikalarınca paylaşılır;
+    #    etiket başına örnek sınırı replika sayısından bağımsız kalır)
+    models["sample_store"] = create_sample_store()
+    if settings.OCR_CACHE_ENABLED:
+        from core.ocr_cache import OCRCropCache
+        models["ocr_cache"] = OCRCropCache(
+            settings.OCR_CACHE_MAX_ITEMS,
+            settings.OCR_CACHE_MAX_DISTANCE,
+            settings.OCR_CACHE_MIN_CONFIDENCE,
+            persist_dir=settings.OCR_CACHE_DIR or None
+        )
     try:
-        from core.ocr import HotspotOCR
-        models["ocr"] = HotspotOCR(use_gpu=settings.OCR_USE_GPU)
-        logger.success("✅ EasyOCR Motoru Hazır.")
+        if settings.OCR_WORKERS > 0:
+            models["ocr"] = create_ocr_pool()
+            logger.success(f"✅ EasyOCR Motoru Hazır ({settings.OCR_WORKERS} worker süreci).")
+        else:
+            models["ocr"] = create_ocr()
+            logger.success("✅ EasyOCR Motoru Hazır.")
     except Exception as e:
         logger.error(f"❌ EasyOCR Hatası: {e}")
     
+    # C. Inference Executor (YOLO/OCR event loop dışında, replika havuzlarıyla)
+    executor = InferenceExecutor(settings.INFERENCE_MAX_PENDING)
+    if models.get("yolo"):
+        try:
+            replicas = [models["yolo"]] + [
+                create_detector() for _ in range(settings.INFERENCE_YOLO_REPLICAS - 1)
+            ]
+        except Exception as e:
+            logger.error(f"❌ YOLO replikaları oluşturulamadı: {e}")
+            replicas = [models["yolo"]]
+        executor.register("yolo", replicas)
+    if models.get("ocr") and settings.OCR_WORKERS > 0:
+        # Havuz thread-safe: worker sayısı kadar sayfa aynı anda dağıtılabilir
+        executor.register("ocr", [models["ocr"]] * settings.OCR_WORKERS)
+    elif models.get("ocr"):
+        try:
+            replicas = [models["ocr"]] + [
+                create_ocr() for _ in range(settings.INFERENCE_OCR_REPLICAS - 1)
+            ]
+        except Exception as e:
+            logger.error(f"❌ OCR replikaları oluşturulamadı: {e}")
+            replicas = [models["ocr"]]
+        executor.register("ocr", replicas)
+    models["executor"] = executor
+    
+    # D. Eşzamanlı /detect isteklerini tek batch'te toplayan zamanlayıcı
+    if models.get("yolo") and settings.YOLO_BATCHING_ENABLED:
+        from core.batcher import DetectionBatcher
+        models["yolo_batcher"] = DetectionBatcher(
+            models["yolo"],
+            settings.YOLO_BATCH_MAX_SIZE,
+            settings.YOLO_BATCH_MAX_WAIT_MS,
+            executor=executor
+        )
+        await models["yolo_batcher"].start()
+    
+    # E. Hotspot sonuç önbelleği (tekrar gönderilen sayfalar için)
+    if models.get("yolo") and settings.HOTSPOT_CACHE_ENABLED:
+        from core.result_cache import ResultCache
+        models["result_cache"] = ResultCache(
+            settings.HOTSPOT_CACHE_MAX_ITEMS,
+            settings.HOTSPOT_CACHE_DIR or None,
+            settings.HOTSPOT_CACHE_DISK_MAX_MB * 1024 * 1024
+        )
+        models["yolo"].fingerprint()  # Model hash'i ilk istekten önce hesaplansın
+        if models.get("ocr"):
+            models["ocr"].fingerprint()
+    
+    # F. Tablo çıkarımı için açık PDF önbelleği (sayfa başına istekte PDF tekrar parse edilmez)
+    if settings.DOCUMENT_CACHE_ENABLED:
+        from core.document_cache import DocumentCache
+        models["document_cache"] = DocumentCache(
+            settings.DOCUMENT_CACHE_MAX_DOCUMENTS,
+            settings.DOCUMENT_CACHE_MAX_MB * 1024 * 1024,
+            settings.DOCUMENT_PREFETCH_PAGES
+        )
+    
+    # G. Gemini REST çağrılarının paylaştığı HTTP oturumu (keep-alive, DNS önbelleği)
+    from services.gemini_client import start_gemini_client, close_gemini_client
+    await start_gemini_client()
+    
+    # H. Warm-up: replikalar sentetik girdilerle ısıtılır (arka planda, /ready bitene kadar 503)
+    from core.warmup import WarmupState, warm_up
+    warmup_state = WarmupState({"yolo": "yolo" in models, "ocr": "ocr" in models})
+    models["warmup"] = warmup_state
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(warm_up(executor, warmup_state, settings.WARMUP_ITERATIONS))
+    else:
+        warmup_state.skip()
+    
     logger.info(f"📍 Servis Yayında: http://{settings.HOST}:{settings.PORT}")
     yield
     # Kapanış
     logger.info("👋 Servis durduruluyor, modeller temizleniyor...")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    if models.get("yolo_batcher"):
+        await models["yolo_batcher"].stop()
+    executor.shutdown()
+    if settings.OCR_WORKERS > 0 and models.get("ocr"):
+        models["ocr"].shutdown()
+    if models.get("ocr_cache"):
+        models["ocr_cache"].flush()
+    if models.get("document_cache"):
+        models["document_cache"].shutdown()
+    await close_gemini_client()
+    from services.gemini_cache import close_gemini_cache
+    close_gemini_cache()
     models.clear()
 
 # --- 7. Uygulama Tanımı ---
@@ -94,6 +280,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- 8b. Aşırı Yük: executor kuyruğu doluysa istek beklemeden 503 alır ---
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request, exc: ExecutorBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 # --- 9. Statik Dosyalar ---
 if os.path.exists("static"):
     app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -149,5 +340,28 @@ async def root():
         "status": "Active"
     }
 
+@app.get("/ready", tags=["Health"])
+async def ready():
+    """
+    Readiness: modeller yüklendi ve warm-up tamamlandı mı?
+    Hazır değilken 503 döner; liveness için `/` kullanılır.
+    """
+    state = models.get("warmup")
+    info = state.get_info() if state else {"ready": False, "warmup_total_ms": None, "models": {}}
+    return JSONResponse(status_code=200 if info["ready"] else 503, content=info)
+
+@app.get("/api/gemini/status", tags=["Health"])
+async def gemini_status():
+    """Gemini limiter'ının anlık sınırları (eşzamanlılık, RPM/TPM), kuyruk derinliği, HTTP havuzu ve yanıt önbelleği."""
+    from services.gemini_cache import get_gemini_cache
+    from services.gemini_client import get_info as http_info
+    from services.gemini_limiter import get_gemini_limiter
+    cache = get_gemini_cache()
+    return {
+        "limiter": get_gemini_limiter().get_info(),
+        "http": http_info(),
+        "cache": cache.get_info() if cache is not None else None
+    }
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, reload=settings.DEBUG)
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Partalog AI - INT8 Detector Kalibrasyonu ve Raporu
+Görevi: FP32 YOLO modelinden yerel örnek sayfalarla INT8 model üretmek ve
+üretime almadan önce recall/precision + ms/sayfa farkını raporlamak.
+
+Kullanım:
+    python quantize_detector.py calibrate --pages ornek_sayfalar/
+    python quantize_detector.py report --pages test_sayfalar/ [--labels etiketler/] [--json rapor.json]
+
+Etiket klasörü verilirse (YOLO formatı: <sayfa>.txt, "cls cx cy w h")
+her iki model gerçek etiketlere göre ölçülür; verilmezse FP32 çıktısı
+referans kabul edilir.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from benchmark_detector import load_pages, match_detections, time_detector
+from config import settings
+from core.detector import Detection, HotspotDetector
+
+
+# ==========================================
+# 🛠️ YARDIMCI FONKSİYONLAR
+# ==========================================
+
+def load_yolo_labels(labels_dir: str, page_name: str, image_shape) -> Optional[List[Detection]]:
+    """YOLO formatındaki etiket dosyasını piksel koordinatlı Detection listesine çevirir."""
+    label_path = Path(labels_dir) / f"{Path(page_name).stem}.txt"
+    if not label_path.exists():
+        return None
+
+    img_h, img_w = image_shape[:2]
+    detections = []
+    for line in label_path.read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+        cls, cx, cy, w, h = int(parts[0]), *map(float, parts[1:5])
+        detections.append(Detection(
+            x1=(cx - w / 2) * img_w,
+            y1=(cy - h / 2) * img_h,
+            x2=(cx + w / 2) * img_w,
+            y2=(cy + h / 2) * img_h,
+            confidence=1.0,
+            class_id=cls,
+            class_name=str(cls)
+        ))
+    return detections
+
+
+def precision_recall(
+    references: Dict[str, List[Detection]],
+    predictions: Dict[str, List[Detection]],
+    iou_threshold: float
+) -> Dict[str, float]:
+    """Tüm sayfalar üzerinden toplam precision / recall."""
+    tp = fp = fn = 0
+    for name, reference in references.items():
+        matches, missing, extra = match_detections(reference, predictions[name], iou_threshold)
+        tp += len(matches)
+        fn += missing
+        fp += extra
+
+    return {
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 1.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 1.0,
+    }
+
+
+# ==========================================
+# 🚀 KOMUTLAR
+# ==========================================
+
+def calibrate(args):
+    from core.quantization import quantize_detector
+
+    pages = load_pages(args.pages, args.limit)
+    if not pages:
+        logger.error(f"❌ '{args.pages}' içinde görüntü bulunamadı.")
+        sys.exit(2)
+
+    # FP32 ONNX yoksa export edilir
+    fp32 = HotspotDetector(args.model, settings.YOLO_CONFIDENCE, args.imgsz, "onnx")
+    out = args.out or str(HotspotDetector.int8_path(Path(args.model)))
+
+    quantize_detector(
+        str(fp32.weights_path),
+        out,
+        [image for _, image in pages],
+        args.imgsz,
+        method=args.method
+    )
+    logger.info(f"💡 Kullanmak için: YOLO_BACKEND=onnx YOLO_PRECISION=int8 YOLO_INT8_MODEL_PATH={out}")
+
+
+def report(args):
+    pages = load_pages(args.pages, args.limit)
+    if not pages:
+        logger.error(f"❌ '{args.pages}' içinde görüntü bulunamadı.")
+        sys.exit(2)
+
+    fp32 = HotspotDetector(args.model, args.conf, args.imgsz, "onnx", "fp32")
+    int8 = HotspotDetector(args.model, args.conf, args.imgsz, "onnx", "int8", args.int8)
+
+    fp32_out, fp32_ms = time_detector(fp32, pages, args.runs)
+    int8_out, int8_ms = time_detector(int8, pages, args.runs)
+
+    # Referans: gerçek etiketler (varsa) yoksa FP32 çıktısı
+    references = {}
+    if args.labels:
+        for name, image in pages:
+            labels = load_yolo_labels(args.labels, name, image.shape)
+            if labels is not None:
+                references[name] = labels
+        logger.info(f"🏷️ {len(references)}/{len(pages)} sayfa için etiket bulundu")
+    reference_kind = "labels" if references else "fp32"
+    if not references:
+        references = fp32_out
+
+    result = {
+        "pages": len(pages),
+        "reference": reference_kind,
+        "iou_threshold": args.iou,
+        "fp32": {"ms_per_page": round(fp32_ms, 2), **precision_recall(references, fp32_out, args.iou)},
+        "int8": {"ms_per_page": round(int8_ms, 2), **precision_recall(references, int8_out, args.iou)},
+        "speedup": round(fp32_ms / int8_ms, 2) if int8_ms else 0.0,
+    }
+
+    logger.info("-" * 60)
+    logger.info(f"Referans: {reference_kind} | IoU >= {args.iou} | {len(pages)} sayfa")
+    for variant in ("fp32", "int8"):
+        r = result[variant]
+        logger.info(f"{variant.upper():<5}: {r['ms_per_page']:8.1f} ms/sayfa | "
+                    f"precision {r['precision']:.4f} | recall {r['recall']:.4f}")
+    logger.info(f"Hızlanma: x{result['speedup']:.2f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        logger.success(f"💾 Rapor kaydedildi: {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 YOLO detector kalibrasyonu ve raporu")
+    parser.add_argument("--model", default=settings.YOLO_MODEL_PATH, help="FP32 .pt modeli")
+    parser.add_argument("--imgsz", type=int, default=settings.YOLO_IMG_SIZE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cal = sub.add_parser("calibrate", help="Örnek sayfalarla INT8 model üret")
+    cal.add_argument("--pages", required=True, help="Kalibrasyon sayfalarının klasörü")
+    cal.add_argument("--limit", type=int, default=100, help="En fazla kaç sayfa")
+    cal.add_argument("--method", default="minmax", choices=["minmax", "percentile", "entropy"])
+    cal.add_argument("--out", default="", help="INT8 model yolu (varsayılan: best.int8.onnx)")
+    cal.set_defaults(func=calibrate)
+
+    rep = sub.add_parser("report", help="FP32 vs INT8 doğruluk / hız raporu")
+    rep.add_argument("--pages", required=True, help="Test sayfalarının klasörü")
+    rep.add_argument("--labels", default="", help="YOLO formatında etiket klasörü (opsiyonel)")
+    rep.add_argument("--int8", default=settings.YOLO_INT8_MODEL_PATH or None, help="INT8 model yolu")
+    rep.add_argument("--conf", type=float, default=settings.YOLO_CONFIDENCE)
+    rep.add_argument("--iou", type=float, default=0.5)
+    rep.add_argument("--runs", type=int, default=3)
+    rep.add_argument("--limit", type=int, default=0)
+    rep.add_argument("--json", default="", help="Raporu JSON olarak kaydet")
+    rep.set_defaults(func=report)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
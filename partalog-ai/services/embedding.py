@@ -1,6 +1,6 @@
-import requests
 from loguru import logger
 from config import settings
+from services.gemini_client import get_sync_session
 import os
 
 def get_text_embedding(text: str):
@@ -33,7 +33,8 @@ def get_text_embedding(text: str):
     }
     
     try:
-        response = requests.post(url, json=payload, headers={"Content-Type": "application/json"})
+        # Paylaşılan bağlantı havuzu: her çağrıda yeni TLS bağlantısı açılmaz
+        response = get_sync_session().post(url, json=payload, headers={"Content-Type": "application/json"})
         
         if response.status_code != 200:
             logger.error(f"Gemini Embedding API Hatası: {response.text}")
@@ -0,0 +1,233 @@
+"""
+Gemini Cache - Gemini yanıtlarının kalıcı (SQLite) önbelleği.
+Bir katalog yeniden işlendiğinde aynı sayfa görselleri aynı prompt'larla
+tekrar gönderiliyordu. Anahtar: kodlanmış görselin hash'i + model adı +
+prompt şablon sürümü + generation config (+ prompt'a giren değişkenler).
+
+Ham yanıt metni saklanır, ayrıştırılmış sonuç değil: ayrıştırıcı düzeltilip
+katalog yeniden işlendiğinde Gemini'ye gidilmez, düzeltme yine uygulanır.
+Prompt değiştiğinde ilgili *_PROMPT_VERSION artırılır; eski kayıtlar
+kullanılmaz ve zamanla (TTL / boyut sınırı) silinir.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from loguru import logger
+
+from config import settings
+
+
+class GeminiResponseCache:
+    """
+    Anahtar -> yanıt metni. Süre (TTL) ve toplam boyut sınırlı; sınır
+    aşılınca en uzun süredir kullanılmayan kayıtlar silinir.
+    Thread-safe; disk erişimi olduğu için API'den asyncio.to_thread ile çağrılır.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30 * 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite dosyası
+            ttl_seconds: Kaydın geçerlilik süresi (0 = süresiz)
+            max_bytes: Yanıt metinlerinin toplam boyut sınırı
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, prompt_version TEXT, response TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evictions": 0}
+
+        with self._lock:
+            if self.ttl_seconds:
+                expired = self._db.execute(
+                    "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+                self._stats["expired"] += expired
+            self._db.commit()
+            self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        logger.info(f"Gemini yanıt önbelleği: {self.path} ({count} kayıt, {self._bytes // 1024} KB)")
+
+    @staticmethod
+    def make_key(
+        image: Optional[Union[bytes, str]],
+        model: str,
+        prompt_version: str,
+        generation_config: Optional[dict] = None,
+        *extra: Any
+    ) -> str:
+        """
+        Args:
+            image: Gemini'ye gönderilen kodlanmış görsel (bayt ya da base64); görselsiz çağrıda None
+            model: Model adı
+            prompt_version: Prompt şablonunun sürümü
+            generation_config: İstekteki generationConfig
+            extra: Prompt'a giren değişkenler (etiket listesi vb.)
+        """
+        if isinstance(image, str):
+            image = image.encode("ascii")
+        image_hash = hashlib.sha256(image).hexdigest() if image is not None else "-"
+        config = json.dumps(generation_config or {}, sort_keys=True)
+        parts = [image_hash, model, prompt_version, config, *(json.dumps(e, sort_keys=True, ensure_ascii=False) for e in extra)]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT response, size, created FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is not None and self.ttl_seconds and now - row[2] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._bytes -= row[1]
+                self._stats["expired"] += 1
+                row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._stats["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, response: str, model: str = "", prompt_version: str = ""):
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            now = time.time()
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, prompt_version, response, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, prompt_version, response, size, now, now)
+            )
+            self._bytes += size - (old[0] if old else 0)
+            self._stats["stores"] += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Boyut sınırı aşıldıysa en eski kullanılanları sil (_lock altında)."""
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= size
+                self._stats["evictions"] += 1
+                if self._bytes <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get_info(self) -> dict:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": count,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "path": str(self.path)
+            }
+
+
+# ==========================================
+# 🌐 SÜREÇ GENELİ ÖRNEK
+# ==========================================
+
+_cache: Optional[GeminiResponseCache] = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_gemini_cache() -> Optional[GeminiResponseCache]:
+    """Ayarlardan kurulan paylaşılan önbellek (kapalıysa None; ilk çağrıda açılır)."""
+    global _cache, _cache_failed
+    if not settings.GEMINI_CACHE_ENABLED or not settings.GEMINI_CACHE_PATH or _cache_failed:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = GeminiResponseCache(
+                    settings.GEMINI_CACHE_PATH,
+                    settings.GEMINI_CACHE_TTL_DAYS * 24 * 3600,
+                    settings.GEMINI_CACHE_MAX_MB * 1024 * 1024
+                )
+            except Exception as e:
+                logger.error(f"❌ Gemini yanıt önbelleği açılamadı: {e}")
+                _cache_failed = True
+                return None
+        return _cache
+
+
+def close_gemini_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+
+# ==========================================
+# 🔌 ENDPOINT YARDIMCILARI (önbellek kapalıysa etkisiz)
+# ==========================================
+
+def response_key(
+    image: Optional[Union[bytes, str]],
+    model: str,
+    prompt_version: str,
+    generation_config: Optional[dict] = None,
+    *extra: Any
+) -> Optional[str]:
+    """Önbellek açıksa istek anahtarı, değilse None."""
+    cache = get_gemini_cache()
+    return cache.make_key(image, model, prompt_version, generation_config, *extra) if cache is not None else None
+
+
+async def load_response(key: Optional[str]) -> Optional[str]:
+    cache = get_gemini_cache()
+    if key is None or cache is None:
+        return None
+    try:
+        return await asyncio.to_thread(cache.get, key)
+    except Exception as e:
+        logger.warning(f"Gemini önbelleği okunamadı: {e}")
+        return None
+
+
+async def store_response(key: Optional[str], response: str, model: str, prompt_version: str):
+    """Ayrıştırılabilen yanıtı kaydet (hata isteği bozmaz)."""
+    cache = get_gemini_cache()
+    if key is None or cache is None:
+        return
+    try:
+        await asyncio.to_thread(cache.put, key, response, model, prompt_version)
+    except Exception as e:
+        logger.warning(f"Gemini önbelleğine yazılamadı: {e}")
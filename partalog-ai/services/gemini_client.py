@@ -0,0 +1,167 @@
+"""
+Gemini Client - Tüm Gemini REST çağrılarının paylaştığı HTTP bağlantı havuzu.
+Tablo, analiz ve chat istekleri her seferinde yeni aiohttp.ClientSession
+açıyordu (her mesajda yeni TLS el sıkışması). Oturum lifespan'de bir kez
+kurulur: keep-alive bağlantılar, DNS önbelleği ve host başına bağlantı
+sınırı tüm endpoint'lerce paylaşılır. Senkron embedding çağrıları için
+aynı amaçla havuzlu bir requests.Session tutulur.
+"""
+
+import asyncio
+import threading
+from typing import Optional
+
+import aiohttp
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from config import settings
+
+
+class GeminiClient:
+    """
+    Uygulama ömrü boyunca açık kalan aiohttp oturumu.
+    Çağıranlar oturumu kapatmaz (`async with session` değil, `session.post` kullanılır).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 64,
+        max_per_host: int = 32,
+        keepalive_timeout: float = 60,
+        dns_ttl: int = 300,
+        timeout: float = 300
+    ):
+        """
+        Args:
+            max_connections: Toplam açık bağlantı sınırı
+            max_per_host: Tek host'a (generativelanguage.googleapis.com) bağlantı sınırı
+            keepalive_timeout: Boştaki bağlantının havuzda tutulma süresi (sn)
+            dns_ttl: DNS çözümlemesinin önbellekte kalma süresi (sn)
+            timeout: İstek başına toplam süre sınırı (sn)
+        """
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        """Oturumu çalışan event loop'ta aç."""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_ttl,
+            use_dns_cache=True
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise RuntimeError("GeminiClient başlatılmadı (start çağrılmalı).")
+        return self._session
+
+    def is_usable(self) -> bool:
+        """Oturum açık ve şu anki event loop'a mı ait?"""
+        if self._session is None or self._session.closed:
+            return False
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def get_info(self) -> dict:
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "max_connections": self.max_connections,
+            "max_per_host": self.max_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "dns_ttl": self.dns_ttl,
+            "timeout": self.timeout
+        }
+
+
+# ==========================================
+# 🌐 PAYLAŞILAN ÖRNEKLER
+# ==========================================
+
+_client: Optional[GeminiClient] = None
+_sync_session: Optional[requests.Session] = None
+_sync_lock = threading.Lock()
+
+
+def _client_from_settings() -> GeminiClient:
+    return GeminiClient(
+        settings.GEMINI_HTTP_MAX_CONNECTIONS,
+        settings.GEMINI_HTTP_MAX_PER_HOST,
+        settings.GEMINI_HTTP_KEEPALIVE_S,
+        settings.GEMINI_HTTP_DNS_TTL_S,
+        settings.GEMINI_HTTP_TIMEOUT_S
+    )
+
+
+async def start_gemini_client() -> GeminiClient:
+    """Lifespan başlangıcı: paylaşılan oturumu kur."""
+    global _client
+    if _client is not None:
+        await _client.close()
+    _client = _client_from_settings()
+    await _client.start()
+    return _client
+
+
+async def close_gemini_client():
+    """Lifespan kapanışı: havuzdaki bağlantıları kapat."""
+    global _client, _sync_session
+    if _client is not None:
+        await _client.close()
+        _client = None
+    with _sync_lock:
+        if _sync_session is not None:
+            _sync_session.close()
+            _sync_session = None
+
+
+async def get_gemini_session() -> aiohttp.ClientSession:
+    """
+    Paylaşılan aiohttp oturumu. Lifespan çalışmadıysa (betikler, router'ın
+    tek başına kullanımı) ilk çağrıda açılır.
+    """
+    global _client
+    if _client is None or not _client.is_usable():
+        logger.debug("Gemini HTTP oturumu lifespan dışında açılıyor")
+        _client = _client_from_settings()
+        await _client.start()
+    return _client.session
+
+
+def get_sync_session() -> requests.Session:
+    """Senkron çağrılar (embedding) için keep-alive bağlantı havuzlu requests.Session."""
+    global _sync_session
+    with _sync_lock:
+        if _sync_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.GEMINI_HTTP_MAX_PER_HOST)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sync_session = session
+        return _sync_session
+
+
+def get_info() -> Optional[dict]:
+    return _client.get_info() if _client is not None else None
@@ -0,0 +1,389 @@
+"""
+Gemini Limiter - Tüm Gemini çağrılarının geçtiği süreç genelinde hız sınırlayıcı.
+Analiz, görsel ingest, sözlük eğitimi, tablo ve chat kendi sabitleriyle
+(Semaphore(10), 15 eşzamanlı istek, time.sleep(1.5)) ya da hiç sınır
+olmadan çağrı yapıyordu; ingest patlamalarında kota hatası alınıp sabit
+beklemeyle tekrar deneniyordu.
+
+- RPM / TPM token bucket: dakikalık istek ve token bütçesi
+- AIMD eşzamanlılık: başarıda sınır yavaşça artar, 429/503'te yarıya iner
+- Retry-After (başlık ya da gövdedeki retryDelay) süresince yeni çağrı başlamaz
+- İstekler sırayla (FIFO) kabul edilir; kuyruk sınırı aşılırsa GeminiOverloaded
+
+Async (`async with limiter.slot(...)`) ve senkron (`with limiter.slot_sync(...)`)
+kullanım aynı durumu paylaşır.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+from loguru import logger
+
+from config import settings
+
+
+THROTTLE_STATUSES = (429, 503)
+POLL_INTERVAL = 0.05   # Kuyruktaki isteğin kabul koşullarını yeniden denetleme aralığı (sn)
+IMAGE_TOKENS = 258     # Gemini'nin görsel başına saydığı token (küçük görsel / döşeme)
+
+
+class GeminiOverloaded(RuntimeError):
+    """Bekleme kuyruğu dolu; istek kabul edilmedi."""
+
+
+def is_throttled(status: Optional[int]) -> bool:
+    return status in THROTTLE_STATUSES
+
+
+def estimate_tokens(text: str = "", images: int = 0, output: int = 0) -> int:
+    """TPM bütçesi için kaba tahmin (~4 karakter = 1 token); gerçek kullanım yanıttan düzeltilir."""
+    return len(text) // 4 + images * IMAGE_TOKENS + output
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]] = None, body: Any = None) -> Optional[float]:
+    """
+    Bekleme süresi: Retry-After başlığı (saniye ya da HTTP tarihi) veya
+    Gemini hata gövdesindeki RetryInfo.retryDelay ("31s").
+    """
+    value = headers.get("Retry-After") if headers else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    details = body.get("error", {}).get("details", []) if isinstance(body, dict) else []
+    for detail in details if isinstance(details, list) else []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        match = re.fullmatch(r"([\d.]+)s", str(delay or ""))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def status_from_exception(error: BaseException) -> Optional[int]:
+    """SDK hatalarından HTTP durum kodu (google-genai / google.api_core `code` taşır)."""
+    for attr in ("code", "status_code"):
+        code = getattr(error, attr, None)
+        if isinstance(code, int):
+            return code
+    match = re.search(r"\b(429|503)\b", str(error))
+    return int(match.group(1)) if match else None
+
+
+class _TokenBucket:
+    """Dakikalık bütçe; kapasite dolu başlar, saniyede rate/60 dolar."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount token için beklenecek süre (0 = hemen)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # Tek istek kapasiteden büyükse dolu kovayı bekler
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Tahmin ile gerçek kullanım farkını düş/iade et (borca girebilir)."""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class GeminiPermit:
+    """Kabul edilen tek çağrı; sonuç record ile bildirilir, slot kapanınca serbest kalır."""
+
+    def __init__(self, limiter: "GeminiLimiter", tokens: int, admitted_at: float):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.admitted_at = admitted_at
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self.tokens_used: Optional[int] = None
+
+    def record(self, status: Optional[int], headers: Optional[Mapping[str, str]] = None, body: Any = None):
+        """HTTP durumu (ve kota hatasında bekleme süresi)."""
+        self.status = status
+        if is_throttled(status):
+            self.retry_after = retry_after_seconds(headers, body)
+
+    async def record_response(self, response):
+        """aiohttp yanıtı: durum ve Retry-After; kota hatasında gövdedeki retryDelay de okunur."""
+        body = None
+        if is_throttled(response.status):
+            try:
+                body = await response.json(content_type=None)
+            except Exception:
+                pass
+        self.record(response.status, response.headers, body)
+
+    def record_error(self, error: BaseException):
+        """SDK istisnasından durum kodu çıkar."""
+        self.record(status_from_exception(error))
+
+    def record_usage(self, usage: Optional[Mapping[str, Any]]):
+        """Yanıttaki usageMetadata.totalTokenCount ile TPM bütçesini düzelt."""
+        total = usage.get("totalTokenCount") if usage else None
+        if isinstance(total, int):
+            self.tokens_used = total
+
+
+class GeminiLimiter:
+    """
+    Süreç genelinde Gemini kabul kontrolü. Thread-safe; durum tek kilit
+    altında tutulur, bekleyen istekler kısa aralıklarla (POLL_INTERVAL)
+    sırası gelip gelmediğini denetler.
+    """
+
+    def __init__(
+        self,
+        rpm: int = 1000,
+        tpm: int = 1_000_000,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        initial_concurrency: Optional[int] = None,
+        max_queue: int = 0,
+        backoff: float = 2.0,
+        max_backoff: float = 60.0
+    ):
+        """
+        Args:
+            rpm: Dakikalık istek bütçesi (0 = sınırsız)
+            tpm: Dakikalık token bütçesi (0 = sınırsız)
+            max_concurrency: AIMD üst sınırı
+            min_concurrency: 429/503 sonrası inilebilecek en düşük eşzamanlılık
+            initial_concurrency: Başlangıç eşzamanlılığı (None = max_concurrency)
+            max_queue: Bekleyen istek sınırı, aşılırsa GeminiOverloaded (0 = sınırsız)
+            backoff: Retry-After yoksa ilk kota hatasından sonraki bekleme (sn), ardışık hatalarda ikiye katlanır
+            max_backoff: Bekleme üst sınırı (sn)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_queue = max(0, max_queue)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._rpm = _TokenBucket(rpm) if rpm > 0 else None
+        self._tpm = _TokenBucket(tpm) if tpm > 0 else None
+        self._limit = float(min(initial_concurrency or self.max_concurrency, self.max_concurrency))
+        self._limit = max(self._limit, float(self.min_concurrency))
+        self._in_flight = 0
+        self._queue: "deque[int]" = deque()
+        self._next_ticket = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._throttle_streak = 0
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "admitted": 0, "completed": 0, "throttled": 0, "errors": 0,
+            "rejected": 0, "wait_ms": 0.0
+        }
+
+    # ---- Kabul ----
+
+    def _enqueue(self) -> int:
+        with self._lock:
+            if self.max_queue and len(self._queue) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise GeminiOverloaded(f"Gemini kuyruğu dolu ({len(self._queue)} istek bekliyor)")
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._queue.append(ticket)
+            return ticket
+
+    def _dequeue(self, ticket: int):
+        with self._lock:
+            try:
+                self._queue.remove(ticket)
+            except ValueError:
+                pass
+
+    def _try_admit(self, ticket: int, tokens: int, waited_since: float) -> Optional[GeminiPermit]:
+        """Sıra bu istekteyse ve bütçe / eşzamanlılık uygunsa kabul et."""
+        with self._lock:
+            now = time.monotonic()
+            if self._queue[0] != ticket or now < self._blocked_until:
+                return None
+            if self._in_flight >= int(self._limit):
+                return None
+            if self._rpm is not None and self._rpm.wait_time(1, now) > 0:
+                return None
+            if self._tpm is not None and self._tpm.wait_time(tokens, now) > 0:
+                return None
+
+            self._queue.popleft()
+            if self._rpm is not None:
+                self._rpm.take(1)
+            if self._tpm is not None:
+                self._tpm.take(tokens)
+            self._in_flight += 1
+            self._stats["admitted"] += 1
+            self._stats["wait_ms"] += (now - waited_since) * 1000
+            return GeminiPermit(self, tokens, now)
+
+    async def acquire(self, tokens: int = 0) -> GeminiPermit:
+        """Sıra ve bütçe uygun olana kadar (event loop'u bloklamadan) bekle."""
+        waited_since = time.monotonic()
+        ticket = self._enqueue()
+        try:
+            while True:
+                permit = self._try_admit(ticket, tokens, waited_since)
+                if permit is not None:
+                    return permit
+                await asyncio.sleep(POLL_INTERVAL)
+        except BaseException:
+            self._dequeue(ticket)  # İptal / hata: sıradaki isteği tıkamasın
+            raise
+
+    def acquire_sync(self, tokens: int = 0) -> GeminiPermit:
+        """acquire'ın thread / betik sürümü."""
+        waited_since = time.monotonic()
+        ticket = self._enqueue()
+        try:
+            while True:
+                permit = self._try_admit(ticket, tokens, waited_since)
+                if permit is not None:
+                    return permit
+                time.sleep(POLL_INTERVAL)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    # ---- Sonuç (AIMD) ----
+
+    def release(self, permit: GeminiPermit):
+        """Slotu bırak; kaydedilen duruma göre eşzamanlılığı ve beklemeyi güncelle."""
+        with self._lock:
+            now = time.monotonic()
+            self._in_flight -= 1
+            self._stats["completed"] += 1
+
+            if self._tpm is not None and permit.tokens_used is not None:
+                self._tpm.adjust(permit.tokens_used - permit.tokens)
+
+            if is_throttled(permit.status):
+                self._stats["throttled"] += 1
+                # Aynı pencerede kabul edilip birlikte düşen istekler sınırı bir kez yarılar
+                if permit.admitted_at >= self._last_decrease:
+                    self._throttle_streak += 1
+                    self._limit = max(float(self.min_concurrency), self._limit / 2)
+                    self._last_decrease = now
+                wait = permit.retry_after
+                if wait is None:
+                    wait = self.backoff * 2 ** (self._throttle_streak - 1)
+                wait = min(wait, self.max_backoff)
+                self._blocked_until = max(self._blocked_until, now + wait)
+                limit, streak = self._limit, self._throttle_streak
+            elif permit.status is not None and 200 <= permit.status < 300:
+                self._throttle_streak = 0
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+                return
+            else:
+                if permit.status is not None:
+                    self._stats["errors"] += 1
+                return
+
+        logger.warning(
+            f"⏳ Gemini kota sınırı ({permit.status}): {wait:.1f} sn bekleniyor, "
+            f"eşzamanlılık {int(limit)} (ardışık {streak})"
+        )
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0):
+        """`async with limiter.slot(n) as permit:` ... `permit.record(status, headers)`"""
+        permit = await self.acquire(tokens)
+        try:
+            yield permit
+            if permit.status is None:
+                permit.record(200)  # SDK çağrısı hatasız döndü
+        except Exception as e:
+            if permit.status is None:
+                permit.record_error(e)
+            raise
+        finally:
+            self.release(permit)
+
+    @contextmanager
+    def slot_sync(self, tokens: int = 0):
+        permit = self.acquire_sync(tokens)
+        try:
+            yield permit
+            if permit.status is None:
+                permit.record(200)  # SDK çağrısı hatasız döndü
+        except Exception as e:
+            if permit.status is None:
+                permit.record_error(e)
+            raise
+        finally:
+            self.release(permit)
+
+    def get_info(self) -> dict:
+        """Anlık sınırlar, kuyruk derinliği ve sayaçlar."""
+        with self._lock:
+            now = time.monotonic()
+            admitted = self._stats["admitted"]
+            info = {
+                "concurrency_limit": int(self._limit),
+                "concurrency_limit_exact": round(self._limit, 2),
+                "min_concurrency": self.min_concurrency,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "max_queue": self.max_queue,
+                "cooldown_remaining_s": round(max(0.0, self._blocked_until - now), 2),
+                "rpm": None,
+                "tpm": None,
+                "stats": {
+                    **{k: v for k, v in self._stats.items() if k != "wait_ms"},
+                    "avg_wait_ms": round(self._stats["wait_ms"] / admitted, 2) if admitted else 0.0
+                }
+            }
+            for name, bucket in (("rpm", self._rpm), ("tpm", self._tpm)):
+                if bucket is not None:
+                    bucket._refill(now)
+                    info[name] = {"limit": int(bucket.capacity), "available": int(bucket.tokens)}
+            return info
+
+
+# ==========================================
+# 🌐 SÜREÇ GENELİ ÖRNEK
+# ==========================================
+
+_limiter: Optional[GeminiLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_gemini_limiter() -> GeminiLimiter:
+    """Ayarlardan kurulan paylaşılan limiter (ilk çağrıda oluşur)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = GeminiLimiter(
+                settings.GEMINI_RPM,
+                settings.GEMINI_TPM,
+                settings.GEMINI_MAX_CONCURRENCY,
+                settings.GEMINI_MIN_CONCURRENCY,
+                settings.GEMINI_INITIAL_CONCURRENCY or None,
+                settings.GEMINI_MAX_QUEUE,
+                settings.GEMINI_BACKOFF_S,
+                settings.GEMINI_MAX_BACKOFF_S
+            )
+        return _limiter
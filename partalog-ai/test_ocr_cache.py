@@ -0,0 +1,83 @@
+# test_ocr_cache.py
+# OCR kırpıntı önbelleğinin farklı numaraları karıştırmadığını sentetik balonlarla doğrular.
+# Çalıştırma: python -m pytest test_ocr_cache.py  (ya da: python test_ocr_cache.py)
+import cv2
+import numpy as np
+
+from core.ocr_cache import OCRCropCache, crop_phash
+
+
+def balloon(number: str, size: int, pad: int = 0, scale: float = 0.9, thickness: int = 2) -> np.ndarray:
+    """Beyaz zemin, ince halka, ortalanmış siyah numara (gri)."""
+    side = size + 2 * pad
+    image = np.full((side, side), 255, dtype=np.uint8)
+    center = (side // 2, side // 2)
+    cv2.circle(image, center, size // 2, 0, 2)
+
+    font_scale = size / 64 * scale
+    (tw, th), _ = cv2.getTextSize(number, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    cv2.putText(image, number, (center[0] - tw // 2, center[1] + th // 2),
+                cv2.FONT_HERSHEY_SIMPLEX, font_scale, 0, thickness, cv2.LINE_AA)
+    return image
+
+
+def assert_not_confused(first: np.ndarray, first_label: str, second: np.ndarray):
+    cache = OCRCropCache()
+    cache.put(crop_phash(first), first_label, 0.99)
+    cached = cache.lookup(crop_phash(second))
+    assert cached is None, f"{first_label} kaydı başka numaraya döndü: {cached}"
+
+
+def test_partial_number_is_not_served_from_shorter_label():
+    """Büyük fontta "21"in "2"si halkaya / iç daireye değer; kalan "1", "1" kaydıyla eşleşmemeli."""
+    for short, long in (("1", "21"), ("2", "22"), ("9", "29")):
+        assert_not_confused(balloon(short, 30, pad=5, scale=1.3), short, balloon(long, 30, pad=5, scale=1.3))
+    for short, long in (("3", "13"), ("4", "14")):
+        assert_not_confused(balloon(short, 48, scale=1.2), short, balloon(long, 48, scale=1.2))
+
+
+def test_glyph_count_must_match_label():
+    cache = OCRCropCache()
+    phash = crop_phash(balloon("4", 48))
+    assert phash is not None and len(phash) == 1
+
+    cache.put(phash, "14", 0.99)  # Bir rakam ayrılamamış okuma: saklanmaz
+    assert cache.lookup(phash) is None
+
+    cache.put(phash, "4", 0.99)
+    assert cache.lookup(crop_phash(balloon("4", 48)))[0] == "4"
+
+
+def test_small_balloons_keep_digits_apart():
+    """30 px balon, 5 px pay: "45"/"48", "54"/"84", "40"/"46" ayrı kalmalı."""
+    for first, second, scale, thickness in (
+        ("45", "48", 0.6, 1), ("54", "84", 0.6, 1), ("40", "46", 0.7, 2),
+        ("45", "48", 1.0, 2), ("54", "84", 1.0, 2), ("40", "46", 1.0, 2),
+    ):
+        assert_not_confused(
+            balloon(first, 30, 5, scale, thickness), first,
+            balloon(second, 30, 5, scale, thickness)
+        )
+
+    cache = OCRCropCache()
+    cache.put(crop_phash(balloon("45", 30, pad=5, scale=1.0)), "45", 0.99)
+    assert cache.lookup(crop_phash(balloon("45", 30, pad=5, scale=1.0)))[0] == "45"
+
+
+def test_tiny_and_empty_crops_are_not_cached():
+    cache = OCRCropCache()
+    tiny = balloon("7", 10)
+    blank = np.full((40, 40), 255, dtype=np.uint8)
+    assert crop_phash(tiny) is None
+    assert crop_phash(blank) is None
+
+    cache.put(crop_phash(tiny), "7", 0.99)
+    assert cache.lookup(crop_phash(balloon("3", 11))) is None
+    assert cache.get_info()["stores"] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -6,11 +6,11 @@ Gemini'ye "Sanayide buna ne denir?" diye sorarak sözlüğü günceller.
 
 import os
 import json
-import time
 import pandas as pd
 import google.generativeai as genai
 from sqlalchemy import create_engine
 from config import settings # <--- AYARLARI BURADAN ÇEKİYORUZ
+from services.gemini_limiter import estimate_tokens, get_gemini_limiter
 from loguru import logger
 
 # ==========================================
@@ -21,6 +21,7 @@ from loguru import logger
 DB_CONNECTION_STRING = settings.DB_CONNECTION_STRING
 
 BATCH_SIZE = 40           # Gemini'ye tek seferde sorulacak kelime sayısı
+MAX_ATTEMPTS = 3          # Grup başına deneme (kota hatasında limiter'ın bekleme süresi dolunca)
 OUTPUT_FILE = "sanayi_sozlugu.json"
 
 # Gemini Konfigürasyonu
@@ -106,20 +107,27 @@ def ask_gemini_batch(terms_batch):
     }}
     """
 
-    try:
-        response = model.generate_content(prompt)
-        text = response.text
-        # JSON temizliği (Markdown taglerini temizle)
-        clean_text = text.replace("```json", "").replace("```", "").strip()
-        
-        # Bazen Gemini JSON'ın sonuna fazladan karakter koyabilir, basit temizlik
-        if not clean_text.endswith("}"):
-             clean_text = clean_text[:clean_text.rfind("}")+1]
+    limiter = get_gemini_limiter()
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            # RPM/TPM bütçesi limiter'da; 429'da limiter geri çekilir ve sonraki
+            # deneme bekleme süresi dolana kadar slot alamaz (sabit bekleme yok)
+            with limiter.slot_sync(estimate_tokens(prompt, output=len(terms_batch) * 24)):
+                response = model.generate_content(prompt)
+            text = response.text
+            # JSON temizliği (Markdown taglerini temizle)
+            clean_text = text.replace("```json", "").replace("```", "").strip()
+            
+            # Bazen Gemini JSON'ın sonuna fazladan karakter koyabilir, basit temizlik
+            if not clean_text.endswith("}"):
+                 clean_text = clean_text[:clean_text.rfind("}")+1]
 
-        return json.loads(clean_text)
-    except Exception as e:
-        logger.warning(f"⚠️ [EĞİTİM] API/Parsing Hatası (Bu grup atlanıyor): {e}")
-        return {}
+            return json.loads(clean_text)
+        except Exception as e:
+            logger.warning(f"⚠️ [EĞİTİM] API/Parsing Hatası (deneme {attempt}/{MAX_ATTEMPTS}): {e}")
+
+    logger.error(f"❌ [EĞİTİM] Grup {MAX_ATTEMPTS} denemede alınamadı, sonraki çalıştırmada tekrar denenecek: {', '.join(terms_batch)}")
+    return {}
 
 # ==========================================
 # 🚀 ANA AKIŞ (main.py tarafından çağrılır)
@@ -150,6 +158,7 @@ def main():
 
     # 3. Öğrenme Döngüsü
     newly_learned_data = {}
+    skipped_terms = []
     total_batches = (count_new // BATCH_SIZE) + 1
     
     for i in range(0, count_new, BATCH_SIZE):
@@ -164,9 +173,12 @@ def main():
             newly_learned_data.update(batch_result)
             logger.info(f"   ✅ {len(batch_result)} kelime hafızaya alındı.")
         else:
-            logger.warning("   ⚠️ Cevap alınamadı, pas geçiliyor.")
+            skipped_terms.extend(batch)
+            logger.warning("   ⚠️ Cevap alınamadı, grup sonraki çalıştırmaya kaldı.")
 
-        time.sleep(1.5) # API Rate Limit koruması
+    if skipped_terms:
+        # Sözlüğe yazılmayan terimler bir sonraki çalıştırmada yine "yeni" sayılır
+        logger.warning(f"⚠️ [EĞİTİM] {len(skipped_terms)} kelime öğrenilemedi, sonraki çalıştırmada tekrar denenecek.")
 
     # 4. Kaydetme
     if newly_learned_data:
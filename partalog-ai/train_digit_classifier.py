@@ -0,0 +1,99 @@
+"""
+Partalog AI - Hızlı Rakam Katmanı Eğitimi
+Görevi: EasyOCR'ın yüksek güvenle okuduğu ve OCR_SAMPLE_DIR'da biriken balon
+kırpıntılarından kNN rakam modelini yeniden kurmak ve ayrılan kırpıntılarda
+kapsama (hızlı katmanın karar verdiği oran) / doğruluk raporlamak.
+
+Kullanım:
+    python train_digit_classifier.py [--samples ocr_samples/] [--output models/digit_classifier.npz]
+    python train_digit_classifier.py --eval-split 0.2 --confidence 0.9
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import cv2
+from loguru import logger
+
+from config import settings
+from core.digit_classifier import DigitClassifier, condense, load_samples, sample_paths
+
+
+def evaluate(classifier: DigitClassifier, paths, confidence: float) -> dict:
+    """Ayrılan kırpıntılarda kapsama, doğruluk ve kırpıntı başına süre."""
+    covered = correct = 0
+    elapsed = 0.0
+
+    for path in paths:
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        start = time.perf_counter()
+        text, conf = classifier.read(image)
+        elapsed += time.perf_counter() - start
+
+        if text is not None and conf >= confidence:
+            covered += 1
+            correct += text == path.parent.name
+
+    total = len(paths)
+    return {
+        "crops": total,
+        "coverage": round(covered / total, 4) if total else 0.0,
+        "accuracy": round(correct / covered, 4) if covered else 0.0,
+        "us_per_crop": round(elapsed / total * 1e6, 1) if total else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hızlı rakam katmanını biriken örneklerden yeniden kur")
+    parser.add_argument("--samples", default=settings.OCR_SAMPLE_DIR, help="Örnek klasörü (<etiket>/*.png)")
+    parser.add_argument("--output", default=settings.OCR_FAST_TIER_MODEL, help="Model dosyası (.npz)")
+    parser.add_argument("--k", type=int, default=3, help="kNN komşu sayısı")
+    parser.add_argument("--max-per-digit", type=int, default=96, help="Rakam başına tutulan örnek (model boyutu)")
+    parser.add_argument("--eval-split", type=float, default=0.2, help="Değerlendirmeye ayrılan kırpıntı oranı")
+    parser.add_argument("--confidence", type=float, default=settings.OCR_FAST_TIER_CONFIDENCE,
+                        help="Kapsama/doğruluk için kabul eşiği")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.samples or not Path(args.samples).is_dir():
+        logger.error("❌ Örnek klasörü bulunamadı (--samples ya da OCR_SAMPLE_DIR).")
+        sys.exit(2)
+
+    paths = sample_paths(args.samples)
+    if not paths:
+        logger.error(f"❌ '{args.samples}' içinde kırpıntı yok.")
+        sys.exit(2)
+
+    random.Random(args.seed).shuffle(paths)
+    held_out = int(len(paths) * args.eval_split)
+    eval_paths, train_paths = paths[:held_out], paths[held_out:]
+
+    features, labels, skipped = load_samples(train_paths)
+    if len(labels) == 0:
+        logger.error("❌ Eğitilebilir rakam bulunamadı.")
+        sys.exit(2)
+    logger.info(f"🔢 {len(train_paths)} kırpıntıdan {len(labels)} rakam ({skipped} kırpıntı atlandı)")
+
+    classifier = DigitClassifier(*condense(features, labels, args.max_per_digit), args.k)
+
+    if eval_paths:
+        result = evaluate(classifier, eval_paths, args.confidence)
+        logger.info(
+            f"📊 {result['crops']} ayrılmış kırpıntı | kapsama {result['coverage']:.2%} | "
+            f"doğruluk {result['accuracy']:.2%} | {result['us_per_crop']} µs/kırpıntı"
+        )
+
+        # Yayına alınan model tüm örneklerle kurulur
+        features, labels, _ = load_samples(paths)
+        classifier = DigitClassifier(*condense(features, labels, args.max_per_digit), args.k)
+
+    classifier.save(args.output)
+    logger.success(f"✅ Model kaydedildi: {args.output} ({len(classifier.labels)}/{len(labels)} rakam)")
+    logger.info("💡 Kullanmak için: OCR_FAST_TIER_ENABLED=true")
+
+
+if __name__ == "__main__":
+    main()